@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import deque
+
+# ==========================================
+# 동시 진행 세션 상한과 대기열 (수업 단위 동시 접속 대비)
+# ==========================================
+# 시작 버튼을 누른 세션은 자리 (slot) 가 있으면 바로 입장, 없으면 도착 순서대로 대기.
+# 대기 화면이 주기적으로 request() 를 다시 호출하므로 마지막 호출이 queue_timeout 보다
+# 오래된 대기 항목은 창을 닫은 것으로 보고 제거. 입장한 세션은 is_active 가 False 가 되면
+# (완료·정리·연결 끊김) 자리를 반납. 예상 대기 시간은 최근 세션 소요 시간으로 계산.
+
+
+class AdmissionControl:
+    """입장한 세션 id → 입장 시각, 도착 순서 대기열과 대기 세션별 마지막 확인 시각"""
+
+    def __init__(self, capacity, queue_timeout=30, expected_duration=600, history=50):
+        self.capacity = capacity
+        self.queue_timeout = queue_timeout
+        self.expected_duration = expected_duration
+        self._lock = threading.Lock()
+        self._admitted = {}
+        self._queue = deque()
+        self._seen = {}
+        self._durations = deque(maxlen=history)
+        self.admitted_total = 0
+        self.abandoned_total = 0
+        self.waits = deque(maxlen=history)   # 최근 입장 세션의 대기 시간 (초)
+
+    def request(self, session_id, is_active, now=None):
+        """입장 요청 (대기 화면이 주기적으로 다시 호출). 입장하면 True"""
+        now = time.time() if now is None else now
+        with self._lock:
+            if session_id in self._admitted:
+                return True
+            if session_id not in self._seen:
+                self._queue.append((session_id, now))
+            self._seen[session_id] = now
+            self._sweep(is_active, now)
+            self._admit_waiting(now)
+            return session_id in self._admitted
+
+    def admit(self, session_id, now=None):
+        """대기 없이 자리 차지 (이어하기·같은 세션의 다음 실험). 상한을 넘을 수 있음"""
+        with self._lock:
+            self._drop_waiting(session_id)
+            self._admitted.setdefault(session_id, time.time() if now is None else now)
+
+    def release(self, session_id, now=None):
+        """자리 반납 또는 대기 취소"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._release(session_id, now)
+            self._admit_waiting(now)
+
+    def _release(self, session_id, now):
+        admitted_at = self._admitted.pop(session_id, None)
+        if admitted_at is not None:
+            self._durations.append(now - admitted_at)
+        self._drop_waiting(session_id)
+
+    def _drop_waiting(self, session_id):
+        if self._seen.pop(session_id, None) is not None:
+            self._queue = deque(entry for entry in self._queue if entry[0] != session_id)
+
+    def _sweep(self, is_active, now):
+        for session_id in [s for s in self._admitted if not is_active(s)]:
+            self._release(session_id, now)
+        stale = {s for s, seen in self._seen.items() if now - seen > self.queue_timeout}
+        if stale:
+            self.abandoned_total += len(stale)
+            for session_id in stale:
+                del self._seen[session_id]
+            self._queue = deque(entry for entry in self._queue if entry[0] not in stale)
+
+    def _admit_waiting(self, now):
+        while self._queue and len(self._admitted) < self.capacity:
+            session_id, arrived = self._queue.popleft()
+            del self._seen[session_id]
+            self._admitted[session_id] = now
+            self.admitted_total += 1
+            self.waits.append(now - arrived)
+
+    # ----- 대기 화면·대시보드용 -----
+
+    def mean_duration(self):
+        with self._lock:
+            return sum(self._durations) / len(self._durations) if self._durations else self.expected_duration
+
+    def position(self, session_id):
+        """대기 순번 (1부터). 대기 중이 아니면 None"""
+        with self._lock:
+            for i, (s, _) in enumerate(self._queue):
+                if s == session_id:
+                    return i + 1
+        return None
+
+    def eta(self, session_id, now=None):
+        """예상 대기 시간 (초). 앞 사람 수와 진행 중 세션의 남은 예상 시간으로 계산"""
+        now = time.time() if now is None else now
+        position = self.position(session_id)
+        if position is None:
+            return 0.0
+        mean = self.mean_duration()
+        with self._lock:
+            # 진행 중 세션이 끝날 예상 시각 (이미 평균을 넘긴 세션은 곧 끝난다고 봄)
+            free_at = [max(mean - (now - t), 0.0) for t in self._admitted.values()]
+        free_at = sorted(free_at + [0.0] * (self.capacity - len(free_at)))
+        if not free_at:
+            return position * mean
+        k = position - 1
+        return free_at[k % len(free_at)] + (k // len(free_at)) * mean
+
+    def active(self):
+        with self._lock:
+            return len(self._admitted)
+
+    def waiting(self):
+        with self._lock:
+            return len(self._queue)
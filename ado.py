@@ -0,0 +1,102 @@
+import time
+
+import numpy as np
+
+
+# ==========================================
+# 적응형 설계 최적화 (ADO) 엔진
+# ==========================================
+# 참여자의 할인 파라미터 (쌍곡선 k, 선택 민감도 beta) 격자 위에서 사후분포를 유지하고
+# 다음 문항은 기대 정보량 (상호정보량) 이 가장 큰 (base, target, delay) 조합으로 고름.
+# 우도·엔트로피 표는 시작할 때 한 번만 계산하므로 문항마다 행렬-벡터 곱 두 번이면 충분.
+
+LOG_K_GRID = np.linspace(np.log(1e-4), np.log(1e2), 80)
+LOG_BETA_GRID = np.log([1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0])
+RATIO_GRID = np.geomspace(1.01, 4.0, 40)
+
+AMOUNT_UNIT = 5000  # 후보 금액 반올림 단위 (0.5만 원)
+
+# 세션 종료 시 참여자별 k 추정치 (ado 워크시트 한 행)
+ESTIMATE_HEADERS = ["participant", "experiment", "submitted_at", "n_trials", "log_k", "log_k_sd", "k"]
+
+
+def design_id(task_id, ll_amount):
+    """저장 행의 설계 id (과제 블록 + LL 금액). 고정 문항과 ADO 후보가 같은 금액이면 같은 id"""
+    return f"{task_id}@{ll_amount}"
+
+
+def _entropy(p):
+    q = np.clip(p, 1e-12, 1 - 1e-12)
+    return -(q * np.log(q) + (1 - q) * np.log(1 - q))
+
+
+class ADOEngine:
+    """과제 정의에서 만든 후보 설계와 미리 계산한 확률 표를 공유 (세션별 상태는 사후분포 배열뿐)"""
+
+    def __init__(self, spec, ratios=RATIO_GRID, log_k=LOG_K_GRID, log_beta=LOG_BETA_GRID):
+        self.designs = []
+        for task in spec.tasks:
+            base = task["base"]
+            targets = sorted({int(round(base * r / AMOUNT_UNIT)) * AMOUNT_UNIT for r in ratios} - {base})
+            for target in targets:
+                question, ss_txt, ll_txt = spec.render(task["type"], base, target)
+                self.designs.append({
+                    "id": task["id"],
+                    "type": task["type"],
+                    "base": base,
+                    "vals": [target],
+                    "text": (question, ss_txt, ll_txt, base, target),
+                })
+
+        ss = np.array([d["base"] for d in self.designs], dtype=float)
+        ll = np.array([d["vals"][0] for d in self.designs], dtype=float)
+        ss_t = np.array([spec.types[d["type"]]["ss_delay"] / 12 for d in self.designs])
+        ll_t = np.array([spec.types[d["type"]]["ll_delay"] / 12 for d in self.designs])
+        sign = np.array([spec.types[d["type"]].get("sign", 1) for d in self.designs], dtype=float)
+
+        # 파라미터 격자 (M = K × B) × 설계 (D)
+        kk, bb = np.meshgrid(np.exp(log_k), np.exp(log_beta), indexing="ij")
+        self.log_k = np.log(kk.ravel())
+        k = kk.ravel()[:, None]
+        beta = bb.ravel()[:, None]
+        u = beta * sign * (ll / (1 + k * ll_t) - ss / (1 + k * ss_t)) / ss
+        p_ll = 0.5 * (1.0 + np.tanh(0.5 * u))
+        self.log_p = np.log(np.clip(np.stack([1 - p_ll, p_ll]), 1e-12, None))  # [SS, LL] × M × D
+        self.p_ll = p_ll
+        self.entropy = _entropy(p_ll)
+        self.log_prior = np.full(len(self.log_k), -np.log(len(self.log_k)))
+
+    def initial_state(self):
+        return self.log_prior.copy()
+
+    def select(self, log_post, used=()):
+        """상호정보량이 최대인 설계 인덱스"""
+        post = np.exp(log_post - log_post.max())
+        post /= post.sum()
+        p_ll = post @ self.p_ll
+        info = _entropy(p_ll) - post @ self.entropy
+        if used:
+            info[list(used)] = -np.inf
+        return int(np.argmax(info))
+
+    def update(self, log_post, design, choice):
+        """선택 (SS/LL) 반영한 새 로그 사후분포 (입력 배열은 바꾸지 않음)"""
+        log_post = log_post + self.log_p[1 if choice == "LL" else 0, :, design]
+        return log_post - np.logaddexp.reduce(log_post)
+
+    def estimate(self, log_post):
+        """log k 의 사후 평균과 표준편차"""
+        post = np.exp(log_post - log_post.max())
+        post /= post.sum()
+        mean = post @ self.log_k
+        return mean, np.sqrt(post @ (self.log_k - mean) ** 2)
+
+
+def estimate_row(engine, log_post, participant, experiment_id, n_trials, submitted_at=None):
+    """최종 사후분포 → ESTIMATE_HEADERS 순서의 행 (k 는 log k 사후 평균의 exp)"""
+    submitted_at = time.time() if submitted_at is None else submitted_at
+    mean, sd = engine.estimate(log_post)
+    return [
+        participant, experiment_id, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(submitted_at)),
+        n_trials, round(float(mean), 4), round(float(sd), 4), float(f"{np.exp(mean):.4g}"),
+    ]
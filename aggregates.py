@@ -0,0 +1,59 @@
+import bisect
+import threading
+
+# ==========================================
+# 실험자 대시보드용 누적 집계 (메모리)
+# ==========================================
+
+
+class ResponseAggregate:
+    """응답이 들어올 때마다 갱신하는 집계. 조회 시 저장된 데이터를 다시 읽지 않음"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completed = set()
+        self.n_trials = 0
+        self.task_counts = {}   # task -> [LL 수, 전체 수]
+        self.rts = {}           # (task, item) -> 정렬된 RT 목록 (고정 문항만)
+        self.seeded = False     # 요약 워크시트에서 이전 참여자를 불러왔는지
+
+    def record(self, task, item, choice, rt):
+        """응답 1건 반영 (record_response 에서 호출). ADO 문항 (item 이 빈 값) 은 문항별 RT 에서 제외"""
+        with self._lock:
+            self.n_trials += 1
+            counts = self.task_counts.setdefault(task, [0, 0])
+            counts[0] += choice == "LL"
+            counts[1] += 1
+            if item not in ("", None):
+                bisect.insort(self.rts.setdefault((task, item), []), rt)
+
+    def seed(self, participant, trials):
+        """이전 프로세스에서 완료된 참여자 반영 (요약 행 기준). 이미 반영된 참여자는 건너뛰고 False"""
+        with self._lock:
+            if participant in self.completed:
+                return False
+            self.completed.add(participant)
+        for task, item, choice, rt in trials:
+            self.record(task, item, choice, rt)
+        return True
+
+    def complete(self, participant):
+        """저장이 끝난 참여자 반영"""
+        with self._lock:
+            self.completed.add(participant)
+
+    def ll_rates(self):
+        """task -> (LL 비율, 응답 수)"""
+        with self._lock:
+            return {task: (ll / n, n) for task, (ll, n) in self.task_counts.items()}
+
+    def median_rts(self):
+        """(task, item) -> (중앙값 RT, 응답 수)"""
+        with self._lock:
+            return {key: (_median(values), len(values)) for key, values in self.rts.items()}
+
+
+def _median(values):
+    n = len(values)
+    mid = n // 2
+    return values[mid] if n % 2 else (values[mid - 1] + values[mid]) / 2
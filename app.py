@@ -0,0 +1,22 @@
+import streamlit as st
+from experiment import main
+from task_spec import load_experiments
+
+# ==========================================
+# 여러 실험을 하나의 서버 프로세스에서 제공
+# ==========================================
+# /v2, /v4 처럼 URL 경로 또는 ?exp=v2 로 실험 선택.
+# Google 클라이언트, 컴파일된 과제 정의, 체크포인트 저장소는 모든 실험이 공유.
+
+def experiment_page(exp_id):
+    def page():
+        main(exp_id)
+    page.__name__ = f"experiment_{exp_id}"
+    return page
+
+default_id, experiments = load_experiments()
+pages = [
+    st.Page(experiment_page(exp_id), title=exp_id, url_path=exp_id, default=(exp_id == default_id))
+    for exp_id in experiments
+]
+st.navigation(pages, position="hidden").run()
@@ -0,0 +1,93 @@
+import logging
+import os
+import sys
+
+import pytest
+
+# 저장소 루트의 streamlit.py 가 streamlit 패키지를 가리지 않도록
+# 실제 패키지를 먼저 import 한 뒤 루트를 sys.path 끝에 추가
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or ".") != ROOT]
+import streamlit as st  # noqa: E402
+sys.path.append(ROOT)
+
+import experiment  # noqa: E402
+
+# 스크립트 밖에서 session_state 를 쓸 때마다 찍히는 경고가 측정값을 왜곡하지 않도록
+for name in ("streamlit.runtime.scriptrunner_utils.script_run_context", "streamlit.runtime.state.session_state_proxy"):
+    logging.getLogger(name).setLevel(logging.ERROR)
+
+HEADERS = experiment.HEADERS
+
+
+class FakeWorksheet:
+    """gspread Worksheet 대신 쓰는 메모리 워크시트 (네트워크 없이 저장 경로 측정)"""
+
+    def __init__(self, n_rows=0):
+        self.col_count = 26
+        self.rows = []
+        if n_rows:
+            self.rows.append(list(HEADERS))
+            self.rows.extend(
+                [f"p{i // 30}", "t1_small_gain", str(i % 5 + 1), "LL", "500000", "505000", "1.234", "2026-01-01 00:00:00",
+                 "t1_small_gain@505000", "0", "1", "main"]
+                for i in range(n_rows)
+            )
+
+    def get_all_values(self):
+        return [list(r) for r in self.rows]
+
+    def row_values(self, row):
+        return list(self.rows[row - 1]) if len(self.rows) >= row else []
+
+    def append_row(self, row):
+        self.rows.append([str(v) for v in row])
+
+    def append_rows(self, rows):
+        self.rows.extend([str(v) for v in r] for r in rows)
+
+    def add_cols(self, n):
+        self.col_count += n
+
+    def update(self, values, range_name):
+        assert range_name == "A1"
+        self.rows[0] = [str(v) for v in values[0]]
+
+
+def make_responses(n=30):
+    spec = experiment.load_task_spec(experiment.load_experiments()[1]["main"]["tasks"])
+    responses = []
+    for task in spec.tasks:
+        ss_delay, ll_delay = spec.delays[task["id"]]
+        for i, target in enumerate(task["vals"]):
+            responses.append({
+                "task": task["id"], "item": i + 1, "choice": "LL" if i % 2 else "SS",
+                "ss_amount": task["base"], "ll_amount": target, "rt_sec": 1.234,
+                "design": f"{task['id']}@{target}", "ss_delay": ss_delay, "ll_delay": ll_delay,
+            })
+    return responses[:n]
+
+
+@pytest.fixture
+def session():
+    """main 실험의 첫 문항 상태로 초기화된 session_state"""
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    experiment.init_session("main")
+    st.session_state.participant_name = "bench"
+    st.session_state.current_phase = "task"
+    return st.session_state
+
+
+@pytest.fixture
+def fake_sheet(monkeypatch):
+    def install(n_rows):
+        sheet = FakeWorksheet(n_rows)
+        sheet.worksheets = {}  # 이름 있는 보조 워크시트 (summary, trace, …)
+
+        def open_worksheet(sheet_id, title=None, cols=26):
+            return sheet if title is None else sheet.worksheets.setdefault(title, FakeWorksheet())
+        monkeypatch.setattr(experiment, "get_sheet_id", lambda exp_id: "fake-sheet")
+        monkeypatch.setattr(experiment, "open_worksheet", open_worksheet)
+        return sheet
+    return install
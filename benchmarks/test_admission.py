@@ -0,0 +1,63 @@
+from admission import AdmissionControl
+
+# ==========================================
+# 동시 진행 세션 상한과 대기열
+# ==========================================
+
+
+def always(session_id):
+    return True
+
+
+def test_queue_in_arrival_order():
+    admission = AdmissionControl(2)
+    assert admission.request("a", always, now=0) and admission.request("b", always, now=1)
+    assert not admission.request("c", always, now=2) and not admission.request("d", always, now=3)
+    assert (admission.position("c"), admission.position("d"), admission.position("a")) == (1, 2, None)
+    # 자리가 나면 먼저 온 세션부터 입장, 대기 시간 기록
+    admission.release("a", now=10)
+    assert admission.request("c", always, now=11) and not admission.request("d", always, now=11)
+    assert list(admission.waits) == [0, 0, 8]
+    assert admission.active() == 2 and admission.waiting() == 1 and admission.mean_duration() == 10
+
+
+def test_inactive_sessions_release_slots():
+    admission = AdmissionControl(1)
+    assert admission.request("a", always, now=0)
+    assert not admission.request("b", always, now=1)
+    # 입장한 세션의 연결이 끊기면 다음 요청에서 자리 반납
+    assert admission.request("b", lambda s: s != "a", now=2)
+    assert admission.active() == 1 and admission.admitted_total == 2
+
+
+def test_abandoned_waiters_dropped():
+    admission = AdmissionControl(1, queue_timeout=30)
+    admission.request("a", always, now=0)
+    admission.request("b", always, now=0)
+    admission.request("c", always, now=20)
+    # b 는 30초 넘게 다시 확인하지 않았으므로 창을 닫은 것으로 보고 제거
+    assert not admission.request("c", always, now=40)
+    assert admission.position("b") is None and admission.position("c") == 1 and admission.abandoned_total == 1
+    admission.release("c", now=41)
+    assert admission.waiting() == 0
+
+
+def test_admit_bypasses_queue():
+    admission = AdmissionControl(1)
+    admission.request("a", always, now=0)
+    admission.request("b", always, now=0)
+    # 이어하기는 대기 없이 입장 (상한을 넘을 수 있음), 대기열에서는 빠짐
+    admission.admit("b", now=1)
+    assert admission.active() == 2 and admission.waiting() == 0
+
+
+def test_eta_from_running_sessions():
+    admission = AdmissionControl(2, expected_duration=600)
+    admission.request("a", always, now=0)
+    admission.request("b", always, now=300)
+    admission.request("c", always, now=300)
+    admission.request("d", always, now=300)
+    # 평균 600초: a 는 300초 뒤, b 는 600초 뒤에 끝남 → c 는 a 자리, d 는 b 자리
+    assert admission.eta("c", now=300) == 300
+    assert admission.eta("d", now=300) == 600
+    assert admission.eta("a", now=300) == 0.0
@@ -0,0 +1,34 @@
+import experiment
+from ado import ESTIMATE_HEADERS, estimate_row
+
+# ==========================================
+# ADO 저장 행 (설계 id·실제 지연) 과 최종 k 추정치
+# ==========================================
+
+
+def start_ado(session):
+    session.experiment_id = "ado"
+    session.participant_name = "ado-p"
+    experiment.start_experiment()
+    return experiment.get_ado_engine(experiment.get_experiment()["tasks"], experiment.get_experiment()["locale"])
+
+
+def test_ado_rows_keyed_by_design(session):
+    start_ado(session)
+    for choice in ("LL", "SS", "LL"):
+        design, _ = experiment.get_current_trial()
+        experiment.answer(choice, design["base"], design["vals"][0], design["id"], "", len(session.responses) + 1)
+    assert len(session.responses) == 3 and session.ado_used
+    rows = experiment.build_rows(session.responses, "ado-p", session.experiment_id)
+    record = dict(zip(experiment.HEADERS, rows[0]))
+    assert record["item"] == "" and record["experiment"] == "ado"
+    assert record["design"] == f"{record['task']}@{record['ll_amount']}"
+    assert (record["ss_delay"], record["ll_delay"]) == experiment.get_spec().delays[record["task"]]
+
+
+def test_estimate_row(session):
+    engine = start_ado(session)
+    row = estimate_row(engine, session.ado_log_post, "ado-p", "ado", 0, submitted_at=0)
+    record = dict(zip(ESTIMATE_HEADERS, row))
+    assert len(row) == len(ESTIMATE_HEADERS)
+    assert record["log_k_sd"] > 0 and record["k"] > 0
@@ -0,0 +1,15 @@
+from aggregates import ResponseAggregate
+
+# ==========================================
+# 대시보드 집계: ADO 문항은 문항별 RT 에 섞이지 않음
+# ==========================================
+
+
+def test_ado_trials_not_in_item_rts():
+    aggregate = ResponseAggregate()
+    aggregate.record("t1_small_gain", 1, "LL", 1.0)
+    aggregate.record("t1_small_gain", 1, "SS", 3.0)
+    aggregate.record("t1_small_gain", "", "LL", 9.0)  # ADO
+    assert aggregate.median_rts() == {("t1_small_gain", 1): (2.0, 2)}
+    assert aggregate.ll_rates()["t1_small_gain"] == (2 / 3, 3)
+    assert aggregate.n_trials == 3
@@ -0,0 +1,38 @@
+import break_timer
+
+# ==========================================
+# 휴식 마감: 서버 시계 기준 남은 시간, 연결 끊김 일시정지
+# ==========================================
+
+
+def test_wall_clock_rule_ignores_gaps():
+    state = break_timer.start(600, now=1000)
+    assert break_timer.poll(state, now=1010) == 590
+    # 기본 규칙은 연결이 끊겨 있던 시간도 휴식으로 침
+    assert break_timer.poll(state, now=1500) == 100
+    assert break_timer.poll(state, now=1700) == 0.0
+    assert state["paused_sec"] == 0 and state["pauses"] == []
+
+
+def test_disconnect_rule_pauses_after_grace():
+    state = break_timer.start(600, now=1000)
+    assert break_timer.poll(state, now=1020, rule="disconnect", grace=30) == 580
+    # 마지막 확인 (1020) 뒤 grace 30초까지는 휴식, 그 뒤 1050~1250 의 200초는 일시정지
+    assert break_timer.poll(state, now=1250, rule="disconnect", grace=30) == 550
+    assert state["pauses"] == [[1050, 1250]] and state["paused_sec"] == 200 and state["deadline"] == 1800
+    # grace 안의 간격은 일시정지가 아님
+    assert break_timer.poll(state, now=1275, rule="disconnect", grace=30) == 525
+    assert len(state["pauses"]) == 1
+    assert break_timer.poll(state, now=1800, rule="disconnect", grace=1000) == 0.0
+
+
+def test_log_row_excludes_pauses():
+    state = break_timer.start(600, now=1000)
+    break_timer.poll(state, now=1020, rule="disconnect", grace=30)
+    break_timer.poll(state, now=1250, rule="disconnect", grace=30)
+    break_timer.finish(state, now=1800)
+    break_timer.finish(state, now=1900)  # 두 번째 완료 처리는 무시
+    row = break_timer.log_row(state, "bench", "v2")
+    assert row[:2] == ["bench", "v2"]
+    assert row[4:] == [600, 600.0, 200.0, 1]
+    assert len(row) == len(break_timer.BREAK_HEADERS)
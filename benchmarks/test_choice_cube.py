@@ -0,0 +1,71 @@
+import os
+
+from choice_cube import ChoiceCube, cube_files, cube_from_rows, merge_files, replica_path
+from conftest import make_responses
+from task_spec import load_task_spec
+
+# ==========================================
+# 선택 큐브: 저장 시 갱신 · 그래프용 조회
+# ==========================================
+
+
+def test_cube_add_participant(benchmark):
+    cube = ChoiceCube(load_task_spec())
+    responses = make_responses()
+    benchmark(cube.add, responses)
+    assert cube.counts.sum() == cube.participants * len(responses)
+
+
+def test_cube_p_ll(benchmark):
+    cube = ChoiceCube(load_task_spec())
+    cube.add(make_responses())
+    p, n = benchmark(cube.p_ll, "t1_small_gain", 1)
+    assert n == 1
+
+
+def test_cube_curve(benchmark):
+    cube = ChoiceCube(load_task_spec())
+    cube.add(make_responses())
+    ratio, _, p, n = benchmark(cube.curve, "gain")
+    assert len(ratio) == len(p) == len(n) > 0
+
+
+def test_cube_save(benchmark, tmp_path):
+    cube = ChoiceCube(load_task_spec())
+    cube.add(make_responses())
+    path = str(tmp_path / "cube.npz")
+    benchmark(cube.save, path)
+    assert ChoiceCube(load_task_spec(), path).loaded
+
+
+def test_cube_from_rows_per_experiment():
+    """큐브는 실험별: 같은 이름이라도 실험이 다르면 다른 참여자이고, experiment 로 그 실험의 행만 고름"""
+    rows = [dict(r, participant="p1", experiment="main") for r in make_responses()]
+    rows += [dict(r, participant="p1", experiment="en") for r in make_responses()]
+    spec = load_task_spec()
+    assert cube_from_rows(rows, spec).participants == 2
+    cube = cube_from_rows(rows, spec, "en")
+    assert cube.participants == 1 and cube.counts.sum() == len(make_responses())
+
+
+def test_replica_files_merged(tmp_path):
+    """서버마다 자기 파일에만 쓰고 읽을 때 합침 (한 서버가 다시 저장해도 다른 서버의 수가 남음)"""
+    spec = load_task_spec()
+    cube_dir = str(tmp_path)
+    a = ChoiceCube(spec, replica_path(cube_dir, "main", "host-a:101"))
+    b = ChoiceCube(spec, replica_path(cube_dir, "main", "host-b:202"))
+    a.add(make_responses())
+    a.save()
+    for _ in range(2):
+        b.add(make_responses())
+    b.save()
+    ChoiceCube(spec).save(os.path.join(cube_dir, "main.npz"))  # 서버별로 나누기 전의 파일도 합침
+    ChoiceCube(spec).save(replica_path(cube_dir, "en", "host-a:101"))
+    assert len(cube_files(cube_dir, "main")) == 3 and cube_files(cube_dir, "main", exclude=a.path) == sorted([
+        b.path, os.path.join(cube_dir, "main.npz"),
+    ])
+    assert merge_files(spec, cube_files(cube_dir, "main", exclude=a.path), base=a).participants == 3
+    a.add(make_responses())
+    a.save()
+    merged = merge_files(spec, cube_files(cube_dir, "main"))
+    assert merged.participants == 4 and merged.counts.sum() == 4 * len(make_responses())
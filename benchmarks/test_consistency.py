@@ -0,0 +1,65 @@
+from consistency import ConsistencyChecker, is_monotone
+from task_spec import load_task_spec
+
+# ==========================================
+# 일관성 검사: 단조성, 흩어진 행, 블록별 같은 선택
+# ==========================================
+
+
+def rows_for(participant, task, choices):
+    return [
+        {"participant": participant, "task": task["id"], "item": str(i + 1), "choice": c, "rt_sec": "1.0"}
+        for i, c in enumerate(choices)
+    ]
+
+
+def test_is_monotone():
+    assert is_monotone([False, False, True, True], 1)
+    assert not is_monotone([False, True, False, True], 1)
+    assert is_monotone([True, True, False], -1)
+    assert not is_monotone([False, True], -1)
+
+
+def test_interleaved_participant_reported_once():
+    spec = load_task_spec()
+    task = spec.tasks[0]
+    n = len(task["vals"])
+    a = rows_for("A", task, ["SS"] * (n - 1) + ["LL"])
+    b = rows_for("B", task, ["SS", "LL"] * (n // 2) + ["SS"] * (n % 2))
+    results = list(ConsistencyChecker(spec).check(a[:2] + b + a[2:]))
+    assert sorted(r["participant"] for r in results) == ["A", "B"]
+    by_name = {r["participant"]: r for r in results}
+    assert by_name["A"]["n_trials"] == n and by_name["A"]["nonmonotone_blocks"] == 0
+    assert by_name["B"]["nonmonotone_tasks"] == task["id"]
+
+
+def test_straightlining_per_block():
+    spec = load_task_spec()
+    first, second = spec.tasks[0], spec.tasks[1]
+    rows = rows_for("A", first, ["LL"] * len(first["vals"])) + rows_for("A", second, ["SS", "LL"] + ["LL"] * (len(second["vals"]) - 2))
+    result = next(ConsistencyChecker(spec, max_straightlined=0).check(rows))
+    assert result["straightlined_blocks"] == 1 and result["straightlined_tasks"] == first["id"]
+    assert result["exclude"]
+    assert not next(ConsistencyChecker(spec).check(rows))["exclude"]
+
+
+def test_ado_rows_skip_monotonicity():
+    spec = load_task_spec()
+    task = spec.tasks[0]
+    rows = [dict(r, item="") for r in rows_for("A", task, ["LL", "SS", "LL"])]
+    result = next(ConsistencyChecker(spec).check(rows))
+    assert result["n_trials"] == 3 and result["nonmonotone_blocks"] == 0 and result["straightlined_blocks"] == 0
+
+
+def test_same_name_in_two_experiments():
+    """실험이 다르면 같은 이름도 다른 참여자 (experiment 열이 없는 이전 행은 실험 id 가 빈 문자열)"""
+    spec = load_task_spec()
+    task = spec.tasks[0]
+    n = len(task["vals"])
+    rows = [dict(r, experiment="main") for r in rows_for("A", task, ["SS"] * n)]
+    rows += [dict(r, experiment="en") for r in rows_for("A", task, ["LL"] * n)]
+    rows += rows_for("A", task, ["SS"] * n)
+    results = list(ConsistencyChecker(spec).check(rows))
+    assert sorted((r["experiment"], r["participant"], r["n_trials"]) for r in results) == [
+        ("", "A", n), ("en", "A", n), ("main", "A", n),
+    ]
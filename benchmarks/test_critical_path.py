@@ -0,0 +1,86 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import experiment
+from checkpoint import open_checkpoint_store
+from conftest import ROOT
+
+# ==========================================
+# 클릭 한 번에 실행되는 함수들
+# ==========================================
+
+
+def test_get_question_text(benchmark, session):
+    task = experiment.get_spec().tasks[3]
+    result = benchmark(experiment.get_question_text, task, 2)
+    assert result[3:] == (500000, 550000)
+
+
+def test_record_response(benchmark, session):
+    def record():
+        experiment.record_response("LL", 500000, 505000, "t1_small_gain", 1)
+
+    benchmark(record)
+    assert session.responses[-1]["choice"] == "LL"
+
+
+def test_next_question(benchmark, session):
+    def setup():
+        session.task_idx = 2
+        session.item_idx = 4
+
+    benchmark.pedantic(experiment.next_question, setup=setup, rounds=2000)
+    assert (session.task_idx, session.item_idx) == (3, 0)
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_save_checkpoint(benchmark, session, tmp_path, backend):
+    """클릭마다 하는 체크포인트 저장 (30문항 응답 기준). sqlite 는 여러 서버가 공유하는 저장소"""
+    store = open_checkpoint_store(f"sqlite:///{tmp_path / 'state.db'}" if backend == "sqlite" else None)
+    for i in range(30):
+        experiment.record_response("LL", 500000, 505000, "t1_small_gain", i % 5 + 1)
+
+    benchmark(store.save, ("main", "bench"), session)
+    assert len(store.load(("main", "bench"))["responses"]) == 30
+
+
+# ==========================================
+# 단계별 main() 재실행 (AppTest)
+# ==========================================
+
+
+def new_app():
+    return AppTest.from_file(os.path.join(ROOT, "streamlit.py"), default_timeout=30)
+
+
+def test_main_rerun_intro(benchmark):
+    at = new_app().run()
+    benchmark(at.run)
+    assert at.session_state.current_phase == "intro"
+
+
+def test_main_rerun_task_click(benchmark, fake_sheet):
+    fake_sheet(0)
+    at = new_app().run()
+    at.text_input[0].input("bench")
+    at.button[0].click().run()
+
+    def setup():
+        at.session_state.task_idx = 0
+        at.session_state.item_idx = 0
+
+    def click():
+        at.button[1].click().run()
+
+    benchmark.pedantic(click, setup=setup, rounds=30)
+    assert at.session_state.current_phase == "task"
+
+
+def test_main_rerun_done(benchmark):
+    at = new_app().run()
+    at.session_state.current_phase = "done"
+    at.run()
+    benchmark(at.run)
+    assert at.session_state.current_phase == "done"
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import numpy as np
+
+from discount_fit import choices_from_rows, design_from_spec, fit_model, trials_from_rows
+from synthetic import HEADERS, Simulator
+from task_spec import load_task_spec
+
+# ==========================================
+# 할인 모형 추정: 행에 저장된 실제 금액·지연으로 설계 구성
+# ==========================================
+
+
+def sim_rows(n=20):
+    spec = load_task_spec()
+    sim = Simulator(spec, seed=1)
+    now = datetime.now()
+    return spec, [dict(zip(HEADERS, r)) for r in sim.rows(sim.chunk(n, now), now)]
+
+
+def test_row_design_matches_spec_design_for_fixed_items():
+    spec, rows = sim_rows()
+    participants, y = choices_from_rows(rows, spec)
+    row_participants, row_y, design = trials_from_rows(rows, spec)
+    assert participants == row_participants
+    np.testing.assert_array_equal(y, row_y)
+    for row_a, spec_a in zip(design, design_from_spec(spec)):
+        np.testing.assert_allclose(row_a, np.broadcast_to(spec_a, row_a.shape))
+    grid = fit_model("hyperbolic", y, design_from_spec(spec))
+    per_row = fit_model("hyperbolic", row_y, design)
+    np.testing.assert_allclose(per_row["theta"], grid["theta"], atol=1e-6)
+
+
+def test_ado_rows_use_stored_delays():
+    """문항 번호 없는 ADO 행: 격자 변환에서는 빠지고, 행 단위 설계에서는 저장된 지연이 쓰임"""
+    spec, rows = sim_rows(2)
+    ado_rows = [dict(r, item="", ll_delay=24) for r in rows if r["participant"] == rows[0]["participant"]]
+    ado_rows[1]["ss_delay"] = ""  # 지연 열이 없던 행은 과제 유형 값으로
+    participants, y = choices_from_rows(ado_rows, spec)
+    assert participants == [] and y.shape == (0, spec.total_questions)
+    participants, y, (ss, ll, ss_t, ll_t, sign) = trials_from_rows(ado_rows, spec)
+    assert participants == [("main", rows[0]["participant"])] and y.shape == (1, len(ado_rows))
+    assert np.all(ll_t == 2.0)
+    assert ss_t[0, 1] == spec.delays[ado_rows[1]["task"]][0] / 12
+
+
+def test_ragged_participants_padded():
+    spec, rows = sim_rows(2)
+    first = rows[0]["participant"]
+    rows = [r for r in rows if r["participant"] != first or int(r["item"]) == 1]
+    participants, y, design = trials_from_rows(rows, spec)
+    assert np.isnan(y[0]).sum() == y.shape[1] - len(spec.tasks)
+    fit = fit_model("hyperbolic", y, design)
+    assert np.all(np.isfinite(fit["loglik"]))
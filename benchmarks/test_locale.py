@@ -0,0 +1,160 @@
+import json
+import os
+import re
+import time
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import experiment
+from admission import AdmissionControl
+from choice_cube import ChoiceCube
+from conftest import ROOT, FakeWorksheet
+from i18n import load_locale
+from task_spec import DEFAULT_SPEC_PATH, compile_spec, load_task_spec
+
+# ==========================================
+# 로케일: 시작 시 한 번 컴파일 · 문항마다는 조회만
+# ==========================================
+
+
+@pytest.mark.parametrize("locale", ["ko", "en"])
+def test_question_lookup(benchmark, locale):
+    """문항 문구 조회 비용은 로케일과 무관 (미리 만든 튜플 인덱싱)"""
+    spec = load_task_spec(DEFAULT_SPEC_PATH, locale)
+    task = spec.tasks[3]
+    result = benchmark(spec.question, task, 2)
+    assert result[3:] == (500000, 550000)
+
+
+@pytest.mark.parametrize("locale", ["ko", "en"])
+def test_compile_spec(benchmark, locale):
+    """로케일별 과제 정의 컴파일 (프로세스 시작 시 한 번)"""
+    with open(DEFAULT_SPEC_PATH, encoding="utf-8") as f:
+        raw = json.load(f)
+    spec = benchmark(compile_spec, raw, load_locale(locale))
+    assert spec.locale.code == locale
+
+
+def test_cube_hash_ignores_locale():
+    assert ChoiceCube(load_task_spec(DEFAULT_SPEC_PATH, "ko")).hash == ChoiceCube(load_task_spec(DEFAULT_SPEC_PATH, "en")).hash
+
+
+# ==========================================
+# en 실험의 모든 화면에 한국어 문구가 남지 않았는지 (AppTest)
+# ==========================================
+
+HANGUL = re.compile("[가-힣]")
+
+
+def visible_text(at):
+    """화면에 보이는 문구 (스타일 블록 제외)"""
+    texts = [el.value for kind in ("markdown", "caption", "subheader", "error", "warning", "success", "info")
+             for el in getattr(at, kind)]
+    texts += [el.label for el in at.button] + [el.label for el in at.text_input] + [el.label for el in at.metric]
+    texts += [str(list(el.value.columns)) for el in at.dataframe]
+    texts += [el.proto.label for el in at.get("download_button")] + [el.proto.label for el in at.get("file_uploader")]
+    return "\n".join(re.sub(r"<style>.*?</style>", "", str(t), flags=re.S) for t in texts)
+
+
+def en_app(**query):
+    at = AppTest.from_file(os.path.join(ROOT, "streamlit.py"), default_timeout=30)
+    at.query_params["exp"] = "en"
+    at.query_params.update(query)
+    at.secrets["dashboard_key"] = "operator-key"
+    return at
+
+
+def assert_english(at, phase=None):
+    assert not at.exception
+    if phase is not None:
+        assert at.session_state.current_phase == phase
+    text = visible_text(at)
+    assert text and not HANGUL.search(text), text
+
+
+def test_en_participant_pages(fake_sheet, monkeypatch):
+    fake_sheet(0)
+    at = en_app().run()
+    assert_english(at, "intro")
+    assert "Start" in visible_text(at)
+
+    at.text_input[0].input("en-bench")
+    at.button[0].click().run()
+    assert_english(at, "task")
+
+    at.session_state.current_phase = "break"
+    at.session_state.break_start_time = time.time()
+    at.session_state.break_state = None
+    at.run()
+    assert_english(at, "break")
+
+    at.session_state.current_phase = "done"
+    at.run()
+    assert_english(at, "done")
+    assert "The break is over" in visible_text(at)
+
+    # 입장 제한에 걸린 대기 화면
+    admission = AdmissionControl(1)
+    admission.request("other", lambda session_id: True)
+    monkeypatch.setattr(experiment, "get_admission", lambda: admission)
+    monkeypatch.setattr(experiment, "is_session_active", lambda session_id: session_id == "other")
+    at = en_app().run()
+    at.session_state.participant_name = "en-queued"
+    at.session_state.queued_at = time.time()
+    at.run()
+    assert_english(at, "intro")
+    assert "Please wait" in visible_text(at)
+
+
+@pytest.mark.parametrize("view, expected", [
+    ("dashboard", "Server status"), ("offline", "Download offline bundle"), ("sync", "Result file exported"),
+])
+def test_en_operator_pages(view, expected, fake_sheet):
+    fake_sheet(0)
+    at = en_app(view=view, key="operator-key").run()
+    assert_english(at)
+    assert expected in visible_text(at)
+    at = en_app(view=view, key="wrong").run()
+    assert_english(at)
+    assert "Access denied." in visible_text(at)
+
+
+def test_ko_pages_detected():
+    """검사가 실제로 한국어 문구를 찾는지 (기본 실험은 ko)"""
+    at = AppTest.from_file(os.path.join(ROOT, "streamlit.py"), default_timeout=30).run()
+    assert HANGUL.search(visible_text(at))
+
+
+# ==========================================
+# 실험별 라우팅: ?exp= 로 고른 실험의 로케일·시트로 저장
+# ==========================================
+
+
+def test_experiments_routed_to_own_locale_and_sheet(monkeypatch):
+    sheets = {}
+
+    def open_worksheet(sheet_id, title=None, cols=26):
+        return sheets.setdefault((sheet_id, title), FakeWorksheet())
+    monkeypatch.setattr(experiment, "open_worksheet", open_worksheet)
+    for exp_id, start in (("main", "시작하기"), ("en", "Start")):
+        at = AppTest.from_file(os.path.join(ROOT, "streamlit.py"), default_timeout=30)
+        at.query_params["exp"] = exp_id
+        at.secrets["sheet_id"] = "sheet-default"
+        at.secrets["sheet_ids"] = {"main": "sheet-main", "en": "sheet-en"}
+        at.run()
+        assert at.session_state.experiment_id == exp_id
+        assert at.button[0].label == start and bool(HANGUL.search(visible_text(at))) == (exp_id == "main")
+        at.text_input[0].input(f"{exp_id}-bench")
+        at.button[0].click().run()
+        while at.session_state.current_phase == "task":
+            at.button[0].click().run()
+        assert not at.exception
+
+    assert {key for key in sheets if key[1] is None} == {("sheet-main", None), ("sheet-en", None)}
+    for exp_id in ("main", "en"):
+        rows = sheets[(f"sheet-{exp_id}", None)].rows
+        assert rows[0] == experiment.HEADERS and len(rows) == 1 + load_task_spec().total_questions
+        assert {(r[0], r[-1]) for r in rows[1:]} == {(f"{exp_id}-bench", exp_id)}
+        # 요약 행도 같은 실험의 시트에
+        assert [r[:2] for r in sheets[(f"sheet-{exp_id}", "summary")].rows[1:]] == [[f"{exp_id}-bench", exp_id]]
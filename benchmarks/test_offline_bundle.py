@@ -0,0 +1,101 @@
+import pytest
+
+import experiment
+from ado import design_id
+from checkpoint import CheckpointStore
+from offline_bundle import (
+    PAYLOAD_VERSION, BundleError, ack_token, bundle_key, compile_trials, decode_session, session_message, sign,
+    spec_hash,
+)
+from participant_ids import Roster, generate_ids
+
+# ==========================================
+# 오프라인 번들 결과: 서명 확인, 명단 확인, 저장소 기준 중복 제거
+# ==========================================
+
+
+def bundle_session(spec, key, session_id="s1", participant="bench"):
+    n = len(compile_trials(spec))
+    raw = {
+        "v": PAYLOAD_VERSION, "h": spec_hash(compile_trials(spec)), "id": session_id, "p": participant,
+        "c": "SL" * (n // 2), "rt": [1234] * n,
+    }
+    raw["k"] = sign(key, session_message(raw))
+    return raw
+
+
+@pytest.fixture
+def key(session):
+    return bundle_key("secret", session.experiment_id, spec_hash(compile_trials(experiment.get_spec())))
+
+
+def test_signature_required(session, key):
+    spec = experiment.get_spec()
+    raw = bundle_session(spec, key)
+    session_id, participant, responses = decode_session(raw, spec, key)
+    assert (session_id, participant, len(responses)) == ("s1", "bench", len(compile_trials(spec)))
+    for tampered in ({**raw, "c": "L" + raw["c"][1:]}, {**raw, "p": "other"}, {k: v for k, v in raw.items() if k != "k"}):
+        with pytest.raises(BundleError):
+            decode_session(tampered, spec, key)
+    # 다른 비밀값으로 만든 번들
+    other = bundle_key("guess", session.experiment_id, raw["h"])
+    with pytest.raises(BundleError):
+        decode_session(bundle_session(spec, other), spec, key)
+    assert ack_token(key, "s1") != ack_token(other, "s1")
+
+
+def test_decoded_rows_match_live_rows(session, key):
+    """오프라인 세션도 실시간 저장과 같은 design·지연 열을 채우고, 음수 RT 는 서명이 맞아도 거부"""
+    spec = experiment.get_spec()
+    _, _, responses = decode_session(bundle_session(spec, key), spec, key)
+    row = dict(zip(experiment.HEADERS, experiment.build_rows(responses, "bench", session.experiment_id)[0]))
+    task_id = responses[0]["task"]
+    assert row["design"] == design_id(task_id, responses[0]["ll_amount"])
+    assert (row["ss_delay"], row["ll_delay"]) == tuple(spec.delays[task_id])
+    for bad in (-5, 1.5, True, "1234"):
+        raw = bundle_session(spec, key)
+        raw["rt"][0] = bad
+        raw["k"] = sign(key, session_message(raw))
+        with pytest.raises(BundleError):
+            decode_session(raw, spec, key)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = CheckpointStore()
+    monkeypatch.setattr(experiment, "get_checkpoint_store", lambda: store)
+    return store
+
+
+def test_sync_saved_once(session, key, store, fake_sheet):
+    sheet = fake_sheet(0)
+    raw = bundle_session(experiment.get_spec(), key)
+    assert experiment.save_offline_session(raw, key) == ("bench", "sync_saved", None)
+    n_rows = len(sheet.rows)
+    # 다른 서버 프로세스도 같은 저장소의 표시를 보므로 다시 보내도 저장하지 않음
+    assert experiment.save_offline_session(raw, key) == ("bench", "sync_duplicate", None)
+    assert len(sheet.rows) == n_rows
+    assert len(sheet.worksheets[experiment.SUMMARY_WORKSHEET].rows) == 2
+
+
+def test_sync_failed_save_kept(session, key, store, monkeypatch):
+    monkeypatch.setattr(experiment, "get_sheet_id", lambda exp_id: "fake-sheet")
+    monkeypatch.setattr(experiment, "open_worksheet", lambda sheet_id, title=None, cols=26: None)
+    raw = bundle_session(experiment.get_spec(), key)
+    assert experiment.save_offline_session(raw, key) == ("bench", "sync_kept", None)
+    # 실패한 저장은 다시 보낼 작업으로 남고, 번들이 다시 보내도 두 번 보관되지 않음
+    assert experiment.save_offline_session(raw, key)[1] == "sync_duplicate"
+    assert len(store.failed_saves()) == 1
+
+
+def test_sync_checks_roster(session, key, store, fake_sheet, monkeypatch):
+    fake_sheet(0)
+    ids = generate_ids(3, prefix="DD")
+    roster = Roster(ids, store=store)
+    monkeypatch.setattr(experiment, "get_roster", lambda: roster)
+    spec = experiment.get_spec()
+    _, status, _ = experiment.save_offline_session(bundle_session(spec, key, "s1", "DD" + generate_ids(1)[0]), key)
+    assert status == "sync_not_in_roster"
+    participant, status, _ = experiment.save_offline_session(bundle_session(spec, key, "s2", ids[0].lower()), key)
+    assert (participant, status) == (ids[0], "sync_saved")
+    assert roster.is_completed(session.experiment_id, ids[0])
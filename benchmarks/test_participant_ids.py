@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from checkpoint import CheckpointStore, SqliteCheckpointStore
+from participant_ids import ALPHABET, Roster, check_char, generate_ids, is_well_formed
+
+# ==========================================
+# 참여자 ID 명단: 검증 문자, 저장소 공유 점유·완료 기록
+# ==========================================
+
+IDS = generate_ids(5, prefix="DD")
+
+
+def test_check_char_catches_typo_and_swap():
+    pid = IDS[0]
+    assert is_well_formed(pid, "DD")
+    code = pid[2:]
+    for i in range(len(code)):
+        for c in ALPHABET:
+            if c != code[i]:
+                assert not is_well_formed("DD" + code[:i] + c + code[i + 1:], "DD")
+    for i in range(len(code) - 1):
+        if code[i] != code[i + 1]:
+            swapped = code[:i] + code[i + 1] + code[i] + code[i + 2:]
+            assert not is_well_formed("DD" + swapped, "DD")
+    assert check_char(code[:-1]) == code[-1]
+
+
+def test_lookup_normalizes_and_classifies():
+    roster = Roster(IDS)
+    pid = IDS[0]
+    assert roster.lookup(f" {pid[:4].lower()}-{pid[4:]} ") == (pid, "ok")
+    body = generate_ids(1)[0]
+    assert roster.lookup("DD" + body) == (None, "unknown")
+    assert roster.lookup("DD" + body[:-1] + ("2" if body[-1] != "2" else "3"))[1] == "typo"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def stores(request, tmp_path):
+    """같은 저장소를 보는 두 서버 프로세스의 저장소 (메모리는 한 프로세스 안에서만 공유)"""
+    if request.param == "memory":
+        store = CheckpointStore()
+        return store, store
+    path = str(tmp_path / "state.db")
+    return SqliteCheckpointStore(path), SqliteCheckpointStore(path)
+
+
+def test_claim_shared_between_replicas(stores):
+    a = Roster(IDS, store=stores[0])
+    b = Roster(IDS, store=stores[1])
+    pid = IDS[0]
+    assert a.claim(pid, "r1/s1")
+    assert not b.claim(pid, "r2/s2")
+    assert not b.claim(pid, "r2/s2", can_take=lambda owner: False)
+    assert b.owner(pid) == "r1/s1"
+    # 같은 소유자는 만료만 연장, 넘겨받기 허용이면 새 소유자로
+    assert a.claim(pid, "r1/s1")
+    assert b.claim(pid, "r2/s2", can_take=lambda owner: owner == "r1/s1")
+    assert a.owner(pid) == "r2/s2"
+    # 소유자가 아니면 해제되지 않음
+    a.release(pid, "r1/s1")
+    assert a.owner(pid) == "r2/s2"
+    b.release(pid, "r2/s2")
+    assert a.claim(pid, "r1/s3")
+
+
+def test_claim_expires(stores):
+    a = Roster(IDS, store=stores[0], claim_ttl=0.05)
+    b = Roster(IDS, store=stores[1], claim_ttl=0.05)
+    assert a.claim(IDS[1], "r1/s1")
+    time.sleep(0.1)
+    assert a.owner(IDS[1]) is None
+    assert b.claim(IDS[1], "r2/s2")
+
+
+def test_completion_shared_and_journaled(stores, tmp_path):
+    journal = str(tmp_path / "completed.tsv")
+    a = Roster(IDS, journal_path=journal, store=stores[0])
+    b = Roster(IDS, store=stores[1])
+    a.complete("main", IDS[2])
+    a.complete("main", IDS[2])
+    assert b.is_completed("main", IDS[2]) and not b.is_completed("ado", IDS[2])
+    with open(journal, encoding="utf-8") as f:
+        assert len(f.readlines()) == 1
+    # 메모리 저장소로 재시작해도 완료 기록 파일에서 복원
+    assert Roster(IDS, journal_path=journal).is_completed("main", IDS[2])
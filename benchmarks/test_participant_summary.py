@@ -0,0 +1,78 @@
+import csv
+from datetime import datetime
+
+import pytest
+
+import participant_summary
+from discount_fit import choices_from_rows
+from synthetic import HEADERS, Simulator
+from task_spec import load_task_spec
+
+# ==========================================
+# 분석 입력: 긴 형식 CSV 피벗 vs 참여자별 요약 CSV
+# ==========================================
+
+N_PARTICIPANTS = 5_000
+
+
+@pytest.fixture(scope="module")
+def files(tmp_path_factory):
+    spec = load_task_spec()
+    sim = Simulator(spec, seed=0)
+    now = datetime.now()
+    cols = sim.chunk(N_PARTICIPANTS, now)
+    rows = sim.rows(cols, now)
+    root = tmp_path_factory.mktemp("summary")
+    paths = {"long": str(root / "long.csv"), "summary": str(root / "summary.csv")}
+    with open(paths["long"], "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        writer.writerows(rows)
+    by_participant = {}
+    for r in rows:
+        by_participant.setdefault(r[0], []).append(dict(zip(HEADERS, r)))
+    with open(paths["summary"], "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(participant_summary.summary_headers(spec))
+        for participant, responses in by_participant.items():
+            writer.writerow(participant_summary.summary_row(responses, participant, "main", spec))
+    return spec, paths
+
+
+def test_choices_from_long_rows(benchmark, files):
+    spec, paths = files
+
+    def read():
+        with open(paths["long"], newline="", encoding="utf-8") as f:
+            return choices_from_rows(csv.DictReader(f), spec)
+
+    participants, y = benchmark(read)
+    assert y.shape == (N_PARTICIPANTS, spec.total_questions)
+
+
+def test_choices_from_summary(benchmark, files):
+    spec, paths = files
+
+    def read():
+        with open(paths["summary"], newline="", encoding="utf-8") as f:
+            return participant_summary.choices_from_summary(csv.DictReader(f), spec)
+
+    participants, y = benchmark(read)
+    assert y.shape == (N_PARTICIPANTS, spec.total_questions)
+
+
+def test_summary_row_mapping():
+    """문항 열은 과제 정의 순서, ADO 행 (문항 번호 없음) 은 격자에 넣지 않음"""
+    spec = load_task_spec()
+    second = spec.tasks[1]
+    responses = [
+        {"task": second["id"], "item": 2, "choice": "LL", "rt_sec": 1.5},
+        {"task": second["id"], "item": "", "choice": "LL", "rt_sec": 9.0},
+    ]
+    row = participant_summary.summary_row(responses, "p1", "main", spec, started_at=100.0, submitted_at=160.0)
+    record = dict(zip(participant_summary.summary_headers(spec), row))
+    col = spec.offsets[1] + 1
+    width = len(str(spec.total_questions))
+    assert record[f"c{col + 1:0{width}d}"] == 1 and record[f"rt{col + 1:0{width}d}"] == 1.5
+    assert record["n_trials"] == 1 and record["session_sec"] == 60.0
+    assert record[f"{second['id']}_ll"] == 1 and record[f"{spec.tasks[0]['id']}_ll"] == ""
@@ -0,0 +1,50 @@
+import pytest
+
+import preload
+from task_spec import DEFAULT_SPEC_PATH, load_task_spec
+
+# ==========================================
+# 미리 보내기: 받은 선택 중 기록할 항목 고르기
+# ==========================================
+
+SPEC = load_task_spec(DEFAULT_SPEC_PATH)
+
+
+def item(seq, choice="LL", rt_ms=1234):
+    task_idx, item_idx = preload.trial_at(SPEC, seq)
+    return {"seq": seq, "task": SPEC.tasks[task_idx]["id"], "item": item_idx + 1, "choice": choice, "rt_ms": rt_ms}
+
+
+def test_trial_at_matches_offsets():
+    seqs = [(t, i) for t, task in enumerate(SPEC.tasks) for i in range(len(task["vals"]))]
+    assert [preload.trial_at(SPEC, seq) for seq in range(SPEC.total_questions)] == seqs
+    assert preload.trial_at(SPEC, -1) is None and preload.trial_at(SPEC, SPEC.total_questions) is None
+
+
+def test_accept_contiguous_from_base():
+    # 이미 기록한 순번 (재전송) 은 건너뛰고, 빠진 순번 뒤는 다음 재전송까지 보류
+    items = [item(3), item(5), item(6), item(8)]
+    assert [a[0] for a in preload.accept(SPEC, 5, items)] == [5, 6]
+    assert preload.accept(SPEC, 4, items) == []
+    (accepted,) = preload.accept(SPEC, 3, [item(3, "SS", 850)])
+    assert accepted[3:] == ("SS", 0.85)
+
+
+def test_accept_stops_at_mismatched_trial():
+    bad = dict(item(1), item=item(1)["item"] + 1)
+    assert [a[0] for a in preload.accept(SPEC, 0, [item(0), bad, item(2)])] == [0]
+    assert preload.accept(SPEC, 0, [item(0, choice="X")]) == []
+    last = SPEC.total_questions - 1
+    assert [a[0] for a in preload.accept(SPEC, last, [item(last), {"seq": last + 1, "choice": "LL"}])] == [last]
+
+
+@pytest.mark.parametrize("rt_ms", [None, "1234", float("nan"), float("inf"), -1, True])
+def test_accept_rejects_bad_rt(rt_ms):
+    items = [item(0), item(1, rt_ms=rt_ms)]
+    if rt_ms is None:
+        del items[1]["rt_ms"]
+    assert [a[0] for a in preload.accept(SPEC, 0, items)] == [0]
+
+
+def test_accept_ignores_non_dict_items():
+    assert [a[0] for a in preload.accept(SPEC, 0, ["junk", None, item(0)])] == [0]
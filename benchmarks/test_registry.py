@@ -0,0 +1,196 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+from reaper import SessionReaper
+from registry import SessionRegistry
+
+# ==========================================
+# 세션 목록·방치 세션 정리
+# ==========================================
+
+
+def test_in_flight_and_stale():
+    registry = SessionRegistry()
+    registry.update("a", phase="intro")
+    registry.update("b", phase="task", n_responses=3)
+    registry.update("c", phase="break", extra_idle=600)
+    assert registry.in_flight() == 2
+    assert registry.counts_by_phase() == {"intro": 1, "task": 1, "break": 1}
+    # 같은 단계의 재실행은 활동으로 치지 않고, 클릭 (touch) 과 단계 변경만 활동
+    for info in registry._sessions.values():
+        info["last_activity"] -= 100
+    registry.update("a", phase="intro")
+    registry.touch("b")
+    assert {info["session_id"] for info in registry.stale(50)} == {"a"}
+    registry.update("a", phase="task")
+    assert registry.stale(50) == []
+    # 휴식 중인 세션은 휴식 시간만큼 더 기다림
+    assert {info["session_id"] for info in registry.stale(50, now=time.time() + 200)} == {"a", "b"}
+    registry.finish("b")
+    assert registry.get("b") is None and registry.in_flight() == 2
+
+
+def test_reaped_marks_pruned():
+    registry = SessionRegistry()
+    registry.update("a", phase="task")
+    assert registry.reap("a")["phase"] == "task" and registry.reap("a") is None
+    registry.prune_reaped(max_age=60)
+    assert registry.is_reaped("a")
+    registry._reaped["a"] -= 120
+    registry.prune_reaped(max_age=60)
+    assert not registry.is_reaped("a") and registry.reaped_total == 1
+
+
+def test_drain_waits_for_sessions_and_saves():
+    registry = SessionRegistry()
+    registry.update("a", phase="task")
+    future = Future()
+    registry.track_save(future)
+    registry.start_drain()
+    assert not registry.accepting and not registry.drained()
+    registry.finish("a")
+    assert registry.pending_saves() == 1 and not registry.drained()
+    # flush 는 시간 안에 끝나지 않은 저장 수를 돌려줌
+    assert registry.flush(timeout=0.01) == 1
+    threading.Timer(0.05, future.set_result, [True]).start()
+    assert registry.flush(timeout=5) == 0
+    assert registry.drained()
+    registry.cancel_drain()
+    assert registry.accepting and not registry.drained() and registry.drain_started_at is None
+
+
+def test_drain_waits_for_failed_saves_in_memory(tmp_path):
+    """메모리 저장소의 실패한 저장 작업은 재배포하면 사라지므로 남아 있으면 드레인 완료가 아님"""
+    from checkpoint import CheckpointStore, SqliteCheckpointStore
+    registry = SessionRegistry()
+    registry.start_drain()
+    job = {"id": "j1", "participant": "p1", "rows": [["p1"]]}
+    memory, sqlite = CheckpointStore(), SqliteCheckpointStore(str(tmp_path / "state.db"))
+    for store in (memory, sqlite):
+        store.add_failed(job)
+    assert registry.drained() and registry.drained(sqlite)
+    assert not registry.drained(memory)
+    memory.remove_failed("j1")
+    assert registry.drained(memory)
+
+
+def test_reaper_only_marks_sessions():
+    """on_reap 이 없으면 목록에서 빼고 표시만 함 (세션 쪽 객체는 세션 스레드가 다음 실행 때 비움)"""
+    registry = SessionRegistry()
+    registry.update("s1", phase="task", n_responses=1)
+    reaper = SessionReaper(registry, idle_timeout=60, interval=3600)
+    try:
+        later = time.time() + 120
+        registry.update("s2", phase="task", n_responses=0)
+        registry._sessions["s2"]["last_activity"] = later
+        assert reaper.sweep(now=later) == 1
+    finally:
+        reaper.stop()
+    assert registry.is_reaped("s1") and not registry.is_reaped("s2")
+    assert registry.get("s1") is None and registry.reaped_by_phase == {"task": 1}
+
+
+class FakeRuntime:
+    """Streamlit Runtime 대신 세션 id → session_state 를 들고 있는 객체 (close_session 은 이벤트 루프 스레드에서만)"""
+
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+
+    def _get_async_objs(self):
+        return SimpleNamespace(eventloop=self.loop)
+
+    def close_session(self, session_id):
+        assert asyncio.get_running_loop() is self.loop
+        self.sessions.pop(session_id, None)
+
+    def wait_loop(self):
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def test_reaper_closes_session(monkeypatch):
+    """정리된 세션은 재실행을 기다리지 않고 닫혀 session_state 가 해제되고, 입장 자리·ID 점유도 반납"""
+    import experiment
+    from admission import AdmissionControl
+    from checkpoint import CheckpointStore
+    from participant_ids import Roster, generate_ids
+    pid = generate_ids(1, prefix="DD")[0]
+    fake = FakeRuntime({"s1": {"responses": [{"choice": "SS"}] * 30}, "s2": {"responses": []}})
+    monkeypatch.setattr(experiment, "runtime", SimpleNamespace(exists=lambda: True, get_instance=lambda: fake))
+    admission = AdmissionControl(2)
+    admission.request("s1", lambda session_id: True)
+    roster = Roster([pid], store=CheckpointStore())
+    roster.claim(pid, experiment.claim_owner("s1"))
+
+    registry = SessionRegistry()
+    registry.update("s1", phase="task", participant=pid)
+    registry.update("s2", phase="task", participant="other")
+    registry._sessions["s2"]["last_activity"] = time.time() + 120
+    reaper = SessionReaper(registry, idle_timeout=60, interval=3600,
+                           on_reap=experiment.reaped_session_closer(admission, roster))
+    try:
+        assert reaper.sweep(now=time.time() + 120) == 1
+    finally:
+        reaper.stop()
+    fake.wait_loop()
+    assert set(fake.sessions) == {"s2"}
+    assert admission.active() == 0 and roster.owner(pid) is None
+
+
+def test_reaped_click_not_recorded(session, monkeypatch):
+    """정리된 세션의 fragment 클릭은 main() 을 거치지 않아도 기록·체크포인트를 남기지 않음"""
+    import experiment
+    monkeypatch.setattr(experiment, "current_session_id", lambda: "reaped-click")
+    registry = experiment.get_registry()
+    experiment.register_session()
+    task = experiment.get_spec().tasks[0]
+    experiment.answer("SS", task["base"], task["vals"][0], task["id"], 1, 1)
+    key = experiment.checkpoint_key("bench")
+    saved = experiment.get_checkpoint_store().load(key)
+    assert len(session.responses) == 1
+
+    registry.reap("reaped-click")
+    try:
+        experiment.answer("LL", task["base"], task["vals"][1], task["id"], 2, 2)
+        assert len(session.responses) == 1
+        assert experiment.get_checkpoint_store().load(key) == saved
+    finally:
+        registry.acknowledge_reaped("reaped-click")
+        experiment.get_checkpoint_store().clear(key)
+
+
+def test_queue_poll_counts_as_activity_and_reap_frees_seat(monkeypatch):
+    """대기 화면은 확인마다 활동으로 기록되고, 정리되면 대기열 자리를 반납한 채 인트로로"""
+    import os
+    from streamlit.testing.v1 import AppTest
+    import experiment
+    from admission import AdmissionControl
+    from conftest import ROOT
+    admission = AdmissionControl(1)
+    admission.request("other", lambda session_id: True)
+    monkeypatch.setattr(experiment, "get_admission", lambda: admission)
+    monkeypatch.setattr(experiment, "is_session_active", lambda session_id: session_id == "other")
+    registry = experiment.get_registry()
+    at = AppTest.from_file(os.path.join(ROOT, "streamlit.py"), default_timeout=30).run()
+    at.session_state.participant_name = "queued"
+    at.session_state.queued_at = time.time()
+    at.run()
+    (info,) = [i for i in registry.snapshot() if i["participant"] == "queued"]
+    session_id = info["session_id"]
+    assert admission.position(session_id) == 1
+
+    registry._sessions[session_id]["last_activity"] -= 100
+    at.run()
+    assert session_id not in {i["session_id"] for i in registry.stale(50)}
+
+    registry.reap(session_id)
+    at.run()
+    assert not at.exception
+    assert at.session_state.current_phase == "intro" and at.session_state.queued_at is None
+    assert admission.position(session_id) is None and admission.waiting() == 0
+    registry.finish(session_id)
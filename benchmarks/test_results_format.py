@@ -0,0 +1,65 @@
+import csv
+import os
+
+import pytest
+
+import results_format
+from conftest import HEADERS, FakeWorksheet
+
+# ==========================================
+# 내보낸 CSV vs 형식 있는 열 저장 형식 (읽기 시간 · 파일 크기)
+# ==========================================
+
+N_ROWS = 200_000
+
+
+@pytest.fixture(scope="module")
+def files(tmp_path_factory):
+    root = tmp_path_factory.mktemp("results")
+    paths = {"csv": str(root / "results.csv")}
+    with open(paths["csv"], "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        writer.writerows(FakeWorksheet(N_ROWS).rows[1:])
+    table = results_format.read_csv(paths["csv"])
+    for ext in ("parquet", "arrow"):
+        paths[ext] = str(root / f"results.{ext}")
+        results_format.write_results(table, paths[ext])
+    return paths
+
+
+def test_csv_dictreader(benchmark, files):
+    def read():
+        with open(files["csv"], newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+    assert len(benchmark(read)) == N_ROWS
+
+
+def test_old_csv_without_design_columns(tmp_path):
+    """design·지연 열 추가 전에 내보낸 CSV 도 같은 SCHEMA 로 읽고, 새 열은 결측"""
+    path = str(tmp_path / "old.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS[:8])
+        writer.writerows(r[:8] for r in FakeWorksheet(10).rows[1:])
+    table = results_format.read_csv(path)
+    assert table.schema == results_format.SCHEMA
+    assert table.column("ll_delay").null_count == 10
+    row = next(results_format.iter_rows(table))
+    assert row["design"] == "" and row["ll_delay"] == "" and row["experiment"] == "" and row["item"] == 1
+
+
+def test_rows_to_table_matches_csv():
+    rows = FakeWorksheet(5).rows[1:]
+    row = next(results_format.iter_rows(results_format.rows_to_table(rows)))
+    assert row["design"] == "t1_small_gain@505000" and (row["ss_delay"], row["ll_delay"]) == (0, 1)
+    assert row["experiment"] == "main"
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "arrow"])
+def test_read_results(benchmark, files, fmt):
+    table = benchmark(results_format.read_results, files[fmt])
+    assert table.schema == results_format.SCHEMA and table.num_rows == N_ROWS
+    if fmt != "csv":
+        assert os.path.getsize(files[fmt]) < os.path.getsize(files["csv"]) / 5
@@ -0,0 +1,154 @@
+import itertools
+from concurrent.futures import Future
+
+import pytest
+
+import experiment
+from checkpoint import EXPIRE_SWEEP_INTERVAL, CheckpointStore, SqliteCheckpointStore
+from choice_cube import ChoiceCube
+from conftest import make_responses
+
+# ==========================================
+# 저장 작업: 실패 보관·다시 보내기, 저장이 끝난 뒤에 체크포인트 삭제
+# ==========================================
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = CheckpointStore()
+    monkeypatch.setattr(experiment, "get_checkpoint_store", lambda: store)
+    return store
+
+
+class BrokenWorksheet:
+    def row_values(self, row):
+        raise ConnectionError("quota")
+
+
+def test_failed_save_kept_and_retried(session, store, fake_sheet, monkeypatch):
+    monkeypatch.setattr(experiment, "get_sheet_id", lambda exp_id: "fake-sheet")
+    monkeypatch.setattr(experiment, "open_worksheet", lambda sheet_id, title=None, cols=26: BrokenWorksheet())
+    experiment.save_checkpoint()
+    assert not experiment.save_to_sheets(make_responses(), "bench")
+    experiment.clear_checkpoint()
+    # 행은 실패한 작업에 남고, 체크포인트는 삭제 (이어하기로 마지막 문항을 다시 보내 중복되지 않도록)
+    assert experiment.checkpoint_key("bench") not in store
+    (job,) = store.failed_saves()
+    assert job["participant"] == "bench" and len(job["rows"]) == 30
+
+    sheet = fake_sheet(0)
+    (future,) = experiment.retry_failed_saves()
+    assert future.result() and not store.failed_saves()
+    assert len(sheet.rows) == 1 + 30
+    assert "bench" in experiment.get_aggregate(session.experiment_id).completed
+
+
+def test_checkpoint_cleared_after_async_save_settles(session, store):
+    key = experiment.checkpoint_key("bench")
+    for outcome in ("fail", "ok"):
+        experiment.save_checkpoint()
+        future = session.pending_save = Future()
+        experiment.clear_checkpoint()
+        assert key in store  # 전송 중에는 남겨 둠
+        if outcome == "fail":
+            future.set_exception(ConnectionError("quota"))  # 행은 저장기 콜백이 실패 작업으로 보관
+        else:
+            future.set_result(True)
+        assert key not in store
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_checkpoint_expires(session, tmp_path, backend, monkeypatch):
+    """마지막 저장 뒤 ttl 이 지난 체크포인트는 읽히지 않고, 다음 정리 때 저장소에서도 삭제"""
+    store = CheckpointStore(ttl=60) if backend == "memory" else SqliteCheckpointStore(str(tmp_path / "s.db"), ttl=60)
+    now = experiment.time.time()
+    store.save(("main", "old", ""), session)
+    store.save(("main", "new", ""), session)
+    monkeypatch.setattr("checkpoint.time.time", lambda: now + EXPIRE_SWEEP_INTERVAL + 1)
+    assert store.load(("main", "old", "")) is None and ("main", "old", "") not in store
+    store.save(("main", "new", ""), session)
+    assert store.load(("main", "new", "")) is not None and len(store) == 1
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_failed_job_taken_once(tmp_path, backend):
+    store = CheckpointStore() if backend == "memory" else SqliteCheckpointStore(str(tmp_path / "s.db"))
+    store.add_failed({"id": "j1", "rows": [["p"]]})
+    assert [job["id"] for job in store.failed_saves()] == ["j1"]
+    assert store.remove_failed("j1")
+    assert not store.remove_failed("j1")
+    assert store.failed_saves() == []
+
+
+def test_summary_only_after_response_save(session, store, fake_sheet, monkeypatch):
+    sheet = fake_sheet(0)
+    monkeypatch.setattr(experiment, "open_worksheet", lambda sheet_id, title=None, cols=26: BrokenWorksheet() if title is None else sheet.worksheets.setdefault(title, type(sheet)()))
+    assert not experiment.save_to_sheets(make_responses(), "bench")
+    assert not sheet.worksheets["summary"].rows
+    # 응답 작업 안에 요약 작업이 들어 있어 다시 보낼 때 함께 저장됨
+    (job,) = store.failed_saves()
+    assert [child["worksheet"] for child in job["then"]] == ["summary"]
+
+    sheet = fake_sheet(0)
+    experiment.retry_failed_saves()
+    summary = sheet.worksheets["summary"]
+    assert len(summary.rows) == 2 and summary.col_count >= len(summary.rows[0])
+    record = dict(zip(summary.rows[0], summary.rows[1]))
+    assert record["participant"] == "bench" and record["n_trials"] == "30"
+
+
+
+def test_ado_writes_estimate_not_summary(session, store, fake_sheet):
+    sheet = fake_sheet(0)
+    session.experiment_id = "ado"
+    experiment.start_experiment()
+    while session.current_phase == "task":
+        design, _ = experiment.get_current_trial()
+        experiment.answer("LL", design["base"], design["vals"][0], design["id"], "", len(session.responses) + 1)
+    assert len(sheet.rows) == 1 + experiment.get_experiment()["ado_trials"]
+    assert set(sheet.worksheets) == {"ado", "pipeline"}
+    record = dict(zip(*sheet.worksheets["ado"].rows))
+    assert record["n_trials"] == str(experiment.get_experiment()["ado_trials"])
+    assert experiment.get_choice_cube("ado").participants == 0
+
+
+def test_cube_counts_saved_participants_once(session, store, fake_sheet, monkeypatch):
+    cube = ChoiceCube(experiment.get_spec())
+    monkeypatch.setattr(experiment, "get_choice_cube", lambda exp_id: cube)
+    fake_sheet(0)
+    monkeypatch.setattr(experiment, "open_worksheet", lambda sheet_id, title=None, cols=26: BrokenWorksheet())
+    experiment.save_to_sheets(make_responses(), "bench")
+    assert cube.participants == 0
+    fake_sheet(0)
+    experiment.retry_failed_saves()
+    experiment.retry_failed_saves()
+    assert cube.participants == 1 and cube.counts.sum() == 30
+
+
+def test_pipeline_timings_saved(session, store, fake_sheet, monkeypatch):
+    """같은 세션에서 이어지는 두 실험: 실험마다 pipeline 행 하나 (세션 시작 시각은 첫 실험 시작)"""
+    sheet = fake_sheet(0)
+    default, experiments = experiment.load_experiments()
+    experiments = {**experiments, "main": {**experiments["main"], "next": "v1"}}
+    monkeypatch.setattr(experiment, "load_experiments", lambda: (default, experiments))
+    clock = itertools.count(1_700_000_000, 60)  # 호출마다 1분씩
+    monkeypatch.setattr(experiment.time, "time", lambda: next(clock))
+    experiment.start_experiment()
+    for _ in range(2):
+        session.responses = make_responses()
+        experiment.finish_task()
+        if session.current_phase == "done" and experiment.get_experiment().get("next"):
+            experiment.start_next_experiment()
+    assert [p["experiment"] for p in session.pipeline] == ["main", "v1"]
+
+    rows = sheet.worksheets["pipeline"].rows
+    assert rows[0] == experiment.PIPELINE_HEADERS
+    stamp = lambda t: experiment.time.strftime("%Y-%m-%d %H:%M:%S", experiment.time.localtime(t))
+    for step, (row, entry) in enumerate(zip(rows[1:], session.pipeline), start=1):
+        record = dict(zip(rows[0], row))
+        assert (record["experiment"], record["step"]) == (entry["experiment"], str(step))
+        assert record["session_started_at"] == stamp(session.session_started_at)
+        assert (record["started_at"], record["finished_at"]) == (stamp(entry["started_at"]), stamp(entry["finished_at"]))
+        assert float(record["task_sec"]) == entry["finished_at"] - entry["started_at"] > 0
+        assert float(record["session_sec"]) == entry["finished_at"] - session.session_started_at
+    assert len(rows) == 3 and session.session_started_at == session.pipeline[0]["started_at"]
@@ -0,0 +1,20 @@
+import pytest
+
+import experiment
+from conftest import make_responses
+
+
+@pytest.mark.parametrize("existing_rows", [0, 10_000, 100_000])
+def test_save_to_sheets(benchmark, session, fake_sheet, existing_rows):
+    sheet = fake_sheet(existing_rows)
+    initial = list(sheet.rows)
+    responses = make_responses()
+
+    def setup():
+        # 매 라운드 같은 행 수에서 시작
+        sheet.rows = list(initial)
+
+    benchmark.group = "save_to_sheets"
+    benchmark.pedantic(experiment.save_to_sheets, args=(responses, "bench"), setup=setup, rounds=20)
+    assert sheet.rows[0][0] == "participant"
+    assert len(sheet.rows) == len(initial) + len(responses) + (0 if initial else 1)
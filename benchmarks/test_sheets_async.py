@@ -0,0 +1,135 @@
+import json
+import threading
+from concurrent.futures import wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from conftest import HEADERS, make_responses
+from experiment import build_rows
+from sheets_async import AsyncSheetsWriter
+
+# ==========================================
+# Sheets v4 values API 를 흉내 내는 로컬 서버
+# ==========================================
+
+
+class StubSheets(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.rows = []
+        self.append_calls = 0
+        self.fail_next = 0
+        self.drop_next = 0  # 행을 추가한 뒤 응답 없이 연결을 끊는 횟수 (응답 전 시간 초과 흉내)
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        assert self.headers["Authorization"] == "Bearer test-token"
+        self._reply(200, {"values": self.server.rows[:1]})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        assert self.path.split("?")[0].endswith(":append")
+        with self.server.lock:
+            if self.server.fail_next:
+                self.server.fail_next -= 1
+                self._reply(503, {"error": "unavailable"})
+                return
+            self.server.rows.extend(body["values"])
+            self.server.append_calls += 1
+            if self.server.drop_next:
+                self.server.drop_next -= 1
+                self.close_connection = True
+                return
+        self._reply(200, {"updates": {"updatedRows": len(body["values"])}})
+
+    def do_PUT(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.rows[:1] = body["values"]
+        self._reply(200, {"updatedRows": 1})
+
+
+@pytest.fixture
+def stub():
+    server = StubSheets()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def writer(stub):
+    w = AsyncSheetsWriter(
+        "sheet-id", lambda: "test-token",
+        base_url=f"http://127.0.0.1:{stub.server_port}", http2=False, batch_window=0.01,
+    )
+    yield w
+    w.close()
+
+
+def test_header_written_once_and_rows_appended(stub, writer):
+    rows = build_rows(make_responses(), "p1", "main")
+    assert writer.append_rows(rows, header=HEADERS).result(timeout=10)
+    assert writer.append_rows(build_rows(make_responses(), "p2", "main"), header=HEADERS).result(timeout=10)
+    assert stub.rows[0] == HEADERS
+    assert len(stub.rows) == 1 + 60
+    assert [r[0] for r in stub.rows[1:31]] == ["p1"] * 30
+
+
+def test_old_header_extended(stub, writer):
+    """design·지연 열이 없던 시트는 첫 행만 새 헤더로 바뀌고 기존 행은 그대로"""
+    stub.rows = [HEADERS[:8], ["p0"] * 8]
+    assert writer.append_rows(build_rows(make_responses(), "p1", "main"), header=HEADERS).result(timeout=10)
+    assert stub.rows[0] == HEADERS and stub.rows[1] == ["p0"] * 8 and len(stub.rows) == 2 + 30
+
+
+def test_retry_on_503(stub, writer):
+    stub.fail_next = 2
+    assert writer.append_rows(build_rows(make_responses(), "p1", "main")).result(timeout=30)
+    assert len(stub.rows) == 30
+
+
+def test_append_not_resent_after_lost_response(stub, writer):
+    """서버가 추가한 뒤 응답이 끊기면 다시 보내지 않고 실패로 넘김 (같은 행이 두 번 기록되지 않음)"""
+    stub.drop_next = 1
+    future = writer.append_rows(build_rows(make_responses(), "p1", "main"))
+    with pytest.raises(httpx.TransportError):
+        future.result(timeout=30)
+    assert len(stub.rows) == 30 and stub.append_calls == 1
+
+
+def test_concurrent_sessions(benchmark, stub, writer):
+    """100개 세션이 동시에 저장 → 한 이벤트 루프에서 묶어서 전송"""
+    rows = build_rows(make_responses(), "p", "main")
+    rounds = []  # --benchmark-disable 이면 한 번만 실행됨
+
+    def save_all():
+        rounds.append(1)
+        futures = [writer.append_rows(rows) for _ in range(100)]
+        wait(futures, timeout=30)
+        return futures
+
+    futures = benchmark.pedantic(save_all, rounds=5)
+    assert all(f.result() for f in futures)
+    assert len(stub.rows) == len(rounds) * 100 * 30
+    assert stub.append_calls < len(rounds) * 100
@@ -0,0 +1,73 @@
+import json
+import re
+import shutil
+
+import pytest
+
+from task_spec import DEFAULT_EXPERIMENTS_PATH, DEFAULT_SPEC_PATH, TaskSpecError, load_experiments
+
+# ==========================================
+# 과제 정의·실험 목록 검증: 잘못된 파일은 시작할 때 어느 항목이 틀렸는지와 함께 거부
+# ==========================================
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def write_config(tmp_path):
+    """수정한 tasks.json / experiments.json 을 임시 폴더에 쓰고 그 experiments.json 경로 반환"""
+    def write(edit_tasks=None, edit_experiments=None):
+        tasks, experiments = read_json(DEFAULT_SPEC_PATH), read_json(DEFAULT_EXPERIMENTS_PATH)
+        if edit_tasks:
+            edit_tasks(tasks)
+        if edit_experiments:
+            edit_experiments(experiments["experiments"])
+        (tmp_path / "tasks.json").write_text(json.dumps(tasks, ensure_ascii=False), encoding="utf-8")
+        path = tmp_path / "experiments.json"
+        path.write_text(json.dumps(experiments, ensure_ascii=False), encoding="utf-8")
+        return str(path)
+    return write
+
+
+def test_valid_copy_loads(write_config):
+    default, experiments = load_experiments(write_config())
+    assert default == "main" and experiments["en"]["locale"] == "en"
+
+
+@pytest.mark.parametrize("edit_tasks, message", [
+    (lambda t: t.update(extra=1), "알 수 없는 항목 extra"),
+    (lambda t: t["types"]["gain"].update(ll_dealy=12), "types.gain: 알 수 없는 항목 ll_dealy"),
+    (lambda t: t["tasks"][0].update(vals=[1]), "tasks[0]: 알 수 없는 항목 vals"),
+    (lambda t: t["tasks"][1].update(id=t["tasks"][0]["id"]), "tasks[1]: 중복된 id"),
+    (lambda t: t["tasks"][0].update(type="missing"), "tasks[0]: 알 수 없는 type 'missing'"),
+    (lambda t: t["types"]["gain"].update(question="{amount}"), "types.gain.question: 알 수 없는 필드 {amount}"),
+])
+def test_invalid_tasks(write_config, edit_tasks, message):
+    with pytest.raises(TaskSpecError, match=re.escape(message)):
+        load_experiments(write_config(edit_tasks=edit_tasks))
+
+
+@pytest.mark.parametrize("edit_experiments, message", [
+    (lambda e: e["main"].update(breaks=600), "experiments.main: 알 수 없는 항목 breaks"),
+    (lambda e: e["main"].update(next="nowhere"), "experiments.main: next 실험 'nowhere' 이\\(가\\) 없습니다"),
+    (lambda e: e["main"].update(locale="fr"), "experiments.main: .*fr"),
+    (lambda e: e["main"].update(break_duration=-1), "experiments.main: break_duration 은 0 이상"),
+    (lambda e: e["main"].update(break_duration="600"), "experiments.main: break_duration 은 0 이상"),
+    (lambda e: e["main"].pop("break_duration"), "experiments.main: break_duration 항목이 없습니다"),
+    (lambda e: e["v2"].update(break_pause="always"), "experiments.v2: break_pause 는 none 또는 disconnect"),
+    (lambda e: e["ado"].update(ado_trials=0), "experiments.ado: ado 모드에는 양의 정수 ado_trials"),
+])
+def test_invalid_experiments(write_config, edit_experiments, message):
+    with pytest.raises(TaskSpecError, match=message):
+        load_experiments(write_config(edit_experiments=edit_experiments))
+
+
+def test_missing_tasks_file(write_config, tmp_path):
+    path = write_config(edit_experiments=lambda e: e["main"].update(tasks="other.json"))
+    with pytest.raises(FileNotFoundError):
+        load_experiments(path)
+    shutil.copy(DEFAULT_SPEC_PATH, tmp_path / "other.json")
+    assert load_experiments(path)[1]["main"]["tasks"].endswith("other.json")
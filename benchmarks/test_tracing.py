@@ -0,0 +1,54 @@
+import experiment
+import tracing
+from conftest import make_responses
+
+# ==========================================
+# 문항별 시각 기록: 브라우저 보고 반영과 trace 워크시트 행
+# ==========================================
+
+
+def report(trial, click_ms, render_ms):
+    return {"trial": trial, "click_ms": click_ms, "render_ms": render_ms}
+
+
+def test_trace_rows_fields():
+    traces = []
+    tracing.begin(traces, "t1_small_gain", 1, 1.2, server_receipt=100.0, recorded=100.01)
+    tracing.mark_rerun_end(traces, 100.05)
+    tracing.begin(traces, "t1_small_gain", 2, 0.8, server_receipt=101.0, recorded=101.01)
+    # 첫 화면은 클릭 없이 표시, 이후 화면은 직전 클릭 시각과 함께 보고. 마지막 문항 뒤 화면의 보고는 없음
+    client = {0: report(0, None, 5000.0), 1: report(1, 6200.0, 6290.0)}
+    first, second = [dict(zip(tracing.TRACE_HEADERS, row)) for row in tracing.trace_rows(traces, client, "bench")]
+
+    assert (first["participant"], first["task"], first["item"], first["rt_sec"]) == ("bench", "t1_small_gain", 1, 1.2)
+    assert first["client_rt_sec"] == 1.2  # 화면 표시 → 클릭 (브라우저 시계)
+    assert (first["onset_ms"], first["click_ms"], first["next_render_ms"]) == (5000.0, 6200.0, 6290.0)
+    assert first["server_ms"] == 50.0 and first["client_ms"] == 90.0 and first["lag_ms"] == 40.0
+    # 재실행 끝·다음 화면 보고가 없는 문항은 빈 칸
+    assert second["onset_ms"] == 6290.0 and second["rerun_end"] == ""
+    assert second["client_rt_sec"] == second["server_ms"] == second["client_ms"] == second["lag_ms"] == ""
+
+
+def test_last_report_saves_trace_sheet(session, fake_sheet, monkeypatch):
+    """과제가 끝난 뒤 마지막 화면의 보고가 오면 기다리지 않고 trace 워크시트에 저장"""
+    sheet = fake_sheet(0)
+    experiment.reset_traces()
+    for trial in range(2):
+        tracing.begin(session.traces, "t1_small_gain", trial + 1, 1.0, 100.0 + trial, 100.01 + trial)
+        tracing.mark_rerun_end(session.traces, 100.05 + trial)
+        session.trace_client[trial] = report(trial, None if trial == 0 else 6000.0, 5000.0 + 1000 * trial)
+    session.responses = make_responses(2)
+    session.current_phase = "done"
+    session.trace_finished_at = experiment.time.time()
+
+    monkeypatch.setattr(tracing, "probe", lambda trial: None)
+    experiment._apply_trace_report()
+    assert not session.trace_saved and "trace" not in sheet.worksheets  # 마지막 보고를 기다림
+
+    monkeypatch.setattr(tracing, "probe", lambda trial: report(trial, 7000.0, 7080.0))
+    experiment._apply_trace_report()
+    assert session.trace_saved and session.trace_client[2]["click_ms"] == 7000.0
+    rows = sheet.worksheets["trace"].rows
+    assert rows[0] == tracing.TRACE_HEADERS and len(rows) == 3
+    last = dict(zip(rows[0], rows[2]))
+    assert (last["item"], last["click_ms"], last["next_render_ms"], last["client_ms"]) == ("2", "7000.0", "7080.0", "80.0")
@@ -0,0 +1,109 @@
+import time
+
+import streamlit as st
+
+# ==========================================
+# 서버 기준 휴식 마감 시각
+# ==========================================
+# 휴식 시작 때 마감 시각 (deadline) 을 한 번 저장하고, 남은 시간은 항상 서버 시계로 계산.
+# 화면의 초 단위 카운트다운은 브라우저가 받은 남은 시간으로 혼자 그리고, 서버는 낮은 주기로만
+# 확인함. 마감에 도달하면 브라우저가 바로 재실행을 요청하고 서버가 마감을 다시 확인한 뒤 완료로.
+#
+# 일시정지 규칙 (experiments.json 의 break_pause):
+#   "none"       : 연결이 끊겨도 벽시계대로 흘러감 (기본)
+#   "disconnect" : 서버 확인이 grace 초 넘게 없던 구간 (창 닫힘·연결 끊김) 은 휴식에서 빼고 마감을 미룸
+
+PAUSE_RULES = ("none", "disconnect")
+BREAK_HEADERS = [
+    "participant", "experiment", "started_at", "ended_at",
+    "planned_sec", "actual_sec", "paused_sec", "pauses",
+]
+
+_CSS = """
+.break-countdown .timer-display { font-size:4rem; font-weight:700; text-align:center; color:#222; margin:2rem 0; font-family:monospace; }
+.break-countdown .bar { background:#f0f0f0; border-radius:10px; height:20px; margin:1rem 0; }
+.break-countdown .bar > div { background:#222; height:100%; border-radius:10px; }
+"""
+
+# data: {remaining, duration, key}. 새 data 가 올 때마다 브라우저 쪽 마감을 다시 맞춤
+_JS = """
+export default function(component) {
+    const { data, setTriggerValue, parentElement } = component;
+    const deadline = performance.now() + data.remaining * 1000;
+    let root = parentElement.querySelector(".break-countdown");
+    if (!root) {
+        root = document.createElement("div");
+        root.className = "break-countdown";
+        root.innerHTML = '<p class="timer-display"></p><div class="bar"><div></div></div>';
+        parentElement.appendChild(root);
+    }
+    const display = root.querySelector(".timer-display"), bar = root.querySelector(".bar > div");
+    let fired = false;
+    const tick = () => {
+        const remaining = Math.max(0, (deadline - performance.now()) / 1000);
+        const m = String(Math.floor(remaining / 60)).padStart(2, "0");
+        const s = String(Math.floor(remaining % 60)).padStart(2, "0");
+        display.textContent = `${m}:${s}`;
+        bar.style.width = `${(100 * (1 - remaining / data.duration)).toFixed(1)}%`;
+        if (remaining <= 0 && !fired) {
+            fired = true;
+            setTriggerValue("expired", data.key);
+        }
+    };
+    // 같은 요소에 다시 호출되면 이전 타이머를 멈추고 새 마감으로 교체
+    clearInterval(root.__timer);
+    tick();
+    root.__timer = setInterval(tick, 250);
+    return () => clearInterval(root.__timer);
+}
+"""
+
+_countdown = st.components.v2.component("break_countdown", css=_CSS, js=_JS, isolate_styles=False)
+
+
+def start(duration, now=None):
+    """휴식 시작: 마감 시각을 한 번 정해서 저장할 상태 dict"""
+    now = time.time() if now is None else now
+    return {
+        "started_at": now, "deadline": now + duration, "duration": duration,
+        "last_poll": now, "paused_sec": 0.0, "pauses": [], "ended_at": None,
+    }
+
+
+def poll(state, now=None, rule="none", grace=30):
+    """서버 확인 1회: 일시정지 규칙 적용 후 남은 시간 (초) 반환"""
+    now = time.time() if now is None else now
+    gap = now - state["last_poll"]
+    if rule == "disconnect" and gap > grace:
+        # 마지막 확인 뒤 grace 까지는 휴식으로 인정하고 그 이후만 일시정지로 처리
+        paused = gap - grace
+        state["pauses"].append([state["last_poll"] + grace, now])
+        state["paused_sec"] += paused
+        state["deadline"] += paused
+    state["last_poll"] = now
+    return max(0.0, state["deadline"] - now)
+
+
+def finish(state, now=None):
+    """마감 도달 처리 (한 번만 기록)"""
+    if state["ended_at"] is None:
+        state["ended_at"] = time.time() if now is None else now
+    return state
+
+
+def log_row(state, participant, experiment_id):
+    """휴식 기록 시트 행 (실제 휴식 = 종료 - 시작 - 일시정지)"""
+    actual = state["ended_at"] - state["started_at"] - state["paused_sec"]
+    stamp = lambda t: time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))
+    return [
+        participant, experiment_id, stamp(state["started_at"]), stamp(state["ended_at"]),
+        state["duration"], round(actual, 3), round(state["paused_sec"], 3), len(state["pauses"]),
+    ]
+
+
+def countdown(remaining, duration, on_expired):
+    """브라우저 카운트다운. 0 이 되면 on_expired 와 함께 재실행 요청"""
+    _countdown(
+        data={"remaining": remaining, "duration": duration, "key": round(remaining, 3)},
+        key="break_countdown", on_expired_change=on_expired,
+    )
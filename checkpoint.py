@@ -0,0 +1,381 @@
+import copy
+import json
+import pickle
+import secrets
+import sqlite3
+import threading
+import time
+
+# ==========================================
+# 세션 체크포인트 저장소
+# ==========================================
+
+# 체크포인트에 보관하는 세션 상태 키
+CHECKPOINT_KEYS = (
+    "current_phase", "task_idx", "item_idx", "responses", "break_start_time",
+    "session_started_at", "pipeline", "ado_log_post", "ado_used", "ado_design",
+    "traces", "trace_client", "trace_finished_at", "break_state",
+)
+
+
+# 이어하기 토큰 (URL 에 넣어 다른 서버·새 세션에서 체크포인트를 찾는 값) 유효 시간
+TOKEN_TTL = 24 * 3600
+# 마지막 저장 뒤 이 시간이 지난 체크포인트는 버림 (중간에 떠난 참여자의 상태가 저장소에 계속 쌓이지 않도록)
+CHECKPOINT_TTL = 7 * 24 * 3600
+EXPIRE_SWEEP_INTERVAL = 600  # 만료된 체크포인트 정리 간격 (초). 클릭마다 전체를 훑지 않도록
+
+
+def take_snapshot(state):
+    """세션 상태에서 체크포인트 키만 복사 (responses·traces 는 세션 쪽 변경과 분리)"""
+    snapshot = {k: state[k] for k in CHECKPOINT_KEYS if k in state}
+    snapshot["responses"] = list(snapshot.get("responses", []))
+    if "traces" in snapshot:
+        snapshot["traces"] = [dict(t) for t in snapshot["traces"]]
+        snapshot["trace_client"] = dict(snapshot["trace_client"])
+    if snapshot.get("break_state") is not None:
+        snapshot["break_state"] = copy.deepcopy(snapshot["break_state"])
+    snapshot["saved_at"] = time.time()
+    return snapshot
+
+
+def new_token():
+    return secrets.token_urlsafe(12)
+
+
+class CheckpointStore:
+    """참여자 ID별 진행 상태를 서버 메모리에 보관 (프로세스 내 모든 세션이 공유)"""
+
+    persistent = False  # 재시작·재배포하면 체크포인트·실패한 저장 작업이 모두 사라짐
+
+    def __init__(self, ttl=CHECKPOINT_TTL):
+        self._lock = threading.Lock()
+        self._ttl = ttl
+        self._next_sweep = 0.0
+        self._data = {}
+        self._tokens = {}   # 토큰 → (체크포인트 키, 만료 시각)
+        self._failed = {}   # 실패한 저장 작업 id → 작업
+        self._claims = {}   # 점유 이름 → (소유자, 만료 시각)
+        self._marks = set()  # (종류, 값)
+
+    def save(self, participant, state):
+        """상태 스냅샷 저장 (responses는 얕은 복사로 분리)"""
+        snapshot = take_snapshot(state)
+        with self._lock:
+            if snapshot["saved_at"] >= self._next_sweep:
+                self._expire(snapshot["saved_at"])
+            self._data[participant] = snapshot
+
+    def _expire(self, now):
+        """만료된 체크포인트 삭제 (잠금 안에서 호출)"""
+        self._next_sweep = now + EXPIRE_SWEEP_INTERVAL
+        for key in [k for k, snapshot in self._data.items() if snapshot["saved_at"] < now - self._ttl]:
+            del self._data[key]
+
+    def load(self, participant):
+        """저장된 스냅샷 반환 (없거나 만료되면 None)"""
+        with self._lock:
+            snapshot = self._data.get(participant)
+        if snapshot is None or snapshot["saved_at"] < time.time() - self._ttl:
+            return None
+        return copy.copy(snapshot)
+
+    def clear(self, participant):
+        with self._lock:
+            self._data.pop(participant, None)
+
+    def bind(self, token, participant, ttl=TOKEN_TTL):
+        now = time.time()
+        with self._lock:
+            for t in [t for t, (_, expires) in self._tokens.items() if expires < now]:
+                del self._tokens[t]
+            self._tokens[token] = (participant, now + ttl)
+
+    def resolve(self, token):
+        """토큰 → 체크포인트 키 (없거나 만료되면 None)"""
+        with self._lock:
+            entry = self._tokens.get(token)
+        return entry[0] if entry is not None and entry[1] >= time.time() else None
+
+    def add_failed(self, job):
+        """보내지 못한 저장 작업 보관 (대시보드에서 다시 보냄)"""
+        with self._lock:
+            self._failed[job["id"]] = job
+
+    def failed_saves(self):
+        with self._lock:
+            return list(self._failed.values())
+
+    def remove_failed(self, job_id):
+        """작업을 목록에서 꺼냄. 다른 세션이 먼저 꺼냈으면 False (같은 작업을 두 번 보내지 않도록)"""
+        with self._lock:
+            return self._failed.pop(job_id, None) is not None
+
+    def claim(self, name, owner, ttl, can_take=None):
+        """name 을 owner 가 ttl 초 동안 점유 (같은 소유자면 만료 연장). 다른 소유자가 점유 중이면 False.
+        can_take(현재 소유자) 가 True 면 넘겨받음. 확인과 기록은 한 번에 (원자적)"""
+        now = time.time()
+        with self._lock:
+            current = self._claims.get(name)
+            if current is not None and current[1] >= now and current[0] != owner and not (can_take and can_take(current[0])):
+                return False
+            self._claims[name] = (owner, now + ttl)
+            return True
+
+    def release_claim(self, name, owner):
+        """owner 가 점유 중일 때만 해제"""
+        with self._lock:
+            if self._claims.get(name, (None,))[0] == owner:
+                del self._claims[name]
+
+    def claim_owner(self, name):
+        with self._lock:
+            current = self._claims.get(name)
+        return current[0] if current is not None and current[1] >= time.time() else None
+
+    def add_mark(self, kind, value):
+        """표시 추가. 처음 추가했으면 True (이미 있으면 False)"""
+        with self._lock:
+            if (kind, value) in self._marks:
+                return False
+            self._marks.add((kind, value))
+            return True
+
+    def has_mark(self, kind, value):
+        return (kind, value) in self._marks
+
+    def remove_mark(self, kind, value):
+        with self._lock:
+            self._marks.discard((kind, value))
+
+    def __contains__(self, participant):
+        return self.load(participant) is not None
+
+    def __len__(self):
+        with self._lock:
+            self._expire(time.time())
+            return len(self._data)
+
+
+# ==========================================
+# 외부 저장소 (여러 서버 프로세스가 같은 체크포인트를 공유)
+# ==========================================
+# 어느 서버가 다음 재실행을 받아도 토큰 → 체크포인트로 같은 진행 상태를 이어감.
+# 값은 pickle (ADO 사후분포 numpy 배열 포함) 이므로 같은 코드를 실행하는 서버끼리만 공유.
+
+
+def _key(participant):
+    return json.dumps(list(participant), ensure_ascii=False)
+
+
+class SqliteCheckpointStore:
+    """SQLite 파일 (같은 호스트·공유 볼륨의 서버끼리). WAL 모드로 읽기와 쓰기가 서로 막지 않음"""
+
+    persistent = True
+
+    def __init__(self, path, ttl=CHECKPOINT_TTL):
+        self._lock = threading.Lock()
+        self._ttl = ttl
+        self._next_sweep = 0.0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS checkpoints (key TEXT PRIMARY KEY, state BLOB NOT NULL, saved_at REAL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS tokens (token TEXT PRIMARY KEY, key TEXT NOT NULL, expires REAL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS failed_saves (id TEXT PRIMARY KEY, job BLOB NOT NULL, failed_at REAL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS claims (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS marks (kind TEXT, value TEXT, PRIMARY KEY (kind, value))")
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def save(self, participant, state):
+        snapshot = take_snapshot(state)
+        if snapshot["saved_at"] >= self._next_sweep:
+            # 다른 프로세스가 저장한 것도 함께 정리
+            self._next_sweep = snapshot["saved_at"] + EXPIRE_SWEEP_INTERVAL
+            self._execute("DELETE FROM checkpoints WHERE saved_at < ?", (snapshot["saved_at"] - self._ttl,))
+        self._execute(
+            "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)",
+            (_key(participant), pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL), snapshot["saved_at"]),
+        )
+
+    def load(self, participant):
+        rows = self._execute(
+            "SELECT state FROM checkpoints WHERE key = ? AND saved_at >= ?", (_key(participant), time.time() - self._ttl),
+        )
+        return pickle.loads(rows[0][0]) if rows else None
+
+    def clear(self, participant):
+        self._execute("DELETE FROM checkpoints WHERE key = ?", (_key(participant),))
+
+    def bind(self, token, participant, ttl=TOKEN_TTL):
+        now = time.time()
+        self._execute("DELETE FROM tokens WHERE expires < ?", (now,))
+        self._execute("INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)", (token, _key(participant), now + ttl))
+
+    def resolve(self, token):
+        rows = self._execute("SELECT key FROM tokens WHERE token = ? AND expires >= ?", (token, time.time()))
+        return tuple(json.loads(rows[0][0])) if rows else None
+
+    def add_failed(self, job):
+        self._execute(
+            "INSERT OR REPLACE INTO failed_saves VALUES (?, ?, ?)",
+            (job["id"], pickle.dumps(job, protocol=pickle.HIGHEST_PROTOCOL), time.time()),
+        )
+
+    def failed_saves(self):
+        return [pickle.loads(job) for job, in self._execute("SELECT job FROM failed_saves ORDER BY failed_at")]
+
+    def remove_failed(self, job_id):
+        with self._lock:
+            return self._conn.execute("DELETE FROM failed_saves WHERE id = ?", (job_id,)).rowcount > 0
+
+    def claim(self, name, owner, ttl, can_take=None):
+        # BEGIN IMMEDIATE: 다른 프로세스가 같은 점유를 확인·기록하는 사이에 끼어들지 못하게 쓰기 잠금부터 잡음
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT owner FROM claims WHERE name = ? AND expires >= ?", (name, now)).fetchone()
+                if row is not None and row[0] != owner and not (can_take and can_take(row[0])):
+                    return False
+                self._conn.execute("INSERT OR REPLACE INTO claims VALUES (?, ?, ?)", (name, owner, now + ttl))
+                return True
+            finally:
+                self._conn.execute("COMMIT")
+
+    def release_claim(self, name, owner):
+        self._execute("DELETE FROM claims WHERE name = ? AND owner = ?", (name, owner))
+
+    def claim_owner(self, name):
+        rows = self._execute("SELECT owner FROM claims WHERE name = ? AND expires >= ?", (name, time.time()))
+        return rows[0][0] if rows else None
+
+    def add_mark(self, kind, value):
+        with self._lock:
+            return self._conn.execute("INSERT OR IGNORE INTO marks VALUES (?, ?)", (kind, value)).rowcount > 0
+
+    def has_mark(self, kind, value):
+        return bool(self._execute("SELECT 1 FROM marks WHERE kind = ? AND value = ?", (kind, value)))
+
+    def remove_mark(self, kind, value):
+        self._execute("DELETE FROM marks WHERE kind = ? AND value = ?", (kind, value))
+
+    def __contains__(self, participant):
+        return bool(self._execute(
+            "SELECT 1 FROM checkpoints WHERE key = ? AND saved_at >= ?", (_key(participant), time.time() - self._ttl),
+        ))
+
+    def __len__(self):
+        return self._execute("SELECT COUNT(*) FROM checkpoints WHERE saved_at >= ?", (time.time() - self._ttl,))[0][0]
+
+
+# 현재 소유자가 ARGV[1] 일 때만 넘겨받기 / 해제 (확인과 변경을 서버에서 한 번에)
+_TAKE_CLAIM = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    redis.call('set', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+return 0
+"""
+_RELEASE_CLAIM = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisCheckpointStore:
+    """Redis (또는 호환 서버). redis 패키지가 필요함 (pip install redis)"""
+
+    persistent = True
+
+    def __init__(self, url, prefix="dd:", ttl=CHECKPOINT_TTL):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._ttl = ttl
+        self._take_claim = self._redis.register_script(_TAKE_CLAIM)
+        self._release_claim = self._redis.register_script(_RELEASE_CLAIM)
+
+    def _ckpt(self, participant):
+        return f"{self._prefix}ckpt:{_key(participant)}"
+
+    def save(self, participant, state):
+        # 만료는 Redis 가 처리 (저장할 때마다 다시 ttl 초)
+        self._redis.set(
+            self._ckpt(participant), pickle.dumps(take_snapshot(state), protocol=pickle.HIGHEST_PROTOCOL), ex=max(1, int(self._ttl)),
+        )
+
+    def load(self, participant):
+        raw = self._redis.get(self._ckpt(participant))
+        return pickle.loads(raw) if raw is not None else None
+
+    def clear(self, participant):
+        self._redis.delete(self._ckpt(participant))
+
+    def bind(self, token, participant, ttl=TOKEN_TTL):
+        self._redis.set(f"{self._prefix}token:{token}", _key(participant), ex=ttl)
+
+    def resolve(self, token):
+        raw = self._redis.get(f"{self._prefix}token:{token}")
+        return tuple(json.loads(raw)) if raw is not None else None
+
+    def add_failed(self, job):
+        self._redis.hset(f"{self._prefix}failed", job["id"], pickle.dumps(job, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def failed_saves(self):
+        return [pickle.loads(raw) for raw in self._redis.hvals(f"{self._prefix}failed")]
+
+    def remove_failed(self, job_id):
+        return self._redis.hdel(f"{self._prefix}failed", job_id) > 0
+
+    def claim(self, name, owner, ttl, can_take=None):
+        key = f"{self._prefix}claim:{name}"
+        ttl = max(1, int(ttl))
+        # 비어 있으면 SET NX 한 번으로 끝
+        if self._redis.set(key, owner, nx=True, ex=ttl):
+            return True
+        current = self._redis.get(key)
+        if current is None:
+            return bool(self._redis.set(key, owner, nx=True, ex=ttl))  # 그 사이 만료됨
+        current = current.decode()
+        if current != owner and not (can_take and can_take(current)):
+            return False
+        return bool(self._take_claim(keys=[key], args=[current, owner, ttl]))
+
+    def release_claim(self, name, owner):
+        self._release_claim(keys=[f"{self._prefix}claim:{name}"], args=[owner])
+
+    def claim_owner(self, name):
+        raw = self._redis.get(f"{self._prefix}claim:{name}")
+        return raw.decode() if raw is not None else None
+
+    def add_mark(self, kind, value):
+        return self._redis.sadd(f"{self._prefix}mark:{kind}", value) > 0
+
+    def has_mark(self, kind, value):
+        return bool(self._redis.sismember(f"{self._prefix}mark:{kind}", value))
+
+    def remove_mark(self, kind, value):
+        self._redis.srem(f"{self._prefix}mark:{kind}", value)
+
+    def __contains__(self, participant):
+        return bool(self._redis.exists(self._ckpt(participant)))
+
+    def __len__(self):
+        return sum(1 for _ in self._redis.scan_iter(f"{self._prefix}ckpt:*"))
+
+
+def open_checkpoint_store(url=None, ttl=CHECKPOINT_TTL):
+    """secrets 의 session_store 값으로 저장소 선택: 없음 → 메모리, sqlite:///경로, redis://…
+    ttl: 체크포인트 유효 시간 (초, 마지막 저장 기준)"""
+    if not url:
+        return CheckpointStore(ttl)
+    if url.startswith("sqlite:///"):
+        return SqliteCheckpointStore(url[len("sqlite:///"):], ttl)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCheckpointStore(url, ttl=ttl)
+    raise ValueError(f"지원하지 않는 session_store: {url}")
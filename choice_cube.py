@@ -0,0 +1,235 @@
+import argparse
+import glob
+import math
+import os
+import threading
+
+import numpy as np
+
+from offline_bundle import compile_trials, spec_hash
+from participant_summary import trial_columns
+from results_format import participant_key, read_rows
+from task_spec import load_task_spec
+
+# ==========================================
+# 문항별 선택 수·RT 히스토그램 큐브 (모집단 P(LL) 곡선·검정력 확인용)
+# ==========================================
+# 행 = 과제 정의 순서의 문항 (과제 블록 × 문항), 열 = 선택 (SS=0, LL=1).
+#   counts[t, c]      : 응답 수 (int64)
+#   rt_hist[t, c, b]  : RT 히스토그램 (로그 간격 구간, 양 끝은 범위 밖 값)
+# 저장 (참여자 완료) 때마다 더하기만 하므로 조회는 배열 인덱싱 한 번. 파일은 압축 npz 이고
+# 과제 정의 해시 (문항 순서·금액) 가 다르면 읽지 않음 (바뀐 과제 정의의 큐브와 섞이지 않도록).
+# 여러 서버가 같은 폴더를 쓰면 서버 (프로세스) 마다 자기 파일 <실험 id>.<서버>.npz 에만 쓰고,
+# 읽는 쪽이 폴더의 파일을 모두 merge 함 (같은 파일에 덮어쓰면 마지막에 쓴 서버의 수만 남음).
+
+RT_EDGES = np.geomspace(0.2, 60.0, 31)   # 0.2초 ~ 60초, 30구간 (+ 미만·초과 2구간)
+N_BINS = len(RT_EDGES) + 1
+
+
+class ChoiceCube:
+    """과제 정의 하나에 대한 누적 큐브. add 는 잠금 안에서 배열 덧셈만 함"""
+
+    def __init__(self, spec, path=None):
+        self.spec = spec
+        self.path = path
+        # 문구는 빼고 (과제 id, 문항 번호, 금액) 만 해시 → 로케일만 다른 실험의 큐브와 호환
+        self.hash = spec_hash([t[:2] + t[5:] for t in compile_trials(spec)])
+        self._columns = trial_columns(spec)
+        self._lock = threading.Lock()
+        n = spec.total_questions
+        self.counts = np.zeros((n, 2), dtype=np.int64)
+        self.rt_hist = np.zeros((n, 2, N_BINS), dtype=np.int64)
+        self.participants = 0
+        self.save_error = None  # 마지막 파일 저장 실패 (저장기 스레드에서 갱신, 대시보드에 표시)
+        # 문항별 메타데이터 (곡선 그리기용)
+        self.task_ids = [task["id"] for task in spec.tasks for _ in task["vals"]]
+        self.types = [task["type"] for task in spec.tasks for _ in task["vals"]]
+        self.items = [i + 1 for task in spec.tasks for i in range(len(task["vals"]))]
+        self.ss_amount = np.array([task["base"] for task in spec.tasks for _ in task["vals"]], dtype=float)
+        self.ll_amount = np.array([v for task in spec.tasks for v in task["vals"]], dtype=float)
+        self.ratio = self.ll_amount / self.ss_amount
+        self.loaded = path is not None and os.path.exists(path) and self.load(path)
+
+    # ----- 갱신 -----
+
+    def add(self, responses):
+        """완료된 참여자 한 명의 응답 목록 (record_response 형식 또는 (task, item, choice, rt) 튜플) 반영.
+        고정 문항 격자 기준이라 문항 번호가 없는 ADO 응답은 건너뜀"""
+        rows, choices, bins = [], [], []
+        for r in responses:
+            task, item, choice, rt = (r["task"], r["item"], r["choice"], r["rt_sec"]) if isinstance(r, dict) else r
+            if item in ("", None):
+                continue
+            t = self._columns.get((task, int(item)))
+            if t is None or choice not in ("SS", "LL"):
+                continue
+            rows.append(t)
+            choices.append(int(choice == "LL"))
+            bins.append(-1 if rt in ("", None) else int(np.searchsorted(RT_EDGES, float(rt), side="right")))
+        if not rows:
+            return
+        rows, choices, bins = np.array(rows), np.array(choices), np.array(bins)
+        timed = bins >= 0
+        with self._lock:
+            np.add.at(self.counts, (rows, choices), 1)
+            np.add.at(self.rt_hist, (rows[timed], choices[timed], bins[timed]), 1)
+            self.participants += 1
+
+    def merge(self, other):
+        """같은 과제 정의의 다른 큐브 (다른 서버·다른 파일) 더하기"""
+        if other.hash != self.hash:
+            raise ValueError("과제 정의가 다른 큐브는 합칠 수 없습니다")
+        with self._lock:
+            self.counts += other.counts
+            self.rt_hist += other.rt_hist
+            self.participants += other.participants
+
+    # ----- 조회 (배열 인덱싱) -----
+
+    def index(self, task_id, item):
+        return self._columns[(task_id, item)]
+
+    def p_ll(self, task_id, item):
+        """(P(LL), 응답 수). 응답이 없으면 (nan, 0)"""
+        ss, ll = self.counts[self.index(task_id, item)]
+        n = ss + ll
+        return (ll / n if n else math.nan), int(n)
+
+    def wilson(self, task_id, item, z=1.96):
+        """P(LL) 의 Wilson 신뢰구간 (검정력·표본 수 확인용)"""
+        p, n = self.p_ll(task_id, item)
+        if n == 0:
+            return math.nan, math.nan
+        centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+        half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+        return centre - half, centre + half
+
+    def curve(self, task_type=None, task_id=None):
+        """과제 유형 또는 과제 블록의 (LL/SS 비율, SS 금액, P(LL), 응답 수) 배열"""
+        mask = np.array([
+            (task_type is None or t == task_type) and (task_id is None or k == task_id)
+            for t, k in zip(self.types, self.task_ids)
+        ])
+        with self._lock:
+            counts = self.counts[mask].copy()
+        n = counts.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            p = np.where(n > 0, counts[:, 1] / n, np.nan)
+        return self.ratio[mask], self.ss_amount[mask], p, n
+
+    def rt_quantile(self, task_id, item, q=0.5, choice=None):
+        """히스토그램에서 구한 RT 분위수 근사 (구간 안에서는 로그 선형 보간)"""
+        t = self.index(task_id, item)
+        hist = self.rt_hist[t].sum(axis=0) if choice is None else self.rt_hist[t, int(choice == "LL")]
+        total = hist.sum()
+        if total == 0:
+            return math.nan
+        cum = np.cumsum(hist)
+        b = int(np.searchsorted(cum, q * total))
+        if b == 0:
+            return float(RT_EDGES[0])
+        if b >= len(RT_EDGES):
+            return float(RT_EDGES[-1])
+        lo, hi = RT_EDGES[b - 1], RT_EDGES[b]
+        frac = (q * total - (cum[b - 1] if b else 0)) / hist[b]
+        return float(lo * (hi / lo) ** frac)
+
+    # ----- 저장 -----
+
+    def save(self, path=None):
+        """압축 npz 로 저장 (임시 파일에 쓴 뒤 교체). 여러 저장기 스레드가 같은 임시 파일을 쓰지 않도록 잠금 안에서"""
+        path = path or self.path
+        tmp = path + ".tmp.npz"
+        with self._lock:
+            np.savez_compressed(
+                tmp, hash=np.array(self.hash), counts=self.counts, rt_hist=self.rt_hist,
+                rt_edges=RT_EDGES, participants=np.array(self.participants),
+            )
+            os.replace(tmp, path)
+
+    def load(self, path):
+        """같은 과제 정의로 만든 파일이면 읽고 True"""
+        with np.load(path) as data:
+            if str(data["hash"]) != self.hash or not np.array_equal(data["rt_edges"], RT_EDGES):
+                return False
+            with self._lock:
+                self.counts = data["counts"].copy()
+                self.rt_hist = data["rt_hist"].copy()
+                self.participants = int(data["participants"])
+        return True
+
+
+def replica_path(cube_dir, exp_id, replica):
+    """서버 (프로세스) 별 큐브 파일 경로. replica 의 ':' 등 파일 이름에 쓰기 어려운 문자는 '-' 로"""
+    safe = "".join(c if c.isalnum() or c in "-_" else "-" for c in replica)
+    return os.path.join(cube_dir, f"{exp_id}.{safe}.npz")
+
+
+def cube_files(cube_dir, exp_id, exclude=None):
+    """폴더에 있는 실험의 큐브 파일 (서버별 파일과 서버별로 나누기 전의 <실험 id>.npz, 저장 중인 임시 파일 제외)"""
+    paths = glob.glob(os.path.join(glob.escape(cube_dir), f"{glob.escape(exp_id)}.*npz"))
+    return sorted(
+        p for p in paths
+        if not p.endswith(".tmp.npz") and p != exclude
+        and os.path.basename(p).count(".") - exp_id.count(".") in (1, 2)  # 이 id 로 시작하는 다른 실험 id 의 파일 제외
+    )
+
+
+def merge_files(spec, paths, base=None):
+    """base (이 서버의 큐브) 에 파일들의 큐브를 더한 새 큐브. 과제 정의가 다른 파일은 건너뜀"""
+    cube = ChoiceCube(spec)
+    if base is not None:
+        cube.merge(base)
+        cube.save_error = base.save_error
+    for path in paths:
+        other = ChoiceCube(spec, path)
+        if other.loaded:
+            cube.merge(other)
+    return cube
+
+
+def cube_from_rows(rows, spec, experiment=None):
+    """save_to_sheets 형식의 긴 행 (CSV / Parquet / Arrow) 에서 큐브 다시 만들기.
+    experiment 를 주면 그 실험의 행만 (큐브는 실험별). 참여자는 (실험 id, 이름) 으로 구분"""
+    cube = ChoiceCube(spec)
+    current, responses = None, []
+    for r in rows:
+        if experiment is not None and (r.get("experiment") or "") != experiment:
+            continue
+        key = participant_key(r)
+        if key != current and responses:
+            cube.add(responses)
+            responses = []
+        current = key
+        responses.append((r["task"], r["item"], r["choice"], r["rt_sec"]))
+    if responses:
+        cube.add(responses)
+    return cube
+
+
+def main():
+    parser = argparse.ArgumentParser(description="내보낸 응답에서 문항별 선택 수·RT 히스토그램 큐브 생성")
+    parser.add_argument("src", nargs="?", help="Google Sheet 에서 내보낸 CSV 또는 .parquet / .arrow")
+    parser.add_argument("--tasks", default=None, help="과제 정의 파일 (기본: tasks.json)")
+    parser.add_argument("--out", default="choice_cube.npz")
+    parser.add_argument("--experiment", default=None, help="이 실험 id 의 행만 (여러 실험이 한 시트를 쓸 때)")
+    parser.add_argument("--merge-dir", default=None,
+                        help="src 대신 서버별 큐브 파일 (<dir>/<실험 id>.*.npz) 을 합침 (--experiment 필요)")
+    args = parser.parse_args()
+    if bool(args.src) == bool(args.merge_dir) or (args.merge_dir and not args.experiment):
+        parser.error("src 또는 --merge-dir 와 --experiment 중 하나를 주세요")
+
+    spec = load_task_spec(args.tasks) if args.tasks else load_task_spec()
+    if args.merge_dir:
+        cube = merge_files(spec, cube_files(args.merge_dir, args.experiment))
+    else:
+        cube = cube_from_rows(read_rows(args.src), spec, args.experiment)
+    cube.save(args.out)
+    print(f"{cube.participants}명 · {int(cube.counts.sum())}응답 → {args.out} ({os.path.getsize(args.out)} bytes)")
+    for task_type in dict.fromkeys(cube.types):
+        ratio, _, p, n = cube.curve(task_type)
+        print(task_type, " ".join(f"{r:.2f}:{v:.2f}" for r, v in zip(ratio, p)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import csv
+
+from results_format import participant_key, read_rows
+from task_spec import load_task_spec
+
+# ==========================================
+# 응답 일관성 검사 (내보낸 행을 한 번만 읽음)
+# ==========================================
+# 블록 안에서 LL 금액이 커질수록 이득 과제는 SS→LL, 손실 과제는 LL→SS 로
+# 최대 한 번만 바뀌어야 함. (실험 id, 참여자) → 과제 → 작은 정수 4개 (응답/LL 비트마스크, 응답/LL 수) dict 로 누적하므로
+# 행 순서와 무관하게 참여자당 결과 한 행. 문항 번호가 없는 ADO 행은 단조성 검사에서만 빠짐.
+
+FIELDS = [
+    "participant", "experiment", "n_trials", "nonmonotone_blocks", "nonmonotone_tasks",
+    "fast_rt", "slow_rt", "straightlined_blocks", "straightlined_tasks", "exclude",
+]
+
+
+def is_monotone(choices_ll, sign):
+    """오름차순 금액 순 LL 여부 목록이 한 번 이하, 기대 방향으로만 바뀌는지"""
+    expected_first = sign < 0  # 손실 과제는 LL 로 시작해서 SS 로 바뀜
+    switched = False
+    for ll in choices_ll:
+        if ll != expected_first and not switched:
+            switched = True
+        elif ll == expected_first and switched:
+            return False
+    return True
+
+
+class ConsistencyChecker:
+    """행을 하나씩 받아 참여자별 배제 기준을 누적"""
+
+    def __init__(self, spec, min_rt=0.3, max_rt=60.0, max_nonmonotone=1, max_fast=2, max_straightlined=None):
+        self.spec = spec
+        self.min_rt = min_rt
+        self.max_rt = max_rt
+        self.max_nonmonotone = max_nonmonotone
+        self.max_fast = max_fast
+        self.max_straightlined = max_straightlined  # None 이면 배제 기준으로 쓰지 않음
+        self.sign = {task["id"]: spec.types[task["type"]].get("sign", 1) for task in spec.tasks}
+        self.size = {task["id"]: len(task["vals"]) for task in spec.tasks}
+        self.state = {}
+
+    def add(self, row):
+        task = row["task"]
+        if task not in self.sign or row["choice"] not in ("SS", "LL"):
+            return
+        key = participant_key(row)
+        st = self.state.get(key)
+        if st is None:
+            # [응답 수, 빠른 RT, 느린 RT, {task: [응답 비트, LL 비트, 응답 수, LL 수]}]
+            st = self.state[key] = [0, 0, 0, {}]
+        ll = row["choice"] == "LL"
+        block = st[3].setdefault(task, [0, 0, 0, 0])
+        if row["item"] not in ("", None):
+            bit = 1 << (int(row["item"]) - 1)
+            block[0] |= bit
+            if ll:
+                block[1] |= bit
+        block[2] += 1
+        block[3] += ll
+        st[0] += 1
+        rt = float(row["rt_sec"]) if row.get("rt_sec") not in (None, "") else None
+        if rt is not None:
+            st[1] += rt < self.min_rt
+            st[2] += rt > self.max_rt
+
+    def result(self, key):
+        n, fast, slow, blocks = self.state.pop(key)
+        bad = []
+        flat = []
+        for task, (seen, ll_mask, n_task, n_ll) in blocks.items():
+            items = [i for i in range(self.size[task]) if seen >> i & 1]
+            if not is_monotone([bool(ll_mask >> i & 1) for i in items], self.sign[task]):
+                bad.append(task)
+            # 블록 안의 모든 응답이 같은 선택
+            if n_task > 1 and n_ll in (0, n_task):
+                flat.append(task)
+        exclude = (
+            len(bad) > self.max_nonmonotone
+            or fast > self.max_fast
+            or (self.max_straightlined is not None and len(flat) > self.max_straightlined)
+        )
+        return {
+            "participant": key[1],
+            "experiment": key[0],
+            "n_trials": n,
+            "nonmonotone_blocks": len(bad),
+            "nonmonotone_tasks": ";".join(bad),
+            "fast_rt": fast,
+            "slow_rt": slow,
+            "straightlined_blocks": len(flat),
+            "straightlined_tasks": ";".join(flat),
+            "exclude": exclude,
+        }
+
+    def check(self, rows):
+        """모든 행을 한 번 순회한 뒤 참여자별 결과를 생성 (같은 참여자의 행이 흩어져 있어도 한 번만)"""
+        for row in rows:
+            self.add(row)
+        for key in list(self.state):
+            yield self.result(key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="내보낸 응답의 일관성 검사 및 배제 표 생성")
+    parser.add_argument("csv", help="Google Sheet 에서 내보낸 CSV (save_to_sheets 형식) 또는 .parquet / .arrow")
+    parser.add_argument("--tasks", default=None, help="과제 정의 파일 (기본: tasks.json)")
+    parser.add_argument("--out", default="exclusions.csv")
+    parser.add_argument("--min-rt", type=float, default=0.3)
+    parser.add_argument("--max-rt", type=float, default=60.0)
+    parser.add_argument("--max-nonmonotone", type=int, default=1, help="허용하는 비단조 블록 수")
+    parser.add_argument("--max-fast", type=int, default=2, help="허용하는 min-rt 미만 응답 수")
+    parser.add_argument("--max-straightlined", type=int, default=None,
+                        help="허용하는 같은 선택만 한 블록 수 (기본: 배제 기준으로 쓰지 않음)")
+    args = parser.parse_args()
+
+    spec = load_task_spec(args.tasks) if args.tasks else load_task_spec()
+    checker = ConsistencyChecker(
+        spec, min_rt=args.min_rt, max_rt=args.max_rt, max_nonmonotone=args.max_nonmonotone,
+        max_fast=args.max_fast, max_straightlined=args.max_straightlined,
+    )
+    n = excluded = 0
+    with open(args.out, "w", newline="", encoding="utf-8") as dst:
+        writer = csv.DictWriter(dst, fieldnames=FIELDS)
+        writer.writeheader()
+        for result in checker.check(read_rows(args.csv)):
+            writer.writerow(result)
+            n += 1
+            excluded += result["exclude"]
+    print(f"{n}명 검사, {excluded}명 배제 → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import time
+
+import streamlit as st
+
+# ==========================================
+# 실험자 전용 진행 현황 페이지
+# ==========================================
+
+
+def render_dashboard(experiment_id, spec, aggregate, registry, reaper, admission=None, read_cube=None,
+                     store=None, retry_saves=None):
+    """메모리 집계만 읽어서 표시 (Google Sheet 를 다시 읽지 않음). 문구는 실험의 로케일 (spec.locale).
+    read_cube() 는 새로 고칠 때마다 선택 큐브 (다른 서버의 파일까지 합친 값) 를 돌려줌"""
+    t = spec.locale.text
+    st.markdown(f'<p class="intro-title">{t("dash_title", experiment=experiment_id)}</p>', unsafe_allow_html=True)
+    render_server_status(registry, reaper, spec.locale, admission, store, retry_saves)
+
+    @st.fragment(run_every=5)
+    def live():
+        rates = aggregate.ll_rates()
+        medians = aggregate.median_rts()
+
+        c1, c2 = st.columns(2)
+        c1.metric(t("dash_completed"), len(aggregate.completed))
+        c2.metric(t("dash_trials"), aggregate.n_trials)
+
+        st.subheader(t("dash_ll_rates"))
+        st.dataframe(
+            [
+                {"task": task["id"], "type": task["type"],
+                 t("col_ll_rate"): round(rates[task["id"]][0], 3) if task["id"] in rates else None,
+                 t("col_n"): rates[task["id"]][1] if task["id"] in rates else 0}
+                for task in spec.tasks
+            ],
+            hide_index=True, use_container_width=True,
+        )
+
+        st.subheader(t("dash_median_rt"))
+        st.dataframe(
+            [
+                {"task": task["id"], "item": item,
+                 t("col_median_rt"): medians[(task["id"], item)][0] if (task["id"], item) in medians else None,
+                 t("col_n"): medians[(task["id"], item)][1] if (task["id"], item) in medians else 0}
+                for task in spec.tasks
+                for item in range(1, len(task["vals"]) + 1)
+            ],
+            hide_index=True, use_container_width=True,
+        )
+
+        if read_cube is not None:
+            render_choice_curves(read_cube(), spec.locale)
+
+    live()
+
+
+def render_choice_curves(cube, locale):
+    """과제 유형별 P(LL) 곡선 (x = LL/SS 금액 비율, 과제 블록별 선). 큐브 조회만 함"""
+    t = locale.text
+    st.subheader(t("curves_title"))
+    st.caption(t("curves_participants", n=cube.participants))
+    if cube.save_error:
+        st.warning(t("curves_cube_error", error=cube.save_error))
+    types = list(dict.fromkeys(cube.types))
+    for tab, task_type in zip(st.tabs(types), types):
+        with tab:
+            points = []
+            for task in cube.spec.tasks:
+                if task["type"] != task_type:
+                    continue
+                ratio, _, p, n = cube.curve(task_id=task["id"])
+                points += [
+                    {"LL/SS": round(float(r), 3), "P(LL)": float(v), t("col_task"): task["id"], t("col_n"): int(k)}
+                    for r, v, k in zip(ratio, p, n) if k > 0
+                ]
+            if not points:
+                st.caption(t("curves_empty"))
+                continue
+            st.line_chart(points, x="LL/SS", y="P(LL)", color=t("col_task"))
+            # 검정력 확인: 가장 적은 응답 수 칸과 가장 넓은 95% 신뢰구간
+            widths = [
+                (hi - lo, task["id"], item)
+                for task in cube.spec.tasks if task["type"] == task_type
+                for item in range(1, len(task["vals"]) + 1)
+                for lo, hi in [cube.wilson(task["id"], item)] if hi == hi
+            ]
+            width, task_id, item = max(widths)
+            st.caption(t(
+                "curves_power", n=min(point[t("col_n")] for point in points), width=width / 2, task=task_id, item=item,
+            ))
+
+
+def render_server_status(registry, reaper, locale, admission=None, store=None, retry_saves=None):
+    """서버 프로세스 전체의 진행 중 세션 수와 드레인 제어. store 는 체크포인트 저장소 (보관된 실패 저장 작업),
+    retry_saves() 는 그 작업을 다시 보냄"""
+    t = locale.text
+
+    @st.fragment(run_every=5)
+    def status():
+        st.subheader(t("server_title"))
+        counts = registry.counts_by_phase()
+        failed = store.failed_saves() if store is not None else []
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric(t("metric_in_flight"), registry.in_flight())
+        c2.metric(t("metric_pending"), registry.pending_saves())
+        c3.metric(t("metric_failed"), len(failed))
+        c4.metric(t("metric_intro"), counts.get("intro", 0))
+
+        if failed:
+            st.warning(t(
+                "failed_saves", n=len(failed), participants=len({job["participant"] for job in failed}),
+                rows=sum(len(job["rows"]) for job in failed),
+            ))
+            if retry_saves is not None and st.button(t("retry_saves")):
+                retry_saves()
+                st.rerun()
+
+        reaped = ", ".join(f"{phase}: {n}" for phase, n in sorted(registry.reaped_by_phase.items(), key=str)) or "-"
+        st.caption(t(
+            "reaper_status", n=registry.reaped_total, phases=reaped, minutes=reaper.idle_timeout // 60,
+            time=time.strftime("%H:%M:%S", time.localtime(reaper.last_sweep)) if reaper.last_sweep else "-",
+        ))
+
+        if admission is not None:
+            waits = list(admission.waits)
+            st.caption(t(
+                "admission_status", active=admission.active(), capacity=admission.capacity, waiting=admission.waiting(),
+                duration=admission.mean_duration() / 60, wait=sum(waits) / len(waits) if waits else 0,
+                abandoned=admission.abandoned_total,
+            ))
+
+        if registry.draining:
+            if registry.drained(store):
+                st.success(t("drained"))
+            elif registry.in_flight() == 0 and registry.pending_saves() == 0:
+                st.warning(t("drain_failed_saves"))
+            else:
+                st.warning(t("draining"))
+            if store is not None and not store.persistent and len(store):
+                # 진행 중 세션이 끝나도 중간에 떠난 참여자의 체크포인트는 메모리에 남음
+                st.warning(t("drain_memory_store", n=len(store)))
+            if st.button(t("drain_cancel")):
+                registry.cancel_drain()
+                st.rerun()
+        elif st.button(t("drain_start")):
+            registry.start_drain()
+            registry.flush(timeout=5)
+            st.rerun()
+
+    status()
@@ -0,0 +1,283 @@
+import argparse
+import csv
+
+import numpy as np
+
+from participant_summary import choices_from_summary
+from results_format import participant_key, read_rows
+from task_spec import load_task_spec
+
+# ==========================================
+# 할인 모형 (쌍곡선 k / 지수 δ) 일괄 최대우도 추정
+# ==========================================
+# P(LL) = sigmoid(beta * sign * (A_ll * D(t_ll) - A_ss * D(t_ss)) / A_ss)
+#   hyperbolic : D(t) = 1 / (1 + k t)
+#   exponential: D(t) = delta ** t = exp(-r t)
+# t 는 연 단위. 파라미터는 log 척도 (theta = [log k 또는 log r, log beta]) 로 추정하고
+# 모든 참여자를 (참여자 × 문항) 배열 연산으로 한꺼번에 Fisher scoring.
+# 설계 배열은 모든 참여자가 같은 문항을 본 경우 (T,), 행마다 저장된 금액·지연을 쓰면 (P, T).
+
+MODELS = ("hyperbolic", "exponential")
+
+THETA_MIN = np.array([np.log(1e-4), np.log(1e-2)])
+THETA_MAX = np.array([np.log(1e3), np.log(1e3)])
+
+N_PARAMS = 2
+
+
+def design_from_spec(spec):
+    """spec 의 문항 순서대로 (ss_amount, ll_amount, ss_delay, ll_delay, sign) 배열 (길이 T)"""
+    ss, ll, ss_t, ll_t, sign = [], [], [], [], []
+    for task in spec.tasks:
+        tpl = spec.types[task["type"]]
+        for target in task["vals"]:
+            ss.append(task["base"])
+            ll.append(target)
+            ss_t.append(tpl["ss_delay"] / 12)
+            ll_t.append(tpl["ll_delay"] / 12)
+            sign.append(tpl.get("sign", 1))
+    return tuple(np.asarray(a, dtype=float) for a in (ss, ll, ss_t, ll_t, sign))
+
+
+def choices_from_rows(rows, spec):
+    """save_to_sheets 형식의 행 → (참여자 (실험 id, 이름) 목록, (P, T) 선택 배열: LL=1, SS=0, 결측=NaN).
+    고정 문항 격자 기준이라 문항 번호가 없는 ADO 행은 건너뜀"""
+    column = {}
+    for t_idx, task in enumerate(spec.tasks):
+        for i in range(len(task["vals"])):
+            column[(task["id"], i + 1)] = spec.offsets[t_idx] + i
+    index = {}
+    entries = []
+    for r in rows:
+        if r["item"] in ("", None):
+            continue
+        key = (r["task"], int(r["item"]))
+        if key not in column or r["choice"] not in ("SS", "LL"):
+            continue
+        p = index.setdefault(participant_key(r), len(index))
+        entries.append((p, column[key], 1.0 if r["choice"] == "LL" else 0.0))
+    y = np.full((len(index), spec.total_questions), np.nan)
+    if entries:
+        p, t, c = np.array(entries).T
+        y[p.astype(int), t.astype(int)] = c
+    return list(index), y
+
+
+def trials_from_rows(rows, spec):
+    """save_to_sheets 형식의 행 → (참여자 (실험 id, 이름) 목록, (P, T) 선택 배열, (P, T) 설계 배열).
+    금액·지연은 각 행에 저장된 실제 제시 값 (ADO 행 포함). 지연 열이 없는 이전 행은 과제 유형의 지연,
+    부호는 과제 유형에서 가져옴. T 는 참여자별 최대 응답 수이고 빈 칸은 결측 (설계는 무해한 값)"""
+    types = {task["id"]: spec.types[task["type"]] for task in spec.tasks}
+    trials = {}
+    for r in rows:
+        tpl = types.get(r["task"])
+        if tpl is None or r["choice"] not in ("SS", "LL"):
+            continue
+        ss_delay = tpl["ss_delay"] if r.get("ss_delay") in ("", None) else r["ss_delay"]
+        ll_delay = tpl["ll_delay"] if r.get("ll_delay") in ("", None) else r["ll_delay"]
+        trials.setdefault(participant_key(r), []).append((
+            1.0 if r["choice"] == "LL" else 0.0,
+            float(r["ss_amount"]), float(r["ll_amount"]),
+            float(ss_delay) / 12, float(ll_delay) / 12, tpl.get("sign", 1),
+        ))
+    n_trials = max((len(t) for t in trials.values()), default=0)
+    # 열 순서: 선택, ss, ll, ss_t, ll_t, sign
+    table = np.tile(np.array([np.nan, 1.0, 1.0, 0.0, 0.0, 1.0]), (len(trials), n_trials, 1))
+    for p, values in enumerate(trials.values()):
+        table[p, :len(values)] = values
+    return list(trials), table[..., 0], tuple(table[..., i] for i in range(1, 6))
+
+
+def _take(design, index):
+    """참여자 부분집합의 설계 (모든 참여자 공통인 (T,) 설계는 그대로)"""
+    return tuple(a if a.ndim == 1 else a[index] for a in design)
+
+
+def _discount(model, theta1, t):
+    """D(t) 와 dD/dtheta1 (theta1 = log k 또는 log r)"""
+    rate = np.exp(theta1)[:, None]
+    if model == "hyperbolic":
+        d = 1.0 / (1.0 + rate * t)
+        return d, -rate * t * d * d
+    d = np.exp(-rate * t)
+    return d, -rate * t * d
+
+
+def _evaluate(model, theta, y, observed, design, derivatives=True):
+    """로그우도 (P,), 점수 함수 (P, 2), Fisher 정보 (P, 2, 2)"""
+    ss, ll, ss_t, ll_t, sign = design
+    d_ll, dd_ll = _discount(model, theta[:, 0], ll_t)
+    d_ss, dd_ss = _discount(model, theta[:, 0], ss_t)
+    beta = np.exp(theta[:, 1])[:, None]
+    scale = sign / ss
+    u = beta * scale * (ll * d_ll - ss * d_ss)
+
+    # log p = -log(1+e^-u), log(1-p) = -log(1+e^u)
+    y0 = np.where(observed, y, 0.0)
+    loglik = -(y0 * np.logaddexp(0.0, -u) + (1.0 - y0) * np.logaddexp(0.0, u))
+    loglik = np.where(observed, loglik, 0.0).sum(axis=1)
+    if not derivatives:
+        return loglik, None, None
+
+    p = 0.5 * (1.0 + np.tanh(0.5 * u))
+    g0 = beta * scale * (ll * dd_ll - ss * dd_ss)
+    resid = np.where(observed, y0 - p, 0.0)
+    w = np.where(observed, p * (1.0 - p), 0.0)
+    score = np.stack([(resid * g0).sum(axis=1), (resid * u).sum(axis=1)], axis=-1)
+    i01 = (w * g0 * u).sum(axis=1)
+    info = np.stack([
+        np.stack([(w * g0 * g0).sum(axis=1), i01], axis=-1),
+        np.stack([i01, (w * u * u).sum(axis=1)], axis=-1),
+    ], axis=1)
+    return loglik, score, info
+
+
+def _solve2(info, score, ridge=0.0):
+    """2×2 선형계를 참여자별로 풂"""
+    a = info[:, 0, 0] + ridge
+    b = info[:, 0, 1]
+    d = info[:, 1, 1] + ridge
+    det = a * d - b * b
+    det = np.where(np.abs(det) < 1e-12, 1e-12, det)
+    return np.stack([(d * score[:, 0] - b * score[:, 1]) / det,
+                     (a * score[:, 1] - b * score[:, 0]) / det], axis=-1)
+
+
+def _initial_theta(model, y, observed, design):
+    """격자 탐색으로 시작점 선택"""
+    n = y.shape[0]
+    best_ll = np.full(n, -np.inf)
+    best = np.zeros((n, 2))
+    for t1 in np.linspace(THETA_MIN[0], THETA_MAX[0], 15):
+        for t2 in np.log([0.5, 2.0, 8.0, 32.0]):
+            theta = np.tile([t1, t2], (n, 1))
+            loglik, _, _ = _evaluate(model, theta, y, observed, design, derivatives=False)
+            better = loglik > best_ll
+            best_ll[better] = loglik[better]
+            best[better] = theta[better]
+    return best
+
+
+def fit_model(model, y, design, max_iter=100, tol=1e-6):
+    """한 모형을 모든 참여자에 대해 추정. y: (P, T), LL=1 / SS=0 / 결측=NaN, design: (T,) 또는 (P, T) 배열"""
+    observed = ~np.isnan(y)
+    theta = _initial_theta(model, y, observed, design)
+    loglik, score, info = _evaluate(model, theta, y, observed, design)
+    converged = np.zeros(len(y), dtype=bool)
+
+    for _ in range(max_iter):
+        active = ~converged
+        if not active.any():
+            break
+        step = _solve2(info[active], score[active], ridge=1e-6)
+        theta_a = theta[active]
+        ll_a = loglik[active]
+        y_a = y[active]
+        obs_a = observed[active]
+        # 로그우도가 늘어날 때까지 참여자별로 보폭 절반씩 축소
+        scale = np.ones(len(theta_a))
+        accepted = np.zeros(len(theta_a), dtype=bool)
+        new_theta = theta_a.copy()
+        new_ll = ll_a.copy()
+        design_a = _take(design, active)
+        for _ in range(10):
+            pending = ~accepted
+            cand = np.clip(theta_a[pending] + scale[pending, None] * step[pending], THETA_MIN, THETA_MAX)
+            cand_ll, _, _ = _evaluate(model, cand, y_a[pending], obs_a[pending], _take(design_a, pending), derivatives=False)
+            ok = cand_ll >= ll_a[pending] - 1e-12
+            idx = np.flatnonzero(pending)[ok]
+            new_theta[idx] = cand[ok]
+            new_ll[idx] = cand_ll[ok]
+            accepted[idx] = True
+            scale[pending] *= 0.5
+            if accepted.all():
+                break
+        done = (np.abs(new_ll - ll_a) < tol) | ~accepted
+        theta[active] = new_theta
+        act_idx = np.flatnonzero(active)
+        converged[act_idx[done]] = True
+        loglik[active], score[active], info[active] = _evaluate(model, new_theta, y_a, obs_a, design_a)
+
+    # 표준오차: Fisher 정보 역행렬 (log 척도) → 델타 방법으로 원 척도
+    inv = np.linalg.pinv(info)
+    se_theta = np.sqrt(np.clip(np.diagonal(inv, axis1=1, axis2=2), 0.0, None))
+    params = np.exp(theta)
+    boundary = np.isclose(theta, THETA_MIN).any(axis=1) | np.isclose(theta, THETA_MAX).any(axis=1)
+    n_obs = observed.sum(axis=1)
+    return {
+        "theta": theta,
+        "se_theta": se_theta,
+        "params": params,
+        "se": params * se_theta,
+        "loglik": loglik,
+        "aic": 2 * N_PARAMS - 2 * loglik,
+        "bic": N_PARAMS * np.log(np.maximum(n_obs, 1)) - 2 * loglik,
+        "converged": converged,
+        "boundary": boundary,
+        "n_obs": n_obs,
+    }
+
+
+def fit_discount_models(y, design):
+    """쌍곡선·지수 모형을 모두 추정하고 참여자별 AIC 로 비교"""
+    fits = {model: fit_model(model, y, design) for model in MODELS}
+    delta_aic = fits["exponential"]["aic"] - fits["hyperbolic"]["aic"]
+    fits["comparison"] = {
+        "delta_aic": delta_aic,  # > 0 이면 쌍곡선 모형이 더 적합
+        "preferred": np.where(delta_aic > 0, "hyperbolic", "exponential"),
+        "total_aic": {model: float(fits[model]["aic"].sum()) for model in MODELS},
+    }
+    return fits
+
+
+def summary_rows(participants, fits):
+    """참여자별 결과 행 (CSV 출력용). participants 는 (실험 id, 이름) 목록"""
+    h, e, cmp_ = fits["hyperbolic"], fits["exponential"], fits["comparison"]
+    for i, (experiment, participant) in enumerate(participants):
+        yield {
+            "participant": participant,
+            "experiment": experiment,
+            "n_obs": int(h["n_obs"][i]),
+            "k": h["params"][i, 0], "k_se": h["se"][i, 0],
+            "k_beta": h["params"][i, 1], "k_beta_se": h["se"][i, 1],
+            "k_loglik": h["loglik"][i], "k_aic": h["aic"][i],
+            "k_boundary": bool(h["boundary"][i]),
+            # delta = exp(-r): 연간 할인 계수
+            "delta": np.exp(-e["params"][i, 0]), "delta_se": np.exp(-e["params"][i, 0]) * e["se"][i, 0],
+            "delta_beta": e["params"][i, 1], "delta_beta_se": e["se"][i, 1],
+            "delta_loglik": e["loglik"][i], "delta_aic": e["aic"][i],
+            "delta_boundary": bool(e["boundary"][i]),
+            "delta_aic_diff": cmp_["delta_aic"][i],
+            "preferred": cmp_["preferred"][i],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저장된 응답에서 참여자별 할인 모형 추정")
+    parser.add_argument("csv", help="Google Sheet 에서 내보낸 CSV (save_to_sheets 형식) 또는 .parquet / .arrow")
+    parser.add_argument("--tasks", default=None, help="과제 정의 파일 (기본: tasks.json)")
+    parser.add_argument("--out", default="discount_fits.csv")
+    parser.add_argument("--summary", action="store_true", help="입력이 summary 워크시트 (참여자당 한 행) 를 내보낸 CSV")
+    args = parser.parse_args()
+
+    spec = load_task_spec(args.tasks) if args.tasks else load_task_spec()
+    if args.summary:
+        # 요약 행은 고정 문항 격자라 설계는 과제 정의와 같음
+        with open(args.csv, newline="", encoding="utf-8") as f:
+            participants, y = choices_from_summary(csv.DictReader(f), spec)
+        design = design_from_spec(spec)
+    else:
+        participants, y, design = trials_from_rows(read_rows(args.csv), spec)
+    fits = fit_discount_models(y, design)
+
+    rows = list(summary_rows(participants, fits))
+    with open(args.out, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["participant", "experiment"])
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"{len(participants)}명 추정 완료 → {args.out}")
+    print("총 AIC:", fits["comparison"]["total_aic"])
+
+
+if __name__ == "__main__":
+    main()
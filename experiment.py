@@ -0,0 +1,1299 @@
+import streamlit as st
+from datetime import datetime
+import copy
+from concurrent.futures import Future
+import hmac
+import json
+import os
+import socket
+import time
+import urllib.parse
+import gspread
+from google.oauth2.service_account import Credentials
+from admission import AdmissionControl
+from ado import ADOEngine, design_id
+from aggregates import ResponseAggregate
+from choice_cube import ChoiceCube, cube_files, merge_files, replica_path
+from checkpoint import CHECKPOINT_TTL, new_token, open_checkpoint_store
+from dashboard import render_dashboard
+from i18n import load_locale
+from offline_bundle import BundleError, ack_token, build_bundle, bundle_key, compile_trials, decode_payload, decode_session, spec_hash
+from participant_ids import ID_PARAM, Roster, with_pid
+from reaper import SessionReaper
+from registry import SessionRegistry
+from sheets_async import AsyncSheetsWriter, service_account_token_provider
+from streamlit import runtime
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from task_spec import load_experiments, load_task_spec
+import ado
+import break_timer
+import participant_summary
+import preload
+import tracing
+
+# ==========================================
+# 1. Google Sheets 설정
+# ==========================================
+
+@st.cache_resource
+def get_google_client():
+    """gspread 클라이언트 (프로세스 내 모든 실험·세션이 공유)"""
+    creds = Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"],
+        scopes=[
+            "https://www.googleapis.com/auth/spreadsheets",
+            "https://www.googleapis.com/auth/drive"
+        ]
+    )
+    return gspread.authorize(creds)
+
+@st.cache_resource
+def open_worksheet(sheet_id, title=None, cols=26):
+    """시트 id별 첫 번째 워크시트, 또는 이름이 title 인 워크시트 (없으면 열 cols 개로 생성). 한 번 연 뒤 재사용"""
+    spreadsheet = get_google_client().open_by_key(sheet_id)
+    if title is None:
+        return spreadsheet.sheet1
+    try:
+        return spreadsheet.worksheet(title)
+    except gspread.WorksheetNotFound:
+        return spreadsheet.add_worksheet(title=title, rows=1, cols=cols)
+
+def get_secret(key, default=None):
+    """선택 항목 조회 (secrets.toml 이 없어도 기본값 반환)"""
+    try:
+        return st.secrets.get(key, default)
+    except FileNotFoundError:
+        return default
+
+EXAMPLE_DASHBOARD_KEY = "임의의_긴_문자열"  # secrets.toml.example 에 적힌 자리 표시 값
+
+def check_operator_key():
+    """실험자 전용 화면 (대시보드·번들 받기·결과 업로드) 접근 확인. 거부하면 오류를 띄우고 False.
+    dashboard_key 가 없거나 예시 값 그대로이면 항상 거부"""
+    dashboard_key = get_secret("dashboard_key")
+    if dashboard_key == EXAMPLE_DASHBOARD_KEY:
+        st.error(get_locale().text("key_example"))
+        return False
+    given = str(st.query_params.get("key", "")).encode()
+    if not (dashboard_key and hmac.compare_digest(given, str(dashboard_key).encode())):
+        st.error(get_locale().text("key_denied"))
+        return False
+    return True
+
+def get_sheet_id(exp_id):
+    """실험별 시트 id (secrets 의 sheet_ids 에 없으면 공통 sheet_id)"""
+    sheet_ids = get_secret("sheet_ids", {})
+    return sheet_ids[exp_id] if exp_id in sheet_ids else st.secrets["sheet_id"]
+
+# design 은 과제 블록 + LL 금액 (ADO 행은 item 이 비어 있고 design 으로 구분), 지연은 개월.
+# experiment 는 실험 id (여러 실험이 같은 시트에 저장해도 참여자·표시 통화를 구분)
+HEADERS = [
+    "participant", "task", "item", "choice", "ss_amount", "ll_amount", "rt_sec", "submitted_at",
+    "design", "ss_delay", "ll_delay", "experiment",
+]
+
+@st.cache_resource
+def get_async_writer(sheet_id, worksheet=None):
+    """비동기 저장기 (시트 id·워크시트별 하나, 이벤트 루프·HTTP/2 연결을 모든 세션이 공유)"""
+    token_provider = service_account_token_provider(dict(st.secrets["gcp_service_account"]))
+    return AsyncSheetsWriter(sheet_id, token_provider, worksheet=worksheet)
+
+def use_async_sheets():
+    return get_secret("sheets_backend") == "async"
+
+def build_rows(responses, participant_name, experiment_id):
+    submitted_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    rows = []
+    for r in responses:
+        row = [
+            participant_name,
+            r.get("task", ""),
+            r.get("item", ""),
+            r.get("choice", ""),
+            r.get("ss_amount", ""),
+            r.get("ll_amount", ""),
+            r.get("rt_sec", ""),
+            submitted_at,
+            r.get("design", ""),
+            r.get("ss_delay", ""),
+            r.get("ll_delay", ""),
+            experiment_id,
+        ]
+        rows.append(row)
+    return rows
+
+# ==========================================
+# 저장 작업 (응답 시트·보조 워크시트 공통 경로)
+# ==========================================
+# 작업 하나 = 한 워크시트에 보낼 행 묶음. 재시도 후에도 보내지 못한 작업은 체크포인트 저장소에
+# 보관하므로 서버가 재시작되거나 다른 서버로 옮겨도 대시보드의 '다시 보내기' 로 이어서 보냄.
+
+def new_save_job(rows, participant_name, worksheet=None, headers=HEADERS, then=()):
+    return {
+        "id": new_token(),
+        "experiment": st.session_state.experiment_id,
+        "participant": participant_name,
+        "worksheet": worksheet,  # None 이면 응답 시트 (첫 번째 워크시트)
+        "headers": list(headers),
+        "rows": rows,
+        "then": list(then),      # 이 작업이 저장된 뒤에만 보내는 작업 (응답 → 요약·k 추정치)
+    }
+
+def saved_effects(job):
+    """작업 저장 후 할 일. 응답 작업이면 대시보드 집계의 완료 표시와 선택 큐브 갱신
+    (저장된 참여자만 큐브에 들어가고, 다시 보내기로 저장돼도 한 번만 더해짐)"""
+    if job["worksheet"] is not None:
+        return lambda: None
+    aggregate = get_aggregate(job["experiment"])
+    cube = get_choice_cube(job["experiment"])
+
+    def effects():
+        aggregate.complete(job["participant"])
+        update_choice_cube(cube, [dict(zip(job["headers"], row)) for row in job["rows"]])
+    return effects
+
+def ensure_header(sheet, headers):
+    # 헤더 확인은 첫 행만 읽음 (시트 전체를 읽으면 누적 행 수만큼 느려짐)
+    existing = sheet.row_values(1)
+    if sheet.col_count < len(headers):
+        sheet.add_cols(len(headers) - sheet.col_count)
+    if not existing:
+        sheet.append_row(headers)
+    elif existing != headers and headers[:len(existing)] == existing:
+        # 뒤에 열이 추가되기 전의 시트 (예: design·지연 열 없음): 헤더 행만 새 열 목록으로 교체
+        sheet.update([headers], "A1")
+
+def finished_future(ok, error=None):
+    future = Future()
+    if error is None:
+        future.set_result(ok)
+    else:
+        future.set_exception(error)
+    return future
+
+def prepare_save(job):
+    """작업과 후속 작업을 보내는 함수 (인자 없음, Future 반환) 준비. 저장소·저장기·워크시트는 여기서
+    (스크립트 스레드) 미리 조회하므로 비동기 저장기 스레드의 완료 콜백에서도 후속 작업을 보낼 수 있음"""
+    store = get_checkpoint_store()
+    registry = get_registry()
+    effects = saved_effects(job)
+    followups = [prepare_save(child) for child in job["then"]]
+    use_async = use_async_sheets()
+    try:
+        sheet_id = get_sheet_id(job["experiment"])
+        if use_async:
+            target = get_async_writer(sheet_id, job["worksheet"])
+        else:
+            target = open_worksheet(sheet_id, job["worksheet"], len(job["headers"]))
+    except Exception as e:
+        target = e
+
+    def saved():
+        effects()
+        for send in followups:
+            send()
+
+    def failed(error):
+        # 후속 작업은 이 작업 안에 들어 있으므로 다시 보낼 때 함께 보내짐
+        store.add_failed(job)
+        return finished_future(False, error)
+
+    def send():
+        if isinstance(target, Exception):
+            return failed(target)
+        if use_async:
+            # 전송·재시도는 저장기 스레드에서
+            future = target.append_rows(job["rows"], header=job["headers"])
+            future.add_done_callback(lambda f: saved() if f.exception() is None else store.add_failed(job))
+            registry.track_save(future)
+            return future
+        try:
+            ensure_header(target, job["headers"])
+            target.append_rows(job["rows"])
+        except Exception as e:
+            return failed(e)
+        saved()
+        return finished_future(True)
+
+    return send
+
+def submit_save(job):
+    """작업 전송 (후속 작업은 성공한 뒤에). 동기 백엔드는 이미 끝난 Future, 비동기는 예약만 하고 Future 반환.
+    실패한 작업은 저장소에 보관"""
+    future = prepare_save(job)()
+    if future.done() and future.exception() is not None:
+        st.error(get_locale().text("save_failed", error=future.exception()))
+    return future
+
+def save_succeeded(future):
+    """끝난 작업은 성공 여부, 아직 전송 중이면 True (예약됨)"""
+    return not future.done() or future.exception() is None
+
+def retry_failed_saves():
+    """보관된 실패 작업을 다시 보냄 (대시보드). 다른 세션이 먼저 꺼낸 작업은 건너뜀"""
+    store = get_checkpoint_store()
+    return [submit_save(job) for job in store.failed_saves() if store.remove_failed(job["id"])]
+
+def save_to_sheets(responses, participant_name, started_at=None, then=()):
+    """응답 행 저장 (한 번에 모든 행 추가). 요약 행 등 후속 작업은 응답 저장이 성공한 뒤에만 보냄.
+    완료 후 체크포인트 삭제도 이 저장의 성공을 기다림"""
+    followups = list(then)
+    if not is_adaptive():
+        followups.append(summary_job(responses, participant_name, started_at))
+    rows = build_rows(responses, participant_name, st.session_state.experiment_id)
+    future = submit_save(new_save_job(rows, participant_name, then=followups))
+    st.session_state.pending_save = future
+    return save_succeeded(future)
+
+TRACE_WORKSHEET = "trace"
+TRACE_REPORT_WAIT = 3  # 마지막 문항의 브라우저 보고를 기다리는 최대 시간 (초)
+
+def append_log_rows(worksheet, headers, rows):
+    """응답 시트와 같은 스프레드시트의 보조 워크시트 (없으면 생성) 에 행 추가"""
+    return save_succeeded(submit_save(new_save_job(rows, st.session_state.participant_name, worksheet, headers)))
+
+def save_traces():
+    """문항별 시각 기록을 같은 스프레드시트의 trace 워크시트에 저장"""
+    st.session_state.trace_saved = True
+    rows = tracing.trace_rows(st.session_state.traces, st.session_state.trace_client, st.session_state.participant_name)
+    return append_log_rows(TRACE_WORKSHEET, tracing.TRACE_HEADERS, rows)
+
+SUMMARY_WORKSHEET = "summary"
+
+def summary_job(responses, participant_name, started_at=None):
+    """참여자별 넓은 요약 행 (선택·RT 전체, 과제별 합계) 을 summary 워크시트에 보내는 작업 (고정 문항 실험만)"""
+    row = participant_summary.summary_row(
+        responses, participant_name, st.session_state.experiment_id, get_spec(), started_at=started_at,
+    )
+    return new_save_job([row], participant_name, SUMMARY_WORKSHEET, participant_summary.summary_headers(get_spec()))
+
+def seed_aggregate(exp_id):
+    """프로세스 재시작 후 처음 대시보드를 열 때 summary 워크시트 (참여자당 한 행) 로 집계 복원"""
+    aggregate = get_aggregate(exp_id)
+    if aggregate.seeded:
+        return
+    aggregate.seeded = True
+    try:
+        records = open_worksheet(get_sheet_id(exp_id), SUMMARY_WORKSHEET).get_all_records()
+    except Exception as e:
+        st.warning(get_locale().text("summary_read_failed", error=e))
+        return
+    spec = get_spec()
+    # 다른 서버·이전 프로세스의 큐브 파일이 있으면 이전 참여자는 이미 그 파일에 들어 있음
+    cube = get_choice_cube(exp_id)
+    seed_cube = not cube.loaded and not other_cube_files(exp_id)
+    for record in records:
+        if str(record.get("experiment")) == exp_id:
+            trials = participant_summary.trials_from_summary(record, spec)
+            if aggregate.seed(str(record["participant"]), trials) and seed_cube:
+                cube.add(trials)
+
+BREAK_WORKSHEET = "break"
+
+def save_break_log():
+    """참여자별 실제 휴식 시간 (일시정지 제외) 을 break 워크시트에 저장"""
+    row = break_timer.log_row(st.session_state.break_state, st.session_state.participant_name, st.session_state.experiment_id)
+    return append_log_rows(BREAK_WORKSHEET, break_timer.BREAK_HEADERS, [row])
+
+PIPELINE_WORKSHEET = "pipeline"
+PIPELINE_HEADERS = [
+    "participant", "experiment", "step", "session_started_at", "started_at", "finished_at", "task_sec", "session_sec",
+]
+
+def pipeline_job():
+    """방금 끝낸 실험의 시작·종료 시각과 세션 시작 시각을 pipeline 워크시트에 보내는 작업
+    (step: 같은 세션에서 몇 번째 실험인지. 이어지는 실험도 같은 세션 시작 시각을 기록)"""
+    entry = st.session_state.pipeline[-1]
+    session_started_at = st.session_state.session_started_at
+    stamp = lambda t: time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(t))
+    row = [
+        st.session_state.participant_name, entry["experiment"], len(st.session_state.pipeline),
+        stamp(session_started_at), stamp(entry["started_at"]), stamp(entry["finished_at"]),
+        round(entry["finished_at"] - entry["started_at"], 1), round(entry["finished_at"] - session_started_at, 1),
+    ]
+    return new_save_job([row], st.session_state.participant_name, PIPELINE_WORKSHEET, PIPELINE_HEADERS)
+
+ADO_WORKSHEET = "ado"
+
+def ado_estimate_job():
+    """ADO 실험 종료 시 최종 k 추정치 (log k 사후 평균·SD) 를 ado 워크시트에 보내는 작업"""
+    engine = get_ado_engine(get_experiment()["tasks"], get_experiment()["locale"])
+    row = ado.estimate_row(
+        engine, st.session_state.ado_log_post, st.session_state.participant_name,
+        st.session_state.experiment_id, len(st.session_state.responses),
+    )
+    return new_save_job([row], st.session_state.participant_name, ADO_WORKSHEET, ado.ESTIMATE_HEADERS)
+
+# ==========================================
+# 2. 초기화 및 설정
+# ==========================================
+
+# 실험별 설정은 experiments.json, 과제 블록·금액·문항 텍스트는 tasks.json 에서 정의
+
+def get_experiment():
+    """현재 세션의 실험 설정"""
+    _, experiments = load_experiments()
+    return experiments[st.session_state.experiment_id]
+
+def get_spec():
+    return load_task_spec(get_experiment()["tasks"], get_experiment()["locale"])
+
+def get_locale():
+    """현재 실험의 참여자 화면 문구·금액 표기 (experiments.json 의 locale, 기본 ko)"""
+    return load_locale(get_experiment()["locale"])
+
+def is_adaptive():
+    return get_experiment().get("mode") == "ado"
+
+@st.cache_resource
+def get_ado_engine(tasks_path, locale):
+    """과제 정의·로케일별 ADO 엔진 (후보 설계·확률 표를 시작 시 한 번만 계산)"""
+    return ADOEngine(load_task_spec(tasks_path, locale))
+
+def is_tracing():
+    return get_experiment().get("trace", False)
+
+def get_total_questions():
+    return get_experiment()["ado_trials"] if is_adaptive() else get_spec().total_questions
+
+def init_session(exp_id):
+    # 인트로 화면에서는 URL 로 선택한 실험으로 전환, 진행 중에는 유지
+    if 'experiment_id' not in st.session_state or st.session_state.get('current_phase', 'intro') == 'intro':
+        st.session_state.experiment_id = exp_id
+    if 'responses' not in st.session_state:
+        st.session_state.responses = []
+    if 'current_phase' not in st.session_state:
+        st.session_state.current_phase = 'intro'
+    if 'task_idx' not in st.session_state:
+        st.session_state.task_idx = 0
+    if 'item_idx' not in st.session_state:
+        st.session_state.item_idx = 0
+    if 'participant_name' not in st.session_state:
+        st.session_state.participant_name = ""
+    if 'question_start_time' not in st.session_state:
+        st.session_state.question_start_time = time.time()
+    if 'processing' not in st.session_state:
+        st.session_state.processing = False
+    if 'break_start_time' not in st.session_state:
+        st.session_state.break_start_time = None
+    if 'break_state' not in st.session_state:
+        st.session_state.break_state = None
+    if 'session_started_at' not in st.session_state:
+        st.session_state.session_started_at = None
+    if 'pipeline' not in st.session_state:
+        st.session_state.pipeline = []
+    if 'traces' not in st.session_state:
+        reset_traces()
+    if 'queued_at' not in st.session_state:
+        st.session_state.queued_at = None
+    if 'run_id' not in st.session_state:
+        st.session_state.run_id = ""
+
+def reset_traces():
+    st.session_state.traces = []          # 문항별 서버 시각
+    st.session_state.trace_client = {}    # 화면 (응답 수) → 브라우저 클릭·표시 시각
+    st.session_state.trace_saved = False
+    st.session_state.trace_finished_at = None
+
+# ==========================================
+# 3. 헬퍼 함수
+# ==========================================
+
+@st.cache_resource
+def get_checkpoint_store():
+    """체크포인트 저장소 (secrets 의 session_store 가 없으면 이 프로세스 메모리, 있으면 SQLite·Redis 공유)"""
+    return open_checkpoint_store(get_secret("session_store"), ttl=get_secret("checkpoint_ttl", CHECKPOINT_TTL))
+
+RESUME_PARAM = "resume"  # 이어하기 토큰 URL 파라미터 (새로고침·다른 서버로 재연결 시 자동 복원)
+
+@st.cache_resource
+def get_registry():
+    """진행 중 세션 목록 (프로세스 전체 공유)"""
+    return SessionRegistry()
+
+@st.cache_resource
+def get_reaper():
+    """방치된 세션 정리 스레드 (프로세스당 하나)"""
+    return SessionReaper(
+        get_registry(),
+        idle_timeout=get_secret("session_idle_timeout", 1800),
+        interval=get_secret("session_reap_interval", 60),
+        on_reap=reaped_session_closer(get_admission(), get_roster()),
+    )
+
+def reaped_session_closer(admission, roster):
+    """정리 스레드에서 호출하는 함수: 정리된 세션의 입장 자리·ID 점유를 반납하고 Streamlit 세션을 닫음.
+    세션을 닫으면 session_state 가 바로 해제됨 (진행 상태는 체크포인트에 있으므로 새로고침하면 이어하기 토큰으로 복원)"""
+    def close(info):
+        session_id = info["session_id"]
+        if admission is not None:
+            admission.release(session_id)
+        if roster is not None and info.get("participant"):
+            roster.release(info["participant"], claim_owner(session_id))
+        if runtime.exists():
+            instance = runtime.get_instance()
+            # close_session 은 이벤트 루프 스레드에서만 호출 가능
+            instance._get_async_objs().eventloop.call_soon_threadsafe(instance.close_session, session_id)
+    return close
+
+def current_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "bare"
+
+REPLICA_ID = f"{socket.gethostname()}:{os.getpid()}"  # 명단 ID 점유의 소유자 = 서버/세션, 서버별 큐브 파일 이름
+
+def claim_owner(session_id=None):
+    return f"{REPLICA_ID}/{session_id or current_session_id()}"
+
+def can_take_claim(owner, other_replica=False):
+    """점유한 세션이 이 서버의 세션이면 연결이 끊겼거나 정리된 경우 넘겨받음.
+    다른 서버의 세션은 여기서 확인할 수 없으므로 other_replica 값 (이어하기 토큰이 있으면 True), 아니면 점유 만료까지 기다림"""
+    replica, _, session_id = owner.rpartition("/")
+    if replica != REPLICA_ID:
+        return other_replica
+    return not is_session_active(session_id)
+
+def register_session():
+    """현재 세션의 단계·진행 위치를 세션 목록에 반영"""
+    get_registry().update(
+        current_session_id(),
+        experiment=st.session_state.experiment_id,
+        participant=st.session_state.participant_name,
+        phase=st.session_state.current_phase,
+        task_idx=st.session_state.task_idx,
+        item_idx=st.session_state.item_idx,
+        n_responses=len(st.session_state.responses),
+        # 휴식 화면은 클릭 없이 머무르므로 휴식 시간만큼 더 기다림
+        extra_idle=get_experiment()["break_duration"] if st.session_state.current_phase == 'break' else 0,
+    )
+
+@st.cache_resource
+def get_roster():
+    """참여자 ID 명단 (secrets 의 participant_roster 가 없으면 None → 자유 입력)"""
+    path = get_secret("participant_roster")
+    if not path:
+        return None
+    # 점유·완료 기록은 체크포인트 저장소에 (session_store 가 있으면 여러 서버가 공유)
+    return Roster.from_csv(
+        path, get_secret("roster_journal"), store=get_checkpoint_store(),
+        claim_ttl=get_secret("session_idle_timeout", 1800),
+    )
+
+@st.cache_resource
+def get_admission():
+    """동시 진행 세션 상한 (secrets 의 max_active_sessions 가 없으면 None → 제한 없음)"""
+    capacity = get_secret("max_active_sessions")
+    if not capacity:
+        return None
+    return AdmissionControl(
+        int(capacity),
+        queue_timeout=get_secret("admission_queue_timeout", 30),
+        expected_duration=get_secret("expected_session_seconds", 600),
+    )
+
+def request_admission():
+    """새 시작 요청. 자리가 없으면 대기열에 넣고 False"""
+    admission = get_admission()
+    return admission is None or admission.request(current_session_id(), is_session_active)
+
+def hold_admission():
+    """대기 없이 자리 차지 (체크포인트 이어하기, 같은 세션의 다음 실험)"""
+    if get_admission() is not None:
+        get_admission().admit(current_session_id())
+
+def release_admission():
+    if get_admission() is not None:
+        get_admission().release(current_session_id())
+
+def is_session_active(session_id):
+    """브라우저 연결이 살아 있고 정리·완료되지 않은 세션인지"""
+    if get_registry().get(session_id) is None:
+        return False
+    return not runtime.exists() or runtime.get_instance().is_active_session(session_id)
+
+def claim_participant(raw):
+    """입력값 확인 후 ID 점유 (명단이 없으면 그대로 사용). 실패하면 경고를 띄우고 None"""
+    roster = get_roster()
+    if roster is None:
+        return raw
+    pid, reason = roster.lookup(raw)
+    if pid is None:
+        if reason == "typo":
+            st.warning(get_locale().text("id_typo"))
+        else:
+            st.warning(get_locale().text("id_unknown"))
+        return None
+    if not roster.claim(pid, claim_owner(), can_take_claim):
+        st.warning(get_locale().text("id_in_use"))
+        return None
+    return pid
+
+def handle_reaped_session():
+    """정리된 세션이 다시 실행되면 상태를 비우고 인트로로 (반환값: 정리 여부)"""
+    registry = get_registry()
+    session_id = current_session_id()
+    if not registry.is_reaped(session_id):
+        return False
+    registry.acknowledge_reaped(session_id)
+    # 대기열 자리·입장 자리와 ID 점유를 반납 (인트로로 돌아간 탭이 자리를 계속 잡고 있지 않도록)
+    release_admission()
+    if get_roster() is not None and st.session_state.get("participant_name"):
+        get_roster().release(st.session_state.participant_name, claim_owner(session_id))
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    return True
+
+@st.cache_resource
+def get_aggregate(exp_id):
+    """실험별 누적 집계 (대시보드에서 조회)"""
+    return ResponseAggregate()
+
+@st.cache_resource
+def get_choice_cube(exp_id):
+    """이 서버 프로세스가 저장한 참여자의 실험별 문항 × 선택 큐브.
+    secrets 의 choice_cube_dir 가 있으면 서버별 파일 <dir>/<실험 id>.<서버>.npz 에 보관 (다른 서버의 파일을 덮어쓰지 않음)"""
+    _, experiments = load_experiments()
+    cube_dir = get_secret("choice_cube_dir")
+    return ChoiceCube(
+        load_task_spec(experiments[exp_id]["tasks"], experiments[exp_id]["locale"]),
+        replica_path(cube_dir, exp_id, REPLICA_ID) if cube_dir else None,
+    )
+
+def other_cube_files(exp_id):
+    """다른 서버·이전 프로세스가 남긴 실험의 큐브 파일 (choice_cube_dir 가 없으면 빈 목록)"""
+    cube_dir = get_secret("choice_cube_dir")
+    return cube_files(cube_dir, exp_id, exclude=get_choice_cube(exp_id).path) if cube_dir else []
+
+def read_choice_cube(exp_id):
+    """대시보드용 큐브: 이 서버의 큐브에 다른 서버·이전 프로세스의 파일을 더한 값"""
+    cube = get_choice_cube(exp_id)
+    others = other_cube_files(exp_id)
+    return merge_files(cube.spec, others, base=cube) if others else cube
+
+def update_choice_cube(cube, responses):
+    """저장된 참여자의 응답을 큐브에 더하고 파일로 보관 (저장기 스레드에서도 호출되므로 실패는 큐브에 기록)"""
+    cube.add(responses)
+    if cube.path:
+        try:
+            cube.save()
+            cube.save_error = None
+        except OSError as e:
+            cube.save_error = str(e)
+
+# 체크포인트 키 = (실험 id, 참여자, 진행 id). 명단 ID 는 원자적으로 점유되므로 진행 id 없이 ID 로
+# 이어하기. 자유 입력 이름은 다른 참여자가 같은 이름을 쓸 수 있으므로 시작할 때마다 새 진행 id 를
+# 만들고, 그 진행의 이어하기는 URL 의 토큰으로만 함.
+
+def checkpoint_key(participant_name):
+    return (st.session_state.experiment_id, participant_name, st.session_state.run_id)
+
+def choose_run_id(participant_name):
+    """명단 ID 는 "", 자유 입력 이름은 URL 토큰이 같은 이름의 진행을 가리키면 그 진행 id, 아니면 새 id"""
+    if get_roster() is not None:
+        return ""
+    token = st.query_params.get(RESUME_PARAM)
+    key = get_checkpoint_store().resolve(token) if token else None
+    if key is not None and len(key) == 3 and key[1] == participant_name and key[2]:
+        return key[2]
+    return new_token()
+
+def save_checkpoint():
+    if st.session_state.current_phase == 'done':
+        return
+    get_checkpoint_store().save(checkpoint_key(st.session_state.participant_name), st.session_state)
+    if get_roster() is not None:
+        get_roster().claim(st.session_state.participant_name, claim_owner())  # 진행 중인 동안 점유 만료 연장
+
+def restore_checkpoint(participant_name):
+    """같은 ID의 체크포인트가 있으면 이어서 진행 (복원 여부 반환)"""
+    saved = None
+    for exp_id in pipeline_chain(st.session_state.experiment_id):
+        saved = get_checkpoint_store().load((exp_id, participant_name, st.session_state.run_id))
+        if saved is not None:
+            st.session_state.experiment_id = exp_id
+            break
+    if saved is None:
+        return False
+    for key, value in saved.items():
+        if key != "saved_at":
+            st.session_state[key] = value
+    st.session_state.responses = list(saved["responses"])
+    if "traces" in saved:
+        st.session_state.traces = [dict(t) for t in saved["traces"]]
+        st.session_state.trace_client = dict(saved["trace_client"])
+    if saved.get("break_state") is not None:
+        st.session_state.break_state = copy.deepcopy(saved["break_state"])
+    return True
+
+def clear_checkpoint():
+    """완료 후 체크포인트 삭제. 응답 저장이 아직 전송 중이면 끝났을 때 삭제.
+    실패해도 삭제: 행은 실패한 저장 작업에 보관되므로, 남겨 두면 이어하기가 마지막 문항으로 돌아가 같은 행을 다시 보냄"""
+    store = get_checkpoint_store()
+    key = checkpoint_key(st.session_state.participant_name)
+    future = st.session_state.get("pending_save")
+    if future is None:
+        store.clear(key)
+        return
+    # 저장기의 완료 콜백 (실패하면 작업 보관) 이 먼저 등록되어 있으므로 그 뒤에 실행됨
+    future.add_done_callback(lambda f: store.clear(key))
+
+def bind_resume_token():
+    """현재 체크포인트 키에 새 토큰을 연결하고 URL 에 표시"""
+    token = new_token()
+    get_checkpoint_store().bind(token, checkpoint_key(st.session_state.participant_name))
+    st.query_params[RESUME_PARAM] = token
+
+def resume_from_token():
+    """새 세션이 URL 의 토큰으로 체크포인트를 찾으면 그 위치부터 이어서 진행 (복원 여부 반환)"""
+    token = st.query_params.get(RESUME_PARAM)
+    if not token:
+        return False
+    key = get_checkpoint_store().resolve(token)
+    saved = get_checkpoint_store().load(key) if key is not None and len(key) == 3 else None
+    # 토큰은 그 진행의 URL 에만 있으므로 다른 서버에 남은 (새로고침 전) 세션의 점유는 넘겨받음
+    if saved is None or (get_roster() is not None and not get_roster().claim(
+            key[1], claim_owner(), lambda owner: can_take_claim(owner, other_replica=True))):
+        del st.query_params[RESUME_PARAM]
+        return False
+    st.session_state.experiment_id, st.session_state.participant_name, st.session_state.run_id = key
+    restore_checkpoint(key[1])
+    hold_admission()
+    reset_timer()
+    return True
+
+def pipeline_chain(exp_id):
+    """exp_id 부터 next 로 이어지는 실험 id 목록"""
+    _, experiments = load_experiments()
+    chain = []
+    while exp_id is not None and exp_id not in chain:
+        chain.append(exp_id)
+        exp_id = experiments[exp_id].get("next")
+    return chain
+
+def start_experiment():
+    """현재 실험의 첫 문항부터 시작하고 파이프라인 기록에 추가"""
+    now = time.time()
+    if st.session_state.session_started_at is None:
+        st.session_state.session_started_at = now
+    st.session_state.pipeline.append({"experiment": st.session_state.experiment_id, "started_at": now})
+    st.session_state.queued_at = None
+    bind_resume_token()
+    if is_adaptive():
+        engine = get_ado_engine(get_experiment()["tasks"], get_experiment()["locale"])
+        st.session_state.ado_log_post = engine.initial_state()
+        st.session_state.ado_used = []
+        st.session_state.ado_design = engine.select(st.session_state.ado_log_post)
+    st.session_state.current_phase = 'task'
+
+def start_next_experiment():
+    """같은 세션 안에서 다음 실험으로 전환 (참여자 ID·세션 시작 시각 유지)"""
+    st.session_state.experiment_id = get_experiment()["next"]
+    st.session_state.responses = []
+    st.session_state.task_idx = 0
+    st.session_state.item_idx = 0
+    st.session_state.break_start_time = None
+    st.session_state.break_state = None
+    st.session_state.processing = False
+    reset_traces()
+    hold_admission()
+    start_experiment()
+    reset_timer()
+
+def reset_timer():
+    st.session_state.question_start_time = time.time()
+
+def get_rt():
+    return round(time.time() - st.session_state.question_start_time, 3)
+
+def get_current_question_number():
+    """현재 문항 번호 계산 (1-TOTAL_QUESTIONS)"""
+    if is_adaptive():
+        return len(st.session_state.responses) + 1
+    return get_spec().offsets[st.session_state.task_idx] + st.session_state.item_idx + 1
+
+def get_current_trial():
+    """(task, item_idx). ADO 모드에서는 엔진이 고른 설계와 누적 문항 수"""
+    if is_adaptive():
+        engine = get_ado_engine(get_experiment()["tasks"], get_experiment()["locale"])
+        return engine.designs[st.session_state.ado_design], len(st.session_state.responses)
+    return get_spec().tasks[st.session_state.task_idx], st.session_state.item_idx
+
+def get_question_text(task, item_idx):
+    """과제 유형에 따른 질문 텍스트 반환 (미리 생성된 값 조회)"""
+    if "text" in task:  # ADO 후보 설계
+        return task["text"]
+    return get_spec().question(task, item_idx)
+
+def record_response(choice, ss_val, ll_val, task_id, item_num, rt=None):
+    """rt 를 주지 않으면 서버 타이머로 계산 (미리 보내기 모드는 브라우저에서 잰 값).
+    ADO 문항은 item_num 이 "" 이고 design 으로 구분"""
+    if rt is None:
+        rt = get_rt()
+    ss_delay, ll_delay = get_spec().delays[task_id]
+    st.session_state.responses.append({
+        "task": task_id,
+        "item": item_num,
+        "choice": choice,
+        "ss_amount": ss_val,
+        "ll_amount": ll_val,
+        "rt_sec": rt,
+        "design": design_id(task_id, ll_val),
+        "ss_delay": ss_delay,
+        "ll_delay": ll_delay,
+    })
+    get_aggregate(st.session_state.experiment_id).record(task_id, item_num, choice, rt)
+    reset_timer()
+
+def answer(choice, ss_val, ll_val, task_id, item_num, question_number):
+    """선택 버튼 콜백: 응답 기록 후 다음 문항으로 (fragment 재실행 직전에 실행)"""
+    received = time.time()
+    if get_registry().is_reaped(current_session_id()):
+        return  # 정리된 세션의 클릭: 기록·체크포인트 저장 없이 전체 재실행에서 인트로로 (fragment 는 main() 을 건너뜀)
+    if st.session_state.current_phase != 'task' or get_current_question_number() != question_number:
+        return  # 이미 처리한 문항 화면에서 온 중복 클릭
+    st.session_state.processing = True
+    get_registry().touch(current_session_id())
+    record_response(choice, ss_val, ll_val, task_id, item_num)
+    trace_click(received)
+    next_question()
+    save_checkpoint()
+    # fragment 재실행에서는 main() 이 돌지 않으므로 진행 위치를 여기서 반영
+    register_session()
+    st.session_state.processing = False
+
+def receive_preloaded():
+    """미리 보내기 화면의 콜백: 아직 기록하지 않은 순번부터 이어지는 선택만 기록"""
+    if st.session_state.current_phase != 'task' or get_registry().is_reaped(current_session_id()):
+        return
+    spec = get_spec()
+    accepted = preload.accept(spec, len(st.session_state.responses), preload.received())
+    if not accepted:
+        return  # 이미 기록한 재전송이거나 앞 순번이 빠진 경우 (다음 재전송을 기다림)
+    get_registry().touch(current_session_id())
+    for _, task_idx, item_idx, choice, rt in accepted:
+        task = spec.tasks[task_idx]
+        record_response(choice, task["base"], task["vals"][item_idx], task["id"], item_idx + 1, rt=rt)
+        next_question()
+    save_checkpoint()
+    register_session()
+
+def trace_click(received):
+    """방금 기록한 응답의 서버 수신·기록 완료 시각"""
+    if is_tracing():
+        r = st.session_state.responses[-1]
+        tracing.begin(st.session_state.traces, r["task"], r["item"], r["rt_sec"], received, time.time())
+
+def _apply_trace_report():
+    """브라우저 보고값 반영. 과제가 끝난 뒤에는 마지막 보고가 오면 (또는 잠시 뒤) 저장"""
+    report = tracing.probe(len(st.session_state.responses))
+    if report and report["trial"] not in st.session_state.trace_client:
+        st.session_state.trace_client[report["trial"]] = dict(report)
+    if st.session_state.current_phase != 'task' and not st.session_state.trace_saved:
+        waited = time.time() - st.session_state.trace_finished_at
+        if len(st.session_state.responses) in st.session_state.trace_client or waited > TRACE_REPORT_WAIT:
+            save_traces()
+
+# 보고로 인한 재실행은 이 fragment 만 다시 실행. 완료 화면은 재실행이 없으므로 저장 전까지 1초마다 확인
+render_trace_probe = st.fragment(_apply_trace_report)
+wait_trace_report = st.fragment(_apply_trace_report, run_every=1)
+
+def end_trace_render():
+    """화면을 다 그린 시점 기록 후 브라우저 보고 확인 (추적 모드에서만)"""
+    if not is_tracing():
+        return
+    tracing.mark_rerun_end(st.session_state.traces, time.time())
+    if st.session_state.current_phase in ('break', 'done') and not st.session_state.trace_saved:
+        wait_trace_report()
+    else:
+        render_trace_probe()
+
+def next_question():
+    """다음 문항으로 이동"""
+    if is_adaptive():
+        next_adaptive_question()
+        return
+    tasks = get_spec().tasks
+    if st.session_state.item_idx < len(tasks[st.session_state.task_idx]['vals']) - 1:
+        st.session_state.item_idx += 1
+    elif st.session_state.task_idx < len(tasks) - 1:
+        st.session_state.task_idx += 1
+        st.session_state.item_idx = 0
+    else:
+        finish_task()
+
+def next_adaptive_question():
+    """마지막 응답으로 사후분포를 갱신하고 정보량이 가장 큰 다음 설계 선택"""
+    engine = get_ado_engine(get_experiment()["tasks"], get_experiment()["locale"])
+    design = st.session_state.ado_design
+    st.session_state.ado_log_post = engine.update(
+        st.session_state.ado_log_post, design, st.session_state.responses[-1]["choice"]
+    )
+    st.session_state.ado_used = st.session_state.ado_used + [design]
+    if len(st.session_state.responses) >= get_total_questions():
+        finish_task()
+    else:
+        st.session_state.ado_design = engine.select(st.session_state.ado_log_post, st.session_state.ado_used)
+
+def finish_task():
+    """모든 문항 종료: 저장 후 휴식 또는 완료 단계로"""
+    if st.session_state.pipeline:
+        st.session_state.pipeline[-1]["finished_at"] = time.time()
+    st.session_state.trace_finished_at = time.time()
+    pipeline = st.session_state.pipeline
+    followups = [ado_estimate_job()] if is_adaptive() else []
+    if pipeline:
+        followups.append(pipeline_job())
+    save_to_sheets(
+        st.session_state.responses, st.session_state.participant_name,
+        started_at=pipeline[-1]["started_at"] if pipeline else None, then=followups,
+    )
+    if get_roster() is not None:
+        get_roster().complete(st.session_state.experiment_id, st.session_state.participant_name)
+    if get_experiment()["break_duration"] > 0:
+        st.session_state.break_start_time = time.time()
+        st.session_state.break_state = break_timer.start(get_experiment()["break_duration"], st.session_state.break_start_time)
+        st.session_state.current_phase = 'break'
+    else:
+        # 휴식 없이 바로 완료
+        st.session_state.current_phase = 'done'
+        clear_checkpoint()
+
+# ==========================================
+# 4. 스타일 설정
+# ==========================================
+
+def apply_custom_styles():
+    """커스텀 CSS 스타일 적용"""
+    st.markdown("""
+    <style>
+    /* 전체 폰트 크기 증가 및 가운데 정렬 */
+    .main .block-container {
+        max-width: 800px;
+        padding-top: 2rem;
+    }
+
+    /* 질문 텍스트 스타일 */
+    .question-text {
+        font-size: 1.8rem;
+        font-weight: 500;
+        text-align: center;
+        margin: 2rem 0;
+        line-height: 1.6;
+    }
+
+    /* 진행률 카운터 스타일 */
+    .progress-counter {
+        font-size: 1.4rem;
+        font-weight: 700;
+        text-align: center;
+        color: #222222;
+        margin-bottom: 0.5rem;
+    }
+
+    /* 버튼 스타일 */
+    .stButton > button {
+        font-size: 1.3rem !important;
+        padding: 1rem 2rem !important;
+        min-height: 80px !important;
+        border-radius: 12px !important;
+    }
+
+    /* 진행바 스타일 - 채워진 부분: 검정, 빈 부분: 아주 연한 회색 */
+    .stProgress > div > div {
+        background-color: #f0f0f0 !important;
+        border: 1px solid #ddd !important;
+    }
+    .stProgress > div > div > div {
+        background-color: #222222 !important;
+    }
+
+    /* 인트로 페이지 스타일 */
+    .intro-title {
+        font-size: 2.5rem;
+        font-weight: 700;
+        text-align: center;
+        margin-bottom: 1.5rem;
+    }
+
+    .intro-text {
+        font-size: 1.3rem;
+        text-align: center;
+        line-height: 1.8;
+    }
+
+    /* 완료 페이지 스타일 */
+    .done-title {
+        font-size: 2.5rem;
+        font-weight: 700;
+        text-align: center;
+        color: #28a745;
+        margin: 2rem 0;
+    }
+
+    .done-text {
+        font-size: 1.5rem;
+        text-align: center;
+    }
+
+    /* 휴식 페이지 스타일 */
+    .break-title {
+        font-size: 2.5rem;
+        font-weight: 700;
+        text-align: center;
+        color: #007bff;
+        margin: 2rem 0;
+    }
+    .break-text {
+        font-size: 1.3rem;
+        text-align: center;
+        line-height: 1.8;
+    }
+    .timer-display {
+        font-size: 4rem;
+        font-weight: 700;
+        text-align: center;
+        color: #222222;
+        margin: 2rem 0;
+        font-family: monospace;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+# ==========================================
+# 5. 메인 함수
+# ==========================================
+
+def select_experiment(default_exp_id):
+    """URL 의 ?exp= 값이 등록된 실험이면 그 실험, 아니면 기본값"""
+    _, experiments = load_experiments()
+    exp_id = st.query_params.get("exp", default_exp_id)
+    return exp_id if exp_id in experiments else default_exp_id
+
+@st.fragment
+def render_trial():
+    """문항 화면. 클릭하면 이 fragment 만 다시 실행 (페이지 설정·스타일·세션 초기화·레이아웃은 건너뜀)"""
+    if st.session_state.current_phase != 'task' or get_registry().is_reaped(current_session_id()):
+        # 마지막 문항 응답 후 휴식/완료 화면, 정리된 세션의 인트로 복귀는 전체 재실행으로
+        st.rerun()
+    k = get_experiment().get("preload")
+    if k:
+        base = len(st.session_state.responses)
+        preload.render(
+            f"{st.session_state.experiment_id}:{st.session_state.participant_name}",
+            base, get_total_questions(), preload.upcoming(get_spec(), base, k), receive_preloaded, get_locale(),
+        )
+        return
+    task, i_idx = get_current_trial()
+
+    # 현재 문항 번호 및 진행률
+    total_q = get_total_questions()
+    current_q = get_current_question_number()
+    progress = current_q / total_q
+
+    # Progress Bar + 카운터
+    st.markdown(f'<p class="progress-counter">{current_q} / {total_q}</p>', unsafe_allow_html=True)
+    st.progress(progress)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # 질문 텍스트
+    question, ss_txt, ll_txt, ss_val, ll_val = get_question_text(task, i_idx)
+    # ADO 설계는 고정 문항 번호가 없음 (design 으로 구분)
+    item_num = "" if is_adaptive() else i_idx + 1
+    st.markdown(f'<p class="question-text">{question.replace("**", "<strong>").replace("**", "</strong>")}</p>', unsafe_allow_html=True)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # 선택 버튼 (콜백에서 기록·이동하므로 클릭 한 번에 재실행 한 번)
+    disabled = st.session_state.processing
+    c1, c2 = st.columns(2)
+    c1.button(ss_txt, use_container_width=True, disabled=disabled, key="btn_ss",
+              on_click=answer, args=('SS', ss_val, ll_val, task['id'], item_num, current_q))
+    c2.button(ll_txt, use_container_width=True, disabled=disabled, key="btn_ll",
+              on_click=answer, args=('LL', ss_val, ll_val, task['id'], item_num, current_q))
+    end_trace_render()
+
+BREAK_POLL = 10                   # 휴식 중 서버 확인 주기 (초). 초 단위 표시는 브라우저가 함
+BREAK_PAUSE_GRACE = 3 * BREAK_POLL  # break_pause="disconnect" 일 때 이보다 긴 확인 공백은 일시정지
+
+def end_break():
+    """마감 도달: 휴식 기록 저장 후 완료 단계로"""
+    break_timer.finish(st.session_state.break_state)
+    save_break_log()
+    st.session_state.current_phase = 'done'
+    clear_checkpoint()
+
+@st.fragment(run_every=BREAK_POLL)
+def render_break():
+    """남은 시간은 서버 마감 시각 기준. 카운트다운은 브라우저가 그리고 0 이 되면 재실행 요청"""
+    if get_registry().is_reaped(current_session_id()):
+        st.rerun()  # 정리된 세션은 전체 재실행에서 상태를 비우고 인트로로 (fragment 는 main() 을 건너뜀)
+    experiment = get_experiment()
+    state = st.session_state.break_state
+    remaining = break_timer.poll(state, rule=experiment.get("break_pause", "none"), grace=BREAK_PAUSE_GRACE)
+    if remaining <= 0:
+        end_break()
+        st.rerun()
+    # 마지막 확인 시각·일시정지가 다른 서버에서도 이어지도록
+    save_checkpoint()
+    locale = get_locale()
+    st.markdown(f'<p class="break-title">{locale.text("break_title")}</p>', unsafe_allow_html=True)
+    st.markdown(f'<p class="break-text">{locale.text("break_text")}</p>', unsafe_allow_html=True)
+    break_timer.countdown(remaining, state["duration"], on_expired=lambda: None)
+
+QUEUE_POLL = 2  # 대기 화면의 입장 확인 주기 (초)
+
+@st.fragment(run_every=QUEUE_POLL)
+def render_queue():
+    """자리가 날 때까지 대기 순번·예상 시간 표시. 입장하면 첫 문항으로"""
+    registry = get_registry()
+    session_id = current_session_id()
+    if registry.is_reaped(session_id):
+        st.rerun()
+    # 대기 중인 확인도 활동으로 침 (기다리는 동안 정리되지 않도록)
+    registry.touch(session_id)
+    if registry.accepting and request_admission():
+        start_experiment()
+        reset_timer()
+        st.rerun()
+    admission = get_admission()
+    position = admission.position(session_id) or 1
+    minutes = max(1, round(admission.eta(session_id) / 60))
+    locale = get_locale()
+    st.markdown(f'<p class="break-title">{locale.text("queue_title")}</p>', unsafe_allow_html=True)
+    st.markdown(
+        f'<p class="break-text">{locale.text("queue_text", position=position, minutes=minutes)}</p>',
+        unsafe_allow_html=True,
+    )
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        if st.button(locale.text("queue_cancel"), use_container_width=True):
+            release_admission()
+            if get_roster() is not None:
+                get_roster().release(st.session_state.participant_name, claim_owner(session_id))
+            st.session_state.queued_at = None
+            st.rerun()
+
+def get_sync_secret():
+    """오프라인 번들의 서명 키를 유도하는 비밀값 (sync_secret, 없으면 dashboard_key). 없거나 예시 값이면 None"""
+    secret = get_secret("sync_secret") or get_secret("dashboard_key")
+    return secret if secret and secret != EXAMPLE_DASHBOARD_KEY else None
+
+def get_bundle_key():
+    """현재 실험·과제 정의의 번들 서명 키 (비밀값이 없으면 None)"""
+    secret = get_sync_secret()
+    if secret is None:
+        return None
+    return bundle_key(secret, st.session_state.experiment_id, spec_hash(compile_trials(get_spec())))
+
+def app_base_url():
+    """현재 페이지 주소에서 쿼리를 뺀 값 (secrets 의 app_url 이 있으면 그 값)"""
+    parts = urllib.parse.urlsplit(get_secret("app_url") or st.context.url or "")
+    return urllib.parse.urlunsplit(parts._replace(query="", fragment=""))
+
+def render_offline_download():
+    """오프라인 번들 (HTML 한 파일) 내려받기"""
+    exp_id = st.session_state.experiment_id
+    locale = get_locale()
+    st.markdown(f'<p class="intro-title">{locale.text("offline_title", experiment=exp_id)}</p>', unsafe_allow_html=True)
+    st.markdown(f'<p class="intro-text">{locale.text("offline_intro")}</p>', unsafe_allow_html=True)
+    st.download_button(
+        locale.text("offline_download"),
+        build_bundle(get_experiment(), get_spec(), app_base_url(), get_sync_secret()),
+        file_name=f"offline-{exp_id}.html",
+        mime="text/html",
+        use_container_width=True,
+    )
+
+# 저장한 것으로 보고 번들에 확인을 보내는 상태 (나머지는 sync_rejected·sync_not_in_roster)
+SYNC_ACCEPTED = ("sync_saved", "sync_duplicate", "sync_kept")
+
+def save_offline_session(raw, key):
+    """번들 세션 하나를 기존 저장 경로로 저장. (참여자, 상태 문구 키, 거부 사유) 반환"""
+    try:
+        session_id, participant, responses = decode_session(raw, get_spec(), key)
+    except (BundleError, TypeError, ValueError) as e:
+        return None, "sync_rejected", str(e)
+    roster = get_roster()
+    if roster is not None:
+        pid, _ = roster.lookup(participant)
+        if pid is None:
+            return participant, "sync_not_in_roster", None
+        participant = pid
+    # 저장한 세션 표시는 체크포인트 저장소에 (여러 서버·재시작 후에도 같은 결과는 한 번만 저장)
+    if not get_checkpoint_store().add_mark("synced", f"{st.session_state.experiment_id}\t{session_id}"):
+        return participant, "sync_duplicate", None
+    # 실패한 저장은 실패한 저장 목록에 보관되어 다시 보내지므로 표시를 지우지 않음 (번들이 다시 보내도 한 번만 저장)
+    status = "sync_saved" if save_to_sheets(responses, participant) else "sync_kept"
+    if roster is not None:
+        roster.complete(st.session_state.experiment_id, participant)
+    return participant, status, None
+
+def send_sync_ack(session_id, key):
+    """전송 링크를 연 번들 창에 저장 확인을 보냄 (번들은 서명이 맞는 확인을 받은 세션만 전송 완료로 표시)"""
+    ack = json.dumps({"dd_synced": str(session_id), "ack": ack_token(key, str(session_id))}).replace("</", "<\\/")
+    st.html(f"<script>if (window.opener) window.opener.postMessage({ack}, '*');</script>", unsafe_allow_javascript=True)
+
+def render_sync():
+    """오프라인 번들 결과 저장 (?payload= 한 건, 또는 실험자 키로 내보낸 JSON 파일 업로드)"""
+    locale = get_locale()
+    st.markdown(f'<p class="intro-title">{locale.text("sync_title")}</p>', unsafe_allow_html=True)
+    key = get_bundle_key()
+    if key is None:
+        st.error(locale.text("sync_no_secret"))
+        return
+    payload = st.query_params.get("payload")
+    if payload:
+        try:
+            raw = decode_payload(payload)
+        except BundleError as e:
+            st.error(str(e))
+            return
+        participant, status, error = save_offline_session(raw, key)
+        message = f"{participant or ''} {locale.text(status, error=error)}"
+        if status in SYNC_ACCEPTED:
+            (st.warning if status == "sync_kept" else st.success)(message)
+            send_sync_ack(raw["id"], key)
+        else:
+            st.error(message)
+        return
+    if not check_operator_key():
+        return
+    upload = st.file_uploader(locale.text("sync_upload"), type="json")
+    if upload is not None:
+        results = [save_offline_session(raw, key) for raw in json.load(upload)]
+        st.dataframe(
+            [{"participant": p, "status": locale.text(status, error=error)} for p, status, error in results],
+            use_container_width=True,
+        )
+
+def main(exp_id=None):
+    default_exp_id, experiments = load_experiments()
+    exp_id = exp_id or default_exp_id
+    # 페이지 제목은 세션 상태보다 먼저 정해야 하므로 URL 로 고른 실험의 로케일 기준
+    page_title = load_locale(experiments[select_experiment(exp_id)]["locale"]).text("page_title")
+    st.set_page_config(page_title=page_title, page_icon="📋", layout="centered")
+    apply_custom_styles()
+    get_reaper()
+    reaped = handle_reaped_session()
+    init_session(select_experiment(exp_id))
+
+    # ===== DASHBOARD (?view=dashboard&key=... , 실험자 전용) =====
+    if st.query_params.get("view") == "dashboard":
+        if check_operator_key():
+            dash_exp_id = st.session_state.experiment_id
+            seed_aggregate(dash_exp_id)
+            render_dashboard(
+                dash_exp_id, get_spec(), get_aggregate(dash_exp_id),
+                get_registry(), get_reaper(), get_admission(), lambda: read_choice_cube(dash_exp_id),
+                store=get_checkpoint_store(), retry_saves=retry_failed_saves,
+            )
+        return
+
+    # ===== OFFLINE (?view=offline&key=... 번들 받기, ?view=sync 결과 저장) =====
+    if st.query_params.get("view") == "offline":
+        if check_operator_key():
+            render_offline_download()
+        return
+    if st.query_params.get("view") == "sync":
+        render_sync()
+        return
+
+    # 새 세션 (새로고침·다른 서버로 재연결) 이면 URL 토큰으로 진행 상태 복원
+    if st.session_state.current_phase == 'intro' and not st.session_state.participant_name and not reaped:
+        resume_from_token()
+
+    register_session()
+    experiment = get_experiment()
+    locale = get_locale()
+    phase = st.session_state.current_phase
+
+    # ===== QUEUE (max_active_sessions 초과 시 인트로 대신 대기 화면) =====
+    if phase == 'intro' and st.session_state.queued_at is not None:
+        render_queue()
+
+    # ===== INTRO =====
+    elif phase == 'intro':
+        if reaped:
+            st.info(locale.text("reaped"))
+        st.markdown(f'<p class="intro-title">{locale.text("intro_title")}</p>', unsafe_allow_html=True)
+        st.markdown(f'<p class="intro-text">\n{locale.text("intro_text")}\n</p>', unsafe_allow_html=True)
+
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            # 앞 실험에서 ?pid= 로 넘어온 ID 는 미리 채움
+            name = st.text_input(locale.text("name_label"), value=st.query_params.get(ID_PARAM, ""), label_visibility="visible")
+            if st.button(locale.text("start"), type="primary", use_container_width=True):
+                pid = claim_participant(name.strip()) if name.strip() else None
+                if pid:
+                    st.session_state.participant_name = pid
+                    st.session_state.run_id = choose_run_id(pid)
+                    # 드레인 중에도 이미 진행 중이던 참여자의 이어하기는 허용
+                    if restore_checkpoint(st.session_state.participant_name):
+                        hold_admission()
+                        bind_resume_token()
+                    elif get_roster() is not None and get_roster().is_completed(st.session_state.experiment_id, pid):
+                        st.warning(locale.text("id_completed"))
+                    elif not get_registry().accepting:
+                        st.warning(locale.text("not_accepting"))
+                    elif request_admission():
+                        start_experiment()
+                    else:
+                        # 자리가 없으면 ID 점유를 유지한 채 대기 화면으로
+                        st.session_state.queued_at = time.time()
+                        st.rerun()
+                    if st.session_state.current_phase != 'intro':
+                        reset_timer()
+                        st.rerun()
+                    elif get_roster() is not None:
+                        get_roster().release(pid, claim_owner())
+                elif not name.strip():
+                    st.warning(locale.text("name_required"))
+
+    # ===== TASK (tasks.json 의 모든 블록 × 문항, 또는 ADO 가 고른 문항) =====
+    elif phase == 'task':
+        render_trial()
+
+    # ===== BREAK (break_duration > 0 인 실험만) =====
+    elif phase == 'break':
+        # 다른 요소 숨기기
+        st.markdown("""
+        <style>
+        section[data-testid="stSidebar"] { display: none; }
+        .stProgress, .stButton, .question-text, .progress-counter { display: none !important; }
+        </style>
+        """, unsafe_allow_html=True)
+
+        if st.session_state.break_state is None:
+            # 마감 시각 도입 전 체크포인트: 시작 시각에서 마감 계산
+            st.session_state.break_state = break_timer.start(experiment["break_duration"], st.session_state.break_start_time)
+        render_break()
+        end_trace_render()
+
+    # ===== DONE =====
+    elif phase == 'done':
+        get_registry().finish(current_session_id())
+        release_admission()
+        st.balloons()
+
+        st.markdown(f'<p class="done-title">{experiment["done_title"]}</p>', unsafe_allow_html=True)
+        st.markdown(f'<p class="done-text">{experiment["done_text"]}</p>', unsafe_allow_html=True)
+
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            if experiment.get("next"):
+                # 파이프라인 모드: 다음 실험을 같은 프로세스에서 바로 시작
+                if st.button(locale.text("next_experiment"), type="primary", use_container_width=True):
+                    start_next_experiment()
+                    st.rerun()
+            else:
+                st.link_button(
+                    locale.text("next_experiment"),
+                    with_pid(experiment["next_url"], st.session_state.participant_name),
+                    use_container_width=True
+                )
+        end_trace_render()
@@ -0,0 +1,117 @@
+import json
+import os
+import string
+from functools import lru_cache
+
+# ==========================================
+# 참여자 화면 언어·금액 표기 (locales/<코드>.json)
+# ==========================================
+# number : 금액 표기. 표시값 = 과제 정의 금액 × factor ÷ scale 을 decimals 자리까지 반올림
+#          (끝자리 0 제거), thousands / decimal 구분 기호, 뒤에 unit.
+#          ko 는 scale 10000 · unit "만" (50만, 50.5만). 저장되는 금액은 과제 정의 값 그대로.
+# types  : 과제 유형별 question / ss / ll 템플릿 ({base}, {target}). 없는 유형은 tasks.json 의 템플릿.
+# strings: 인트로·대기·휴식·완료 화면과 브라우저 쪽 (미리 받은 문항, 오프라인 번들) 문구 (STRING_KEYS),
+#          실험자 화면 (대시보드·오프라인 번들 받기·결과 전송) 문구 (OPERATOR_KEYS, 번들에는 넣지 않음).
+# 문항 문구는 과제 정의를 읽을 때 로케일별로 한 번만 만들어 둠 (task_spec.load_task_spec).
+
+LOCALES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locales")
+DEFAULT_LOCALE = "ko"
+
+NUMBER_DEFAULTS = {"factor": 1, "scale": 1, "decimals": 0, "thousands": ",", "decimal": ".", "unit": ""}
+STRING_KEYS = (
+    "page_title", "intro_title", "intro_text", "name_label", "start", "name_required",
+    "id_typo", "id_unknown", "id_in_use", "id_completed", "not_accepting", "reaped",
+    "queue_title", "queue_text", "queue_cancel", "break_title", "break_text", "next_experiment",
+    "done_title", "done_text", "break_done_title", "break_done_text", "save_failed",
+    "preload_wait", "preload_saving",
+    "offline_pending", "offline_when_online", "offline_send", "offline_export", "offline_again",
+)
+OPERATOR_KEYS = (
+    "key_example", "key_denied", "summary_read_failed",
+    "dash_title", "dash_completed", "dash_trials", "dash_ll_rates", "dash_median_rt",
+    "col_ll_rate", "col_n", "col_median_rt", "col_task",
+    "curves_title", "curves_participants", "curves_cube_error", "curves_empty", "curves_power",
+    "server_title", "metric_in_flight", "metric_pending", "metric_failed", "metric_intro",
+    "failed_saves", "retry_saves", "reaper_status", "admission_status",
+    "drained", "draining", "drain_failed_saves", "drain_memory_store", "drain_cancel", "drain_start",
+    "offline_title", "offline_intro", "offline_download",
+    "sync_title", "sync_no_secret", "sync_upload",
+    "sync_saved", "sync_duplicate", "sync_kept", "sync_rejected", "sync_not_in_roster",
+)
+OPERATOR_FIELDS = {
+    "experiment", "error", "n", "participants", "rows", "phases", "minutes", "time", "active", "capacity",
+    "waiting", "duration", "wait", "abandoned", "width", "task", "item",
+}
+TEMPLATE_KEYS = ("question", "ss", "ll")
+
+
+class LocaleError(ValueError):
+    """로케일 파일 형식 오류"""
+
+
+class Locale:
+    """검증이 끝난 로케일 (금액 표기 규칙과 문구)"""
+
+    def __init__(self, code, number, strings, types):
+        self.code = code
+        self.number = number
+        self.strings = strings
+        self.types = types
+
+    def amount(self, x):
+        """과제 정의 금액 → 화면 표기 (예: 505000 → '50.5만', en: '$505' 의 '505')"""
+        n = self.number
+        v = round(x * n["factor"] / n["scale"], n["decimals"])
+        if n["decimals"]:
+            text = f"{v:,.{n['decimals']}f}".rstrip("0").rstrip(".")
+        else:
+            text = f"{int(v):,}"
+        text = text.replace(",", "\0").replace(".", n["decimal"]).replace("\0", n["thousands"])
+        return text + n["unit"]
+
+    def template(self, type_name, key, fallback):
+        return self.types.get(type_name, {}).get(key, fallback)
+
+    def text(self, key, **fields):
+        value = self.strings[key]
+        return value.format(**fields) if fields else value
+
+
+def _check_template(where, template, fields):
+    if not isinstance(template, str):
+        raise LocaleError(f"{where}: 문자열이어야 합니다")
+    for _, field, _, _ in string.Formatter().parse(template):
+        if field is not None and field not in fields:
+            raise LocaleError(f"{where}: 알 수 없는 필드 {{{field}}}")
+
+
+@lru_cache(maxsize=None)
+def load_locale(code=DEFAULT_LOCALE):
+    """locales/<code>.json 을 한 번만 읽고 검증해서 캐시"""
+    path = os.path.join(LOCALES_DIR, f"{code}.json")
+    if not os.path.exists(path):
+        raise LocaleError(f"로케일 '{code}' 파일이 없습니다: {path}")
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+
+    number = dict(NUMBER_DEFAULTS, **raw.get("number", {}))
+    if not (number["factor"] > 0 and number["scale"] > 0 and isinstance(number["decimals"], int) and number["decimals"] >= 0):
+        raise LocaleError(f"{code}.number: factor·scale 은 양수, decimals 는 0 이상의 정수여야 합니다")
+
+    strings = raw.get("strings", {})
+    missing = [k for k in STRING_KEYS + OPERATOR_KEYS if k not in strings]
+    if missing:
+        raise LocaleError(f"{code}.strings: {', '.join(missing)} 항목이 없습니다")
+    for key in STRING_KEYS:
+        # 자리 표시자가 있는 문구만 필드를 가짐 (queue_text: position, minutes 등)
+        _check_template(f"{code}.strings.{key}", strings[key], {"position", "minutes", "n", "participant", "error"})
+    for key in OPERATOR_KEYS:
+        _check_template(f"{code}.strings.{key}", strings[key], OPERATOR_FIELDS)
+
+    types = raw.get("types", {})
+    for name, templates in types.items():
+        for key, template in templates.items():
+            if key not in TEMPLATE_KEYS:
+                raise LocaleError(f"{code}.types.{name}: 알 수 없는 항목 {key}")
+            _check_template(f"{code}.types.{name}.{key}", template, {"base", "target"})
+    return Locale(code, number, strings, types)
@@ -0,0 +1,313 @@
+import base64
+import hashlib
+import hmac
+import html
+import json
+
+from ado import design_id
+from i18n import STRING_KEYS
+from participant_ids import ID_PARAM
+
+# ==========================================
+# 오프라인 과제 번들 (HTML 한 파일) 과 나중에 보내는 결과 형식
+# ==========================================
+# 과제 정의를 미리 컴파일한 문항 목록·휴식 시간·완료 문구를 HTML 에 넣어서 서버 없이 실행.
+# 결과는 브라우저 localStorage 에 쌓아 두고, 네트워크가 되면 앱의 ?view=sync 로 보냄.
+# 보내는 값은 선택 문자열 (S/L, 문항 순서대로) 과 RT (ms) 뿐이고 금액·과제 id 는
+# 서버가 같은 과제 정의로 다시 계산함 (spec 해시가 다르면 거부).
+# 화면 문구는 과제 정의의 로케일 (spec.locale) 문구를 그대로 넣음.
+# 번들에는 서버 비밀값에서 유도한 번들 키만 넣고, 브라우저가 그 키로 세션마다 HMAC 서명을 붙임.
+# 서버는 서명이 맞는 결과만 저장하고, 저장 확인 (역시 서명) 을 받은 세션만 번들에서 전송 완료로 표시.
+
+PAYLOAD_VERSION = 2
+
+
+class BundleError(ValueError):
+    pass
+
+
+def compile_trials(spec):
+    """문항 순서대로 (과제 id, 문항 번호, 질문, SS 문구, LL 문구, SS 금액, LL 금액)"""
+    trials = []
+    for task in spec.tasks:
+        for i in range(len(task["vals"])):
+            question, ss_txt, ll_txt, ss_val, ll_val = spec.question(task, i)
+            trials.append([task["id"], i + 1, question, ss_txt, ll_txt, ss_val, ll_val])
+    return trials
+
+
+def spec_hash(trials):
+    return hashlib.sha1(json.dumps(trials, ensure_ascii=False).encode()).hexdigest()[:12]
+
+
+def bundle_key(secret, experiment_id, trials_hash):
+    """실험·과제 정의별 서명 키 (hex). 서버 비밀값 자체는 번들에 넣지 않음"""
+    return hmac.new(secret.encode(), f"{experiment_id}:{trials_hash}".encode(), hashlib.sha256).hexdigest()
+
+
+def sign(key, message):
+    return hmac.new(bytes.fromhex(key), message.encode(), hashlib.sha256).hexdigest()
+
+
+def session_message(raw):
+    """서명 대상 문자열 (번들 JS 의 message() 와 같은 형식)"""
+    return "\n".join([
+        str(raw.get("v")), str(raw.get("h")), str(raw.get("id")), str(raw.get("p")),
+        str(raw.get("c")), ",".join(str(int(rt)) for rt in raw.get("rt", [])),
+    ])
+
+
+def ack_token(key, session_id):
+    """전송 페이지가 번들 창에 돌려보내는 저장 확인 값"""
+    return sign(key, f"synced:{session_id}")
+
+
+def build_bundle(experiment, spec, sync_url, secret):
+    """experiments.json 의 실험 설정 → 독립 실행 HTML 문자열 (secret: 결과 서명 키를 유도할 서버 비밀값)"""
+    trials = compile_trials(spec)
+    config = {
+        "experiment": experiment["id"],
+        "version": PAYLOAD_VERSION,
+        "hash": spec_hash(trials),
+        "key": bundle_key(secret, experiment["id"], spec_hash(trials)),
+        "trials": [{"question": t[2].replace("**", "<strong>").replace("**", "</strong>"), "ss": t[3], "ll": t[4]} for t in trials],
+        "break_duration": experiment["break_duration"],
+        "done_title": experiment["done_title"],
+        "done_text": experiment["done_text"],
+        "next_url": experiment.get("next_url", ""),
+        "sync_url": sync_url,
+        "id_param": ID_PARAM,
+        "t": {key: spec.locale.text(key) for key in STRING_KEYS},
+    }
+    # </script> 가 문자열 안에 있어도 스크립트가 끝나지 않도록
+    data = json.dumps(config, ensure_ascii=False).replace("</", "<\\/")
+    return (
+        _TEMPLATE.replace("__LANG__", html.escape(spec.locale.code))
+        .replace("__TITLE__", html.escape(spec.locale.text("page_title")))
+        .replace("__BUNDLE__", data)
+    )
+
+
+def decode_payload(payload):
+    """?payload= 값 (base64url JSON) → 번들 세션 dict"""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except ValueError as e:
+        raise BundleError(f"결과 값을 읽을 수 없습니다: {e}") from e
+    if not isinstance(raw, dict):
+        raise BundleError("결과 값 형식이 맞지 않습니다")
+    return raw
+
+
+def decode_session(raw, spec, key):
+    """번들 세션 dict (payload 또는 내보낸 JSON 의 한 항목) → (세션 id, 참여자, responses).
+    과제 정의가 다르거나, 값이 잘못되었거나, key (bundle_key) 로 만든 서명이 맞지 않으면 BundleError"""
+    trials = compile_trials(spec)
+    if raw.get("v") != PAYLOAD_VERSION or raw.get("h") != spec_hash(trials):
+        raise BundleError("번들의 과제 정의가 현재 과제 정의와 다릅니다")
+    choices, rts = raw.get("c", ""), raw.get("rt", [])
+    if not raw.get("id") or not str(raw.get("p", "")).strip():
+        raise BundleError("세션 id 또는 참여자 ID가 없습니다")
+    if (not isinstance(choices, str) or not isinstance(rts, list)
+            or len(choices) != len(trials) or len(rts) != len(trials) or set(choices) - {"S", "L"}):
+        raise BundleError("응답 개수 또는 형식이 맞지 않습니다")
+    # 번들 JS 는 RT 를 반올림한 ms 정수로 보냄 (음수·소수·bool·문자열은 값이 잘못된 것)
+    if not all(isinstance(rt, int) and not isinstance(rt, bool) and rt >= 0 for rt in rts):
+        raise BundleError("RT 값이 0 이상의 ms 정수가 아닙니다")
+    if not hmac.compare_digest(str(raw.get("k", "")), sign(key, session_message(raw))):
+        raise BundleError("서명이 맞지 않습니다 (이 서버에서 받은 번들이 아니거나 값이 바뀜)")
+    # 실시간 저장 (record_response) 과 같은 열: design 과 지연도 과제 정의에서 채움
+    responses = []
+    for (task_id, item, _, _, _, ss_val, ll_val), c, rt in zip(trials, choices, rts):
+        ss_delay, ll_delay = spec.delays[task_id]
+        responses.append({
+            "task": task_id, "item": item, "choice": "SS" if c == "S" else "LL",
+            "ss_amount": ss_val, "ll_amount": ll_val, "rt_sec": round(int(rt) / 1000, 3),
+            "design": design_id(task_id, ll_val), "ss_delay": ss_delay, "ll_delay": ll_delay,
+        })
+    return raw["id"], str(raw["p"]).strip(), responses
+
+
+_TEMPLATE = """<!DOCTYPE html>
+<html lang="__LANG__">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>__TITLE__</title>
+<style>
+body { font-family: -apple-system, "Apple SD Gothic Neo", "Malgun Gothic", sans-serif; margin: 0; color: #222; }
+main { max-width: 800px; margin: 0 auto; padding: 2rem 1rem; }
+.intro-title, .done-title, .break-title { font-size: 2.5rem; font-weight: 700; text-align: center; margin: 2rem 0 1.5rem; }
+.done-title { color: #28a745; }
+.break-title { color: #007bff; }
+.intro-text, .break-text { font-size: 1.3rem; text-align: center; line-height: 1.8; }
+.done-text { font-size: 1.5rem; text-align: center; }
+.question-text { font-size: 1.8rem; font-weight: 500; text-align: center; margin: 2rem 0; line-height: 1.6; }
+.progress-counter { font-size: 1.4rem; font-weight: 700; text-align: center; margin-bottom: 0.5rem; }
+.bar { background: #f0f0f0; border: 1px solid #ddd; border-radius: 10px; height: 12px; }
+.bar > div { background: #222; height: 100%; border-radius: 10px; }
+.timer-display { font-size: 4rem; font-weight: 700; text-align: center; margin: 2rem 0; font-family: monospace; }
+.row { display: flex; gap: 1rem; margin-top: 2rem; }
+button, .link { flex: 1; font-size: 1.3rem; padding: 1rem 2rem; min-height: 80px; border-radius: 12px;
+    border: 1px solid #ccc; background: #fff; cursor: pointer; text-align: center; text-decoration: none; color: #222; }
+button.primary, .link { background: #ff4b4b; color: #fff; border-color: #ff4b4b; }
+input { width: 100%; font-size: 1.2rem; padding: 0.6rem; box-sizing: border-box; }
+.center { max-width: 400px; margin: 2rem auto; }
+.note { text-align: center; color: #666; margin-top: 1rem; }
+</style>
+</head>
+<body>
+<main id="app"></main>
+<script>
+const B = __BUNDLE__;
+const STORE = "dd-offline:" + B.experiment;
+const app = document.getElementById("app");
+const now = () => performance.timeOrigin + performance.now();
+const load = () => JSON.parse(localStorage.getItem(STORE) || "[]");
+const store = (sessions) => localStorage.setItem(STORE, JSON.stringify(sessions));
+let S = null;  // 진행 중 세션
+const KEY = crypto.subtle.importKey(
+    "raw", new Uint8Array(B.key.match(/../g).map((h) => parseInt(h, 16))), { name: "HMAC", hash: "SHA-256" }, false, ["sign"]);
+
+async function sign(message) {
+    const sig = await crypto.subtle.sign("HMAC", await KEY, new TextEncoder().encode(message));
+    return Array.from(new Uint8Array(sig), (b) => b.toString(16).padStart(2, "0")).join("");
+}
+
+// 서버의 session_message() 와 같은 형식
+const message = (s) => [B.version, B.hash, s.id, s.participant, s.choices, s.rt.join(",")].join("\\n");
+const result = (s) => ({ v: B.version, h: B.hash, id: s.id, p: s.participant, c: s.choices, rt: s.rt, k: s.sig });
+
+function payload(s) {
+    const raw = JSON.stringify(result(s));
+    return btoa(unescape(encodeURIComponent(raw))).replace(/\\+/g, "-").replace(/\\//g, "_").replace(/=+$/, "");
+}
+
+function syncLink(s) {
+    return B.sync_url + (B.sync_url.includes("?") ? "&" : "?") + "view=sync&exp=" + encodeURIComponent(B.experiment) + "&payload=" + payload(s);
+}
+
+function pending() {
+    return load().filter((s) => s.finished && !s.synced);
+}
+
+function markSynced(id) {
+    store(load().map((s) => (s.id === id ? { ...s, synced: true } : s)));
+}
+
+function syncSection() {
+    const list = pending();
+    if (!list.length) return "";
+    const online = navigator.onLine;
+    return `<p class="note">${B.t.offline_pending.replace("{n}", list.length)} ${online ? "" : B.t.offline_when_online}</p>` +
+        list.map((s) => `<div class="row"><a class="link" target="_blank" data-id="${s.id}" href="${online ? syncLink(s) : "#"}">${B.t.offline_send.replace("{participant}", s.participant)}</a></div>`).join("") +
+        `<p class="note"><a href="#" id="export">${B.t.offline_export}</a></p>`;
+}
+
+// 전송 페이지가 저장한 뒤 보내는 확인. 서명이 맞는 확인을 받은 세션만 전송 완료로 표시
+window.addEventListener("message", async (e) => {
+    const id = e.data && e.data.dd_synced;
+    if (typeof id !== "string" || e.data.ack !== await sign("synced:" + id)) return;
+    markSynced(id);
+    render();
+});
+
+function bindSync() {
+    app.querySelectorAll("a[data-id]").forEach((a) => {
+        a.onclick = (e) => {
+            e.preventDefault();
+            // window.open 으로 열어야 전송 페이지에 opener 가 남아 확인을 돌려보낼 수 있음
+            if (navigator.onLine) window.open(a.href, "_blank");
+        };
+    });
+    const exp = document.getElementById("export");
+    if (exp) exp.onclick = (e) => {
+        e.preventDefault();
+        const data = pending().map(result);
+        const url = URL.createObjectURL(new Blob([JSON.stringify(data)], { type: "application/json" }));
+        const link = Object.assign(document.createElement("a"), { href: url, download: `offline-${B.experiment}.json` });
+        link.click();
+    };
+}
+
+function intro() {
+    const pid = new URLSearchParams(location.search).get(B.id_param) || "";
+    app.innerHTML = `
+        <p class="intro-title">${B.t.intro_title}</p>
+        <p class="intro-text">${B.t.intro_text}</p>
+        <div class="center"><label>${B.t.name_label}<br><input id="name"></label>
+        <div class="row"><button class="primary" id="start">${B.t.start}</button></div>
+        <p class="note" id="warn"></p></div>` + syncSection();
+    document.getElementById("name").value = pid;
+    bindSync();
+    document.getElementById("start").onclick = () => {
+        const name = document.getElementById("name").value.trim();
+        if (!name) { document.getElementById("warn").textContent = B.t.name_required; return; }
+        S = { id: crypto.randomUUID(), participant: name, started_at: Date.now(), choices: "", rt: [], finished: false, synced: false };
+        trial();
+    };
+}
+
+function trial() {
+    const i = S.choices.length;
+    if (i >= B.trials.length) return finish();
+    const t = B.trials[i];
+    app.innerHTML = `
+        <p class="progress-counter">${i + 1} / ${B.trials.length}</p>
+        <div class="bar"><div style="width:${100 * (i + 1) / B.trials.length}%"></div></div>
+        <p class="question-text">${t.question}</p>
+        <div class="row"><button data-c="S">${t.ss}</button><button data-c="L">${t.ll}</button></div>`;
+    let onset = null;
+    requestAnimationFrame(() => requestAnimationFrame(() => { onset = now(); }));
+    app.querySelectorAll("button").forEach((b) => {
+        b.onclick = () => {
+            if (onset === null || S.choices.length !== i) return;
+            S.choices += b.dataset.c;
+            S.rt.push(Math.round(now() - onset));
+            trial();
+        };
+    });
+}
+
+async function finish() {
+    S.finished = true;
+    S.sig = await sign(message(S));
+    store(load().concat([S]));
+    if (B.break_duration > 0) return rest(Date.now());
+    done();
+}
+
+function rest(start) {
+    const remaining = Math.max(0, B.break_duration - (Date.now() - start) / 1000);
+    if (remaining <= 0) return done();
+    const m = String(Math.floor(remaining / 60)).padStart(2, "0"), s = String(Math.floor(remaining % 60)).padStart(2, "0");
+    app.innerHTML = `
+        <p class="break-title">${B.t.break_title}</p>
+        <p class="break-text">${B.t.break_text}</p>
+        <p class="timer-display">${m}:${s}</p>
+        <div class="bar"><div style="width:${100 * (1 - remaining / B.break_duration)}%"></div></div>`;
+    setTimeout(() => rest(start), 1000);
+}
+
+function done() {
+    const next = B.next_url ? B.next_url + (B.next_url.includes("?") ? "&" : "?") + B.id_param + "=" + encodeURIComponent(S.participant) : "";
+    app.innerHTML = `
+        <p class="done-title">${B.done_title}</p>
+        <p class="done-text">${B.done_text}</p>
+        <div class="row"><button id="again">${B.t.offline_again}</button>${next ? `<a class="link" href="${next}">${B.t.next_experiment}</a>` : ""}</div>` + syncSection();
+    bindSync();
+    document.getElementById("again").onclick = () => { S = null; intro(); };
+}
+
+function render() {
+    if (S === null) intro();
+    else if (S.finished && app.querySelector(".done-title")) done();
+}
+
+window.addEventListener("online", render);
+window.addEventListener("offline", render);
+intro();
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,140 @@
+import argparse
+import csv
+import os
+import secrets
+import threading
+import time
+import urllib.parse
+
+from checkpoint import CheckpointStore
+
+# ==========================================
+# 참여자 ID 명단 (사전 발급 · O(1) 검증 · 세션 간 중복 사용 방지)
+# ==========================================
+# ID = 접두어 + 무작위 6자 + 검증 문자 1자. 헷갈리는 0/O/1/I/L 을 뺀 31자 (소수) 를 쓰고
+# 위치 가중 합 mod 31 을 검증 문자로 붙여서 한 글자 오타·인접 두 글자 뒤바뀜은 명단 조회 전에 걸러냄.
+
+ALPHABET = "23456789ABCDEFGHJKMNPQRSTUVWXYZ"
+BODY_LENGTH = 6
+ID_PARAM = "pid"    # 이어지는 앱끼리 ID 를 넘기는 URL 파라미터
+COLUMN = "participant_id"
+CLAIM_TTL = 1800    # 점유 만료 (초). 진행 중인 세션은 체크포인트를 저장할 때마다 연장
+
+_VALUE = {c: i for i, c in enumerate(ALPHABET)}
+
+
+def check_char(body):
+    return ALPHABET[sum((i + 1) * _VALUE[c] for i, c in enumerate(body)) % len(ALPHABET)]
+
+
+def normalize(raw):
+    """대소문자·공백·하이픈 차이 무시"""
+    return "".join(raw.split()).replace("-", "").upper()
+
+
+def is_well_formed(pid, prefix=""):
+    """접두어·길이·검증 문자 확인 (명단 없이 오타 판별)"""
+    if not pid.startswith(prefix) or len(pid) != len(prefix) + BODY_LENGTH + 1:
+        return False
+    code = pid[len(prefix):]
+    return all(c in _VALUE for c in code) and check_char(code[:-1]) == code[-1]
+
+
+def generate_ids(n, prefix="", existing=()):
+    """중복 없는 새 ID n개 (existing 에 있는 ID 는 피함)"""
+    prefix = normalize(prefix)
+    taken = set(existing)
+    ids = []
+    while len(ids) < n:
+        body = "".join(secrets.choice(ALPHABET) for _ in range(BODY_LENGTH))
+        pid = prefix + body + check_char(body)
+        if pid not in taken:
+            taken.add(pid)
+            ids.append(pid)
+    return ids
+
+
+def with_pid(url, pid):
+    """url 에 ?pid= 추가 (기존 쿼리 문자열은 그대로 둠)"""
+    parts = urllib.parse.urlsplit(url)
+    extra = urllib.parse.urlencode({ID_PARAM: pid})
+    query = f"{parts.query}&{extra}" if parts.query else extra
+    return urllib.parse.urlunsplit(parts._replace(query=query))
+
+
+class Roster:
+    """명단 ID → 사용 세션. 조회는 set 한 번, 점유·완료 기록은 체크포인트 저장소에 원자적으로
+    (SQLite·Redis 저장소면 여러 서버 프로세스가 같은 점유·완료 기록을 공유)"""
+
+    def __init__(self, ids, journal_path=None, store=None, claim_ttl=CLAIM_TTL):
+        self._index = frozenset(normalize(pid) for pid in ids)
+        self._lock = threading.Lock()  # 완료 기록 파일 추가 쓰기
+        self.store = store if store is not None else CheckpointStore()
+        self.claim_ttl = claim_ttl
+        self.journal_path = journal_path
+        if journal_path and os.path.exists(journal_path):
+            with open(journal_path, encoding="utf-8") as f:
+                for line in f:
+                    exp_id, pid, _ = line.rstrip("\n").split("\t")
+                    self.store.add_mark("completed", f"{exp_id}\t{pid}")
+
+    @classmethod
+    def from_csv(cls, path, journal_path=None, store=None, claim_ttl=CLAIM_TTL):
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls([row[COLUMN] for row in csv.DictReader(f)], journal_path, store, claim_ttl)
+
+    def __len__(self):
+        return len(self._index)
+
+    def lookup(self, raw):
+        """입력값 → (정규화된 ID 또는 None, 사유: "ok" / "typo" / "unknown")"""
+        pid = normalize(raw)
+        if pid in self._index:
+            return pid, "ok"
+        # 검증 문자가 맞지 않으면 오타, 맞으면 명단에 없는 ID
+        body = pid[-BODY_LENGTH - 1:]
+        return None, "unknown" if is_well_formed(body) else "typo"
+
+    def claim(self, pid, owner, can_take=None):
+        """pid 를 owner (세션) 가 사용. 다른 세션이 쓰고 있으면 False. 같은 owner 면 만료만 연장.
+        can_take(현재 소유자) 가 True 인 세션 (새로고침·정리·완료) 의 점유는 넘겨받음"""
+        return self.store.claim(f"roster:{pid}", owner, self.claim_ttl, can_take)
+
+    def release(self, pid, owner):
+        self.store.release_claim(f"roster:{pid}", owner)
+
+    def owner(self, pid):
+        return self.store.claim_owner(f"roster:{pid}")
+
+    def complete(self, exp_id, pid):
+        """실험 완료 기록 (journal_path 가 있으면 메모리 저장소에서도 재시작 후에도 유지)"""
+        if self.store.add_mark("completed", f"{exp_id}\t{pid}") and self.journal_path:
+            with self._lock, open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(f"{exp_id}\t{pid}\t{time.time():.3f}\n")
+
+    def is_completed(self, exp_id, pid):
+        return self.store.has_mark("completed", f"{exp_id}\t{pid}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="참여자 ID 명단 생성")
+    parser.add_argument("n", type=int, help="새로 만들 ID 개수")
+    parser.add_argument("--prefix", default="", help="ID 접두어 (예: DD)")
+    parser.add_argument("--out", default="roster.csv", help="기존 파일이면 겹치지 않게 이어서 추가")
+    args = parser.parse_args()
+
+    existing = []
+    if os.path.exists(args.out):
+        with open(args.out, newline="", encoding="utf-8") as f:
+            existing = [row[COLUMN] for row in csv.DictReader(f)]
+    ids = generate_ids(args.n, args.prefix, existing)
+    with open(args.out, "a" if existing else "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if not existing:
+            writer.writerow([COLUMN])
+        writer.writerows([pid] for pid in ids)
+    print(f"{len(ids)}개 생성 (전체 {len(existing) + len(ids)}개) → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
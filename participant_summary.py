@@ -0,0 +1,92 @@
+import time
+
+import numpy as np
+
+# ==========================================
+# 참여자별 요약 행 (세션 완료 시 한 줄)
+# ==========================================
+# 문항별 긴 형식 (save_to_sheets) 을 매번 피벗하지 않도록 완료 시점에 넓은 행을 함께 저장.
+# 문항 열은 과제 정의 순서 (과제 블록 × 문항) 의 번호: c01 … (LL=1, SS=0, 미제시 빈 칸),
+# rt01 … (초). 과제 블록별 LL 수·평균 RT 와 전체 합계도 포함. 고정 문항 격자 기준이므로
+# ADO 실험은 요약 행을 쓰지 않음 (참여자별 결과는 ado 워크시트의 k 추정치). 응답 저장이 성공한 뒤에만 기록.
+
+BASE_HEADERS = ["participant", "experiment", "submitted_at", "session_sec", "n_trials", "n_ll", "mean_rt"]
+
+
+def trial_columns(spec):
+    """(과제 id, 문항 번호) → 열 번호 (0부터)"""
+    return {
+        (task["id"], i + 1): spec.offsets[t_idx] + i
+        for t_idx, task in enumerate(spec.tasks)
+        for i in range(len(task["vals"]))
+    }
+
+
+def summary_headers(spec):
+    n = spec.total_questions
+    width = len(str(n))
+    return (
+        BASE_HEADERS
+        + [f"{task['id']}_{suffix}" for task in spec.tasks for suffix in ("ll", "rt")]
+        + [f"c{i + 1:0{width}d}" for i in range(n)]
+        + [f"rt{i + 1:0{width}d}" for i in range(n)]
+    )
+
+
+def _mean(values):
+    return round(sum(values) / len(values), 3) if values else ""
+
+
+def summary_row(responses, participant, experiment_id, spec, started_at=None, submitted_at=None):
+    """응답 목록 (record_response 형식) → summary_headers 순서의 행"""
+    submitted_at = time.time() if submitted_at is None else submitted_at
+    columns = trial_columns(spec)
+    choices = [""] * spec.total_questions
+    rts = [""] * spec.total_questions
+    blocks = {task["id"]: [0, []] for task in spec.tasks}
+    for r in responses:
+        col = columns.get((r["task"], r["item"]))
+        if col is None:
+            continue
+        ll = int(r["choice"] == "LL")
+        choices[col] = ll
+        rts[col] = r["rt_sec"]
+        blocks[r["task"]][0] += ll
+        blocks[r["task"]][1].append(r["rt_sec"])
+    answered = [rt for rt in rts if rt != ""]
+    row = [
+        participant, experiment_id, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(submitted_at)),
+        round(submitted_at - started_at, 1) if started_at else "",
+        len(answered), sum(c for c in choices if c != ""), _mean(answered),
+    ]
+    for task in spec.tasks:
+        ll, block_rts = blocks[task["id"]]
+        row += [ll if block_rts else "", _mean(block_rts)]
+    return row + choices + rts
+
+
+def choices_from_summary(rows, spec):
+    """요약 행 (DictReader / get_all_records) → (참여자 (실험 id, 이름) 목록, (P, T) 선택 배열: LL=1, SS=0, 결측=NaN).
+    discount_fit.choices_from_rows 와 같은 결과를 참여자 수만큼의 행에서 만듦"""
+    headers = summary_headers(spec)
+    choice_cols = headers[-2 * spec.total_questions:-spec.total_questions]
+    participants = []
+    y = []
+    for r in rows:
+        participants.append((str(r.get("experiment") or ""), str(r["participant"])))
+        y.append([np.nan if r.get(c, "") in ("", None) else float(r[c]) for c in choice_cols])
+    return participants, np.array(y, dtype=float).reshape(len(participants), spec.total_questions)
+
+
+def trials_from_summary(row, spec):
+    """요약 행 하나 → 문항별 (과제 id, 문항 번호, 'SS'/'LL', RT) (대시보드 집계 복원용)"""
+    headers = summary_headers(spec)
+    n = spec.total_questions
+    choice_cols, rt_cols = headers[-2 * n:-n], headers[-n:]
+    trials = []
+    for (task_id, item), col in trial_columns(spec).items():
+        choice, rt = row.get(choice_cols[col], ""), row.get(rt_cols[col], "")
+        if choice in ("", None) or rt in ("", None):
+            continue
+        trials.append((task_id, item, "LL" if int(float(choice)) == 1 else "SS", float(rt)))
+    return trials
@@ -0,0 +1,154 @@
+import bisect
+import math
+
+import streamlit as st
+
+# ==========================================
+# 다음 K개 문항 미리 보내기 (고정 순서 실험 전용)
+# ==========================================
+# 브라우저가 받은 문항 안에서는 클릭 즉시 다음 문항을 보여주고, 선택·브라우저 RT 를
+# 순번 (seq = 응답 순서) 과 함께 모아서 보냄. 서버는 아직 기록하지 않은 순번만 받아들이고
+# (중복·순서 어긋남 무시), 기록한 개수 (base) 와 그 뒤 K개 문항을 다시 내려줌.
+# 브라우저는 base 보다 앞선 항목만 지우고, 응답이 없으면 남은 항목을 주기적으로 다시 보냄.
+
+KEY = "preload_trials"
+RESEND_MS = 2000
+
+_CSS = """
+.preload-bar { background:#f0f0f0; border:1px solid #ddd; border-radius:4px; height:8px; margin-bottom:1rem; }
+.preload-bar > div { background:#222; height:100%; border-radius:4px; }
+.preload-buttons { display:flex; gap:1rem; }
+.preload-buttons button {
+    flex:1; font-size:1.3rem; padding:1rem 2rem; min-height:80px; border-radius:12px;
+    border:1px solid #ccc; background:#fff; cursor:pointer;
+}
+.preload-buttons button:hover { border-color:#222; }
+.preload-wait { text-align:center; font-size:1.3rem; color:#666; margin:3rem 0; }
+"""
+
+_JS = """
+export default function(component) {
+    const { data, setStateValue, parentElement } = component;
+    const all = window.__preload || (window.__preload = {});
+    const s = all[data.session] || (all[data.session] = { pos: data.base, queue: [], trials: {}, attempt: 0, sentAt: 0 });
+    const now = () => performance.timeOrigin + performance.now();
+
+    // 서버가 기록한 순번 (base 미만) 은 확인된 것으로 보고 제거
+    s.queue = s.queue.filter((c) => c.seq >= data.base);
+    if (s.pos < data.base) s.pos = data.base;
+    for (const seq of Object.keys(s.trials)) if (Number(seq) < data.base) delete s.trials[seq];
+    for (const t of data.trials) s.trials[t.seq] = t;
+
+    // 다시 호출될 때마다 최신 setStateValue 로 교체 (이전 화면의 클릭 핸들러도 이것을 사용)
+    s.send = () => {
+        s.attempt += 1;
+        s.sentAt = performance.now();
+        setStateValue("choices", { attempt: s.attempt, items: s.queue.slice() });
+    };
+
+    let root = parentElement.querySelector(".preload-root");
+    if (!root) {
+        root = document.createElement("div");
+        root.className = "preload-root";
+        parentElement.appendChild(root);
+    }
+
+    const render = () => {
+        const t = s.trials[s.pos];
+        root.dataset.seq = t ? String(t.seq) : "";
+        if (!t) {
+            // 마지막 문항 이후 또는 미리 받은 문항을 모두 쓴 경우: 서버 응답 대기
+            root.innerHTML = `<p class="preload-wait">${s.pos >= data.total ? data.saving : data.wait}</p>`;
+            return;
+        }
+        root.innerHTML = `
+            <p class="progress-counter">${t.seq + 1} / ${data.total}</p>
+            <div class="preload-bar"><div style="width:${100 * (t.seq + 1) / data.total}%"></div></div>
+            <p class="question-text">${t.question}</p>
+            <div class="preload-buttons"><button data-choice="SS">${t.ss}</button><button data-choice="LL">${t.ll}</button></div>`;
+        requestAnimationFrame(() => requestAnimationFrame(() => { t.onset = now(); }));
+        root.querySelectorAll("button").forEach((button) => {
+            button.onclick = () => {
+                if (s.trials[s.pos] !== t || t.onset === undefined) return;
+                const click = now();
+                s.queue.push({ seq: t.seq, task: t.task, item: t.item, choice: button.dataset.choice, rt_ms: click - t.onset });
+                s.pos += 1;
+                render();
+                s.send();
+            };
+        });
+    };
+    // 확인만 온 경우에는 보고 있는 문항을 다시 그리지 않음 (onset 유지)
+    if (root.dataset.seq !== (s.trials[s.pos] ? String(s.pos) : "")) render();
+
+    // 확인 (base 증가) 이 오지 않은 항목 재전송
+    const timer = setInterval(() => {
+        if (s.queue.length && performance.now() - s.sentAt > RESEND_MS) s.send();
+    }, 500);
+    return () => clearInterval(timer);
+}
+""".replace("RESEND_MS", str(RESEND_MS))
+
+_component = st.components.v2.component("preloaded_trials", css=_CSS, js=_JS, isolate_styles=False)
+
+
+def trial_at(spec, seq):
+    """응답 순번 → (과제 index, 문항 index). 범위를 벗어나면 None"""
+    if not 0 <= seq < spec.total_questions:
+        return None
+    task_idx = bisect.bisect_right(spec.offsets, seq) - 1
+    return task_idx, seq - spec.offsets[task_idx]
+
+
+def upcoming(spec, base, k):
+    """base 번째부터 k개 문항 (브라우저로 보낼 값)"""
+    trials = []
+    for seq in range(base, min(base + k, spec.total_questions)):
+        task_idx, item_idx = trial_at(spec, seq)
+        task = spec.tasks[task_idx]
+        question, ss_txt, ll_txt, _, _ = spec.question(task, item_idx)
+        trials.append({
+            "seq": seq, "task": task["id"], "item": item_idx + 1,
+            "question": question.replace("**", "<strong>").replace("**", "</strong>"),
+            "ss": ss_txt, "ll": ll_txt,
+        })
+    return trials
+
+
+def is_rt_ms(value):
+    """브라우저 RT (ms) 가 0 이상의 유한한 숫자인지 (bool·문자열·NaN 거부)"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value) and value >= 0
+
+
+def accept(spec, base, items):
+    """받은 항목 중 base 부터 끊김 없이 이어지는 것만 (seq, task_idx, item_idx, 선택, RT 초) 로 반환.
+    형식이 맞지 않는 항목에서 멈춤 (그 뒤 항목은 다음 재전송 때 다시 확인)"""
+    by_seq = {c.get("seq"): c for c in items if isinstance(c, dict)}
+    accepted = []
+    while base in by_seq and base < spec.total_questions:
+        c = by_seq[base]
+        task_idx, item_idx = trial_at(spec, base)
+        if c.get("choice") not in ("SS", "LL") or c.get("task") != spec.tasks[task_idx]["id"] or c.get("item") != item_idx + 1:
+            break
+        if not is_rt_ms(c.get("rt_ms")):
+            break
+        accepted.append((base, task_idx, item_idx, c["choice"], round(c["rt_ms"] / 1000, 3)))
+        base += 1
+    return accepted
+
+
+def render(session, base, total, trials, on_choices, locale):
+    """미리 받은 문항을 브라우저에서 진행하는 화면 (대기 문구는 로케일에서)"""
+    _component(
+        data={
+            "session": session, "base": base, "total": total, "trials": trials,
+            "wait": locale.text("preload_wait"), "saving": locale.text("preload_saving"),
+        },
+        key=KEY, on_choices_change=on_choices,
+    )
+
+
+def received():
+    """마지막으로 받은 선택 목록 (콜백 안에서 조회)"""
+    state = st.session_state.get(KEY) or {}
+    return (state.get("choices") or {}).get("items") or []
@@ -0,0 +1,42 @@
+import threading
+import time
+
+# ==========================================
+# 방치된 세션 정리 (장시간 실행 서버의 메모리 상한)
+# ==========================================
+
+
+class SessionReaper:
+    """주기적으로 세션 목록을 훑어 오래 입력이 없는 세션을 정리하는 백그라운드 스레드.
+    진행 상태는 클릭마다 저장되는 체크포인트에 있으므로 정리한 세션은 on_reap(정보) 으로 닫아 메모리 해제.
+    on_reap 이 없으면 표시만 하고, 정리 표시된 세션은 다음 재실행 (또는 클릭) 때 세션 스레드가 스스로 비움"""
+
+    def __init__(self, registry, idle_timeout=1800, interval=60, on_reap=None):
+        self.registry = registry
+        self.idle_timeout = idle_timeout
+        self.interval = interval
+        self.on_reap = on_reap
+        self.last_sweep = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="session-reaper", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sweep()
+
+    def stop(self):
+        self._stop.set()
+
+    def sweep(self, now=None):
+        """정리한 세션 수 반환"""
+        reaped = 0
+        for info in self.registry.stale(self.idle_timeout, now=now):
+            reaped_info = self.registry.reap(info["session_id"])
+            if reaped_info is not None:
+                reaped += 1
+                if self.on_reap is not None:
+                    self.on_reap(reaped_info)
+        self.registry.prune_reaped(max_age=24 * 3600)
+        self.last_sweep = time.time()
+        return reaped
@@ -0,0 +1,149 @@
+import threading
+import time
+from concurrent.futures import wait
+
+# ==========================================
+# 프로세스 내 진행 중 세션 목록 (용량 파악·무손실 재배포용)
+# ==========================================
+
+IN_FLIGHT_PHASES = ("task", "break")
+
+
+class SessionRegistry:
+    """세션 id → 단계·진행 위치·마지막 활동 시각. 드레인 모드에서는 새 시작을 막음"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._pending_saves = set()
+        self._reaped = {}          # 세션 id → 정리 시각 (세션이 다시 실행되면 확인 후 삭제)
+        self.reaped_total = 0
+        self.reaped_by_phase = {}
+        self.draining = False
+        self.drain_started_at = None
+
+    def update(self, session_id, **fields):
+        """재실행마다 현재 상태 반영"""
+        now = time.time()
+        with self._lock:
+            info = self._sessions.get(session_id)
+            if info is None:
+                info = self._sessions[session_id] = {"session_id": session_id, "started_at": now, "last_activity": now}
+            if fields.get("phase") != info.get("phase"):
+                info["last_activity"] = now
+            info.update(fields)
+            info["last_seen"] = now
+
+    def touch(self, session_id):
+        """참여자 입력 (클릭) 시각 기록"""
+        with self._lock:
+            if session_id in self._sessions:
+                self._sessions[session_id]["last_activity"] = time.time()
+
+    def finish(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def get(self, session_id):
+        with self._lock:
+            info = self._sessions.get(session_id)
+            return dict(info) if info else None
+
+    def snapshot(self):
+        with self._lock:
+            return [dict(info) for info in self._sessions.values()]
+
+    def in_flight(self):
+        """시작했지만 아직 끝나지 않은 세션 수"""
+        with self._lock:
+            return sum(info.get("phase") in IN_FLIGHT_PHASES for info in self._sessions.values())
+
+    def counts_by_phase(self):
+        counts = {}
+        for info in self.snapshot():
+            counts[info.get("phase")] = counts.get(info.get("phase"), 0) + 1
+        return counts
+
+    # ----- 오래 방치된 세션 정리 -----
+
+    def stale(self, idle_timeout, now=None):
+        """마지막 클릭 (또는 단계 변경) 후 idle_timeout + 세션별 추가 허용 시간이 지난 세션"""
+        now = time.time() if now is None else now
+        with self._lock:
+            return [
+                dict(info) for info in self._sessions.values()
+                if now - info["last_activity"] > idle_timeout + info.get("extra_idle", 0)
+            ]
+
+    def reap(self, session_id):
+        """목록에서 빼고 정리 표시. 목록에 있던 정보 (단계·진행 위치) 를 돌려줌"""
+        with self._lock:
+            info = self._sessions.pop(session_id, None)
+            if info is None:
+                return None
+            self._reaped[session_id] = time.time()
+            self.reaped_total += 1
+            phase = info.get("phase")
+            self.reaped_by_phase[phase] = self.reaped_by_phase.get(phase, 0) + 1
+            return info
+
+    def is_reaped(self, session_id):
+        return session_id in self._reaped
+
+    def acknowledge_reaped(self, session_id):
+        with self._lock:
+            self._reaped.pop(session_id, None)
+
+    def prune_reaped(self, max_age):
+        """탭이 닫혀 다시 실행되지 않는 세션의 정리 표시 삭제"""
+        cutoff = time.time() - max_age
+        with self._lock:
+            for session_id in [s for s, t in self._reaped.items() if t < cutoff]:
+                del self._reaped[session_id]
+
+    # ----- 저장 추적 -----
+
+    def track_save(self, future):
+        with self._lock:
+            self._pending_saves.add(future)
+        future.add_done_callback(self._save_done)
+
+    def _save_done(self, future):
+        with self._lock:
+            self._pending_saves.discard(future)
+
+    def pending_saves(self):
+        with self._lock:
+            return len(self._pending_saves)
+
+    def flush(self, timeout=30):
+        """진행 중인 저장이 끝날 때까지 대기. 남은 개수 반환"""
+        with self._lock:
+            pending = list(self._pending_saves)
+        if pending:
+            wait(pending, timeout=timeout)
+        return self.pending_saves()
+
+    # ----- 드레인 -----
+
+    @property
+    def accepting(self):
+        return not self.draining
+
+    def start_drain(self):
+        with self._lock:
+            if not self.draining:
+                self.draining = True
+                self.drain_started_at = time.time()
+
+    def cancel_drain(self):
+        with self._lock:
+            self.draining = False
+            self.drain_started_at = None
+
+    def drained(self, store=None):
+        """드레인 중이고 진행 중 세션·대기 저장이 모두 없으면 True (재배포 가능).
+        store 가 이 프로세스 메모리 저장소면 보관된 실패 저장 작업도 재배포와 함께 사라지므로 그 목록도 비어야 함"""
+        if not (self.draining and self.in_flight() == 0 and self.pending_saves() == 0):
+            return False
+        return store is None or store.persistent or not store.failed_saves()
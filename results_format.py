@@ -0,0 +1,183 @@
+import argparse
+import csv
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+# ==========================================
+# 응답 결과의 형식 있는 열 저장 형식 (Arrow / Parquet)
+# ==========================================
+# Sheets·CSV 의 문자열 행 → choice int8 (SS=0, LL=1, 결측=-1), 금액 int32, RT float32,
+# 과제·참여자·설계·실험 id 는 사전 (범주) 인코딩, submitted_at 은 int64 기반 timestamp, 지연 (개월) int8.
+# 열 이름과 순서는 save_to_sheets 의 HEADERS 와 같음. design·지연·실험 열이 없는 이전 CSV 는 결측 (실험은 "") 으로 읽음.
+
+CHOICE_LABELS = ["SS", "LL"]
+MISSING_CHOICE = -1
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = pa.schema([
+    ("participant", pa.dictionary(pa.int32(), pa.string())),
+    ("task", pa.dictionary(pa.int8(), pa.string())),
+    ("item", pa.int8()),
+    ("choice", pa.int8()),
+    ("ss_amount", pa.int32()),
+    ("ll_amount", pa.int32()),
+    ("rt_sec", pa.float32()),
+    ("submitted_at", pa.timestamp("s")),
+    ("design", pa.dictionary(pa.int16(), pa.string())),
+    ("ss_delay", pa.int8()),
+    ("ll_delay", pa.int8()),
+    ("experiment", pa.dictionary(pa.int8(), pa.string())),
+])
+
+_CSV_TYPES = {
+    "participant": pa.string(),
+    "task": pa.string(),
+    "item": pa.int8(),
+    "choice": pa.string(),
+    "ss_amount": pa.int32(),
+    "ll_amount": pa.int32(),
+    "rt_sec": pa.float32(),
+    "submitted_at": pa.string(),  # TIME_FORMAT 으로 따로 파싱
+    "design": pa.string(),
+    "ss_delay": pa.int8(),
+    "ll_delay": pa.int8(),
+    "experiment": pa.string(),
+}
+
+_STRING_COLUMNS = ("participant", "task", "choice", "submitted_at", "design", "experiment")
+
+
+def encode_choice(choice):
+    """문자열 choice 배열 → int8 코드"""
+    codes = pc.index_in(choice, value_set=pa.array(CHOICE_LABELS))
+    return pc.fill_null(codes, MISSING_CHOICE).cast(pa.int8())
+
+
+def _typed(columns):
+    """열 이름 → 문자열·숫자 배열 dict 를 SCHEMA 로 변환"""
+    arrays = []
+    for field in SCHEMA:
+        col = columns[field.name]
+        if field.name == "choice":
+            col = encode_choice(col)
+        elif field.name == "submitted_at" and pa.types.is_string(col.type):
+            col = pc.strptime(col, format=TIME_FORMAT, unit="s", error_is_null=True)
+        elif pa.types.is_dictionary(field.type):
+            col = pc.dictionary_encode(col)
+        arrays.append(col.cast(field.type))
+    return pa.Table.from_arrays(arrays, schema=SCHEMA)
+
+
+def rows_to_table(rows):
+    """save_to_sheets 형식의 리스트 행 (build_rows 출력 또는 get_all_values 에서 헤더를 뺀 값) → Table"""
+    names = SCHEMA.names
+    cols = list(zip(*rows)) if rows else [()] * len(names)
+    # 이전 형식 행 (design·지연·실험 열 없음) 은 빈 칸으로 채움
+    cols += [("",) * len(rows)] * (len(names) - len(cols))
+    raw = {}
+    for name, values in zip(names, cols):
+        if name in _STRING_COLUMNS:
+            raw[name] = pa.array([str(v) for v in values], pa.string())
+        else:
+            # 빈 칸은 결측
+            raw[name] = pa.array([None if v == "" else v for v in values]).cast(_CSV_TYPES[name])
+    return _typed(raw)
+
+
+def read_csv(path):
+    """Google Sheet 에서 내보낸 CSV → Table (열 단위로 파싱)"""
+    table = pacsv.read_csv(
+        path,
+        convert_options=pacsv.ConvertOptions(
+            column_types=_CSV_TYPES,
+            include_columns=SCHEMA.names,
+            include_missing_columns=True,
+            strings_can_be_null=False,
+        ),
+    )
+    return _typed({name: table.column(name).combine_chunks() for name in SCHEMA.names})
+
+
+def write_results(table, path):
+    """확장자에 따라 Parquet (.parquet) 또는 Arrow IPC (.arrow / .feather) 로 저장"""
+    if path.endswith(".parquet"):
+        pq.write_table(table, path, compression="zstd")
+    else:
+        feather.write_feather(table, path, compression="zstd")
+
+
+def read_results(path):
+    """Parquet / Arrow / CSV 모두 SCHEMA 형식의 Table 로 읽음"""
+    if path.endswith(".parquet"):
+        return pq.read_table(path, schema=SCHEMA)
+    if path.endswith((".arrow", ".feather")):
+        return feather.read_table(path)
+    return read_csv(path)
+
+
+def iter_rows(table):
+    """Table → 내보낸 CSV 와 같은 문자열 dict 행 (기존 분석 스크립트 입력용)"""
+    choice = table.column("choice").to_numpy()
+    labels = np.array(CHOICE_LABELS + [""])[np.where(choice < 0, 2, choice)].tolist()
+    participant = table.column("participant").cast(pa.string()).to_pylist()
+    task = table.column("task").cast(pa.string()).to_pylist()
+    item = table.column("item").to_pylist()
+    ss = table.column("ss_amount").to_pylist()
+    ll = table.column("ll_amount").to_pylist()
+    # float32 → 저장 시 정밀도 (ms) 로 되돌림
+    rt = pc.round(table.column("rt_sec").cast(pa.float64()), 3).to_pylist()
+    design = table.column("design").cast(pa.string()).to_pylist()
+    ss_delay = table.column("ss_delay").to_pylist()
+    ll_delay = table.column("ll_delay").to_pylist()
+    experiment = table.column("experiment").cast(pa.string()).to_pylist()
+    for i in range(table.num_rows):
+        yield {
+            "participant": participant[i],
+            "task": task[i],
+            "item": item[i],
+            "choice": labels[i],
+            "ss_amount": ss[i],
+            "ll_amount": ll[i],
+            "rt_sec": "" if rt[i] is None else rt[i],
+            "design": design[i] or "",
+            "ss_delay": "" if ss_delay[i] is None else ss_delay[i],
+            "ll_delay": "" if ll_delay[i] is None else ll_delay[i],
+            "experiment": experiment[i] or "",
+        }
+
+
+def participant_key(row):
+    """분석에서 참여자를 구분하는 키 (실험 id, 참여자). 실험이 다르면 같은 이름도 다른 참여자.
+    experiment 열이 없는 이전 행은 실험 id 가 빈 문자열"""
+    return (row.get("experiment") or "", row["participant"])
+
+
+def read_rows(path):
+    """분석 스크립트 공통 입력: CSV 는 그대로 스트리밍, Parquet / Arrow 는 iter_rows 로 변환"""
+    if path.endswith((".parquet", ".arrow", ".feather")):
+        yield from iter_rows(read_results(path))
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="내보낸 CSV 를 형식 있는 Parquet / Arrow 파일로 변환")
+    parser.add_argument("src", help="Google Sheet 에서 내보낸 CSV")
+    parser.add_argument("out", help="출력 파일 (.parquet 또는 .arrow)")
+    args = parser.parse_args()
+
+    table = read_csv(args.src)
+    write_results(table, args.out)
+    ratio = os.path.getsize(args.out) / max(os.path.getsize(args.src), 1)
+    print(f"{table.num_rows}행 → {args.out} (CSV 대비 {ratio:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import urllib.parse
+
+import httpx
+
+# ==========================================
+# 비동기 Google Sheets 저장 (Sheets v4 REST API 직접 호출)
+# ==========================================
+# 서버 프로세스당 이벤트 루프 하나를 별도 스레드에서 돌리고, 모든 세션의 저장 요청을
+# 같은 HTTP/2 연결로 보냄. 짧은 시간 안에 들어온 요청은 values:append 한 번으로 묶음.
+
+SHEETS_API = "https://sheets.googleapis.com"
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# 요청이 서버에 닿기 전에 난 것이 확실한 전송 오류 (멱등이 아닌 요청도 다시 보내도 됨)
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def service_account_token_provider(info):
+    """서비스 계정 정보 → 액세스 토큰을 돌려주는 함수 (만료 시 갱신, 블로킹)"""
+    from google.auth.transport.requests import Request
+    from google.oauth2.service_account import Credentials
+
+    creds = Credentials.from_service_account_info(info, scopes=SCOPES)
+    lock = threading.Lock()
+
+    def token():
+        with lock:
+            if not creds.valid:
+                creds.refresh(Request())
+            return creds.token
+
+    return token
+
+
+class AsyncSheetsWriter:
+    """append_rows() 는 바로 concurrent.futures.Future 를 반환 (스크립트 스레드를 막지 않음)"""
+
+    def __init__(self, sheet_id, token_provider, worksheet=None, base_url=SHEETS_API,
+                 batch_window=0.05, max_retries=4, http2=True):
+        self.sheet_id = sheet_id
+        self.worksheet = worksheet
+        self.token_provider = token_provider
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.header_checked = False
+        self._pending = []
+        self._flush_task = None
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="sheets-async", daemon=True)
+        self._thread.start()
+        self.client = self._call(self._make_client(base_url, http2)).result()
+        self._header_lock = self._call(self._make_lock()).result()
+
+    async def _make_client(self, base_url, http2):
+        return httpx.AsyncClient(base_url=base_url, http2=http2, timeout=30.0)
+
+    async def _make_lock(self):
+        return asyncio.Lock()
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def _values_url(self, range_, suffix=""):
+        # 워크시트 이름이 없으면 첫 번째 시트 (gspread 의 sheet1 과 동일)
+        if self.worksheet is not None:
+            range_ = f"'{self.worksheet}'!{range_}"
+        quoted = urllib.parse.quote(range_, safe="")
+        return f"/v4/spreadsheets/{self.sheet_id}/values/{quoted}{suffix}"
+
+    # ----- 외부 API (어느 스레드에서나 호출) -----
+
+    def append_rows(self, rows, header=None):
+        """행 추가 예약. header 가 주어지면 시트가 비어 있을 때 먼저 한 번 기록.
+        재시도 후에도 실패하면 Future 에 예외가 담김 (실패한 행 보관은 호출 쪽에서)"""
+        return self._call(self._append(list(rows), header))
+
+    def close(self):
+        self._call(self.client.aclose()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+    # ----- 이벤트 루프 안에서 실행 -----
+
+    async def _token(self):
+        return await self.loop.run_in_executor(None, self.token_provider)
+
+    async def _request(self, method, url, idempotent=True, **kwargs):
+        """429/5xx 와 전송 오류는 재시도. 멱등이 아닌 요청 (values:append 등) 은 보낸 뒤 응답 전에 끊기면
+        서버에 이미 반영됐을 수 있으므로 연결 전 오류만 재시도 (같은 행이 두 번 기록되지 않도록)"""
+        delay = 0.5
+        for attempt in range(self.max_retries + 1):
+            headers = {"Authorization": f"Bearer {await self._token()}"}
+            try:
+                resp = await self.client.request(method, url, headers=headers, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries or not (idempotent or isinstance(e, NOT_SENT_ERRORS)):
+                    raise
+            else:
+                if resp.status_code not in RETRY_STATUS or attempt == self.max_retries:
+                    resp.raise_for_status()
+                    return resp.json()
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    async def _ensure_header(self, header):
+        async with self._header_lock:
+            if self.header_checked:
+                return
+            # 전체 시트가 아니라 첫 행만 조회
+            try:
+                data = await self._request("GET", self._values_url("1:1"))
+            except httpx.HTTPStatusError as e:
+                # 이름을 지정한 워크시트가 아직 없으면 (400) 만든 뒤 빈 시트로 간주
+                if self.worksheet is None or e.response.status_code != 400:
+                    raise
+                await self._add_worksheet(len(header))
+                data = {}
+            existing = (data.get("values") or [[]])[0]
+            if not existing:
+                await self._post([header])
+            elif existing != header and header[:len(existing)] == existing:
+                # 이전 형식 헤더 뒤에 열이 추가된 경우 첫 행만 새 헤더로 교체
+                await self._request(
+                    "PUT", self._values_url("1:1"), params={"valueInputOption": "RAW"}, json={"values": [header]},
+                )
+            self.header_checked = True
+
+    async def _add_worksheet(self, columns):
+        # 기본 26열로 만들면 요약 행처럼 열이 많은 행은 추가할 수 없으므로 헤더 길이에 맞춤
+        properties = {"title": self.worksheet, "gridProperties": {"columnCount": columns}}
+        return await self._request(
+            "POST",
+            f"/v4/spreadsheets/{self.sheet_id}:batchUpdate",
+            idempotent=False,
+            json={"requests": [{"addSheet": {"properties": properties}}]},
+        )
+
+    async def _append(self, rows, header):
+        if header is not None and not self.header_checked:
+            await self._ensure_header(header)
+        future = self.loop.create_future()
+        self._pending.append((rows, future))
+        if self._flush_task is None:
+            self._flush_task = self.loop.create_task(self._flush_later())
+        return await future
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.batch_window)
+        batch, self._pending = self._pending, []
+        self._flush_task = None
+        rows = [row for part, _ in batch for row in part]
+        try:
+            await self._post(rows)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+        else:
+            for _, future in batch:
+                future.set_result(True)
+
+    async def _post(self, rows):
+        return await self._request(
+            "POST",
+            self._values_url("A1", ":append"),
+            idempotent=False,
+            params={"valueInputOption": "RAW", "insertDataOption": "INSERT_ROWS"},
+            json={"values": rows},
+        )
@@ -0,0 +1,282 @@
+import argparse
+import os
+import time
+import tomllib
+from concurrent.futures import wait
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from discount_fit import design_from_spec
+from results_format import CHOICE_LABELS, SCHEMA, TIME_FORMAT
+from task_spec import load_task_spec
+
+# ==========================================
+# 합성 응답 생성기 (저장·분석 부하 시험용)
+# ==========================================
+# 참여자별 쌍곡선 k·선택 민감도 beta 를 로그정규 분포에서 뽑고, discount_fit 과 같은 모형
+#   P(LL) = sigmoid(beta * sign * (A_ll / (1 + k t_ll) - A_ss / (1 + k t_ss)) / A_ss)
+# 으로 선택을 생성. 일정 비율 (lapse) 은 무작위 응답. RT 는 이동 로그정규이고
+# 무차별점 근처 (P(LL) ≈ 0.5) 문항일수록 느림. 참여자 묶음 단위로 배열 연산 후 바로 기록.
+
+# 저장 형식의 열 이름·순서는 results_format.SCHEMA 하나를 기준으로 (experiment.HEADERS 와 같은지는 테스트로 확인).
+# experiment 모듈은 streamlit 을 불러오므로 명령줄 도구에서는 가져오지 않음
+HEADERS = list(SCHEMA.names)
+TRUTH_FIELDS = ["participant", "k", "beta", "lapse"]
+
+
+class Simulator:
+    """과제 정의 하나에 대한 합성 참여자 생성"""
+
+    def __init__(self, spec, k_median=0.5, k_sd=1.0, beta_median=8.0, beta_sd=0.5, lapse=0.02,
+                 rt_shift=0.3, rt_median=1.0, rt_sd=0.4, rt_difficulty=0.6, prefix="SYN", seed=None,
+                 experiment="main"):
+        self.ss, self.ll, self.ss_t, self.ll_t, self.sign = design_from_spec(spec)
+        self.task_ids = [task["id"] for task in spec.tasks]
+        self.task_index = np.repeat(np.arange(len(spec.tasks), dtype=np.int8), [len(t["vals"]) for t in spec.tasks])
+        self.item = np.concatenate([np.arange(1, len(t["vals"]) + 1, dtype=np.int8) for t in spec.tasks])
+        # 문항별 설계 id (save_to_sheets 와 같은 과제@LL금액) 와 지연 (개월)
+        self.design_ids = [f"{t['id']}@{v}" for t in spec.tasks for v in t["vals"]]
+        self.ss_delay = np.array([spec.delays[t["id"]][0] for t in spec.tasks for _ in t["vals"]], dtype=np.int8)
+        self.ll_delay = np.array([spec.delays[t["id"]][1] for t in spec.tasks for _ in t["vals"]], dtype=np.int8)
+        self.n_trials = spec.total_questions
+        self.k_median, self.k_sd = k_median, k_sd
+        self.beta_median, self.beta_sd = beta_median, beta_sd
+        self.lapse = lapse
+        self.rt_shift, self.rt_median, self.rt_sd, self.rt_difficulty = rt_shift, rt_median, rt_sd, rt_difficulty
+        self.prefix = prefix
+        self.experiment = experiment  # 행의 experiment 열 (실험 id)
+        self.rng = np.random.default_rng(seed)
+        self.next_id = 0
+
+    def chunk(self, n, submitted_at):
+        """참여자 n명분 열 배열 dict (행 순서 = 참여자별 문항 순서, save_to_sheets 와 같음)"""
+        rng = self.rng
+        k = self.k_median * np.exp(rng.normal(0.0, self.k_sd, n))[:, None]
+        beta = self.beta_median * np.exp(rng.normal(0.0, self.beta_sd, n))[:, None]
+        u = beta * self.sign * (self.ll / (1 + k * self.ll_t) - self.ss / (1 + k * self.ss_t)) / self.ss
+        p_ll = 0.5 * (1.0 + np.tanh(0.5 * u))
+        lapsed = rng.random((n, self.n_trials)) < self.lapse
+        p_ll = np.where(lapsed, 0.5, p_ll)
+        choice = (rng.random((n, self.n_trials)) < p_ll).astype(np.int8)
+        difficulty = 1.0 - np.abs(2.0 * p_ll - 1.0)
+        rt = self.rt_shift + self.rt_median * np.exp(self.rt_difficulty * difficulty + rng.normal(0.0, self.rt_sd, (n, self.n_trials)))
+
+        names = [f"{self.prefix}{i:07d}" for i in range(self.next_id, self.next_id + n)]
+        self.next_id += n
+        return {
+            "names": names,
+            "participant": np.repeat(np.arange(n, dtype=np.int32), self.n_trials),
+            "task": np.tile(self.task_index, n),
+            "item": np.tile(self.item, n),
+            "choice": choice.ravel(),
+            "ss_amount": np.tile(self.ss.astype(np.int32), n),
+            "ll_amount": np.tile(self.ll.astype(np.int32), n),
+            "rt_sec": np.round(rt, 3).ravel().astype(np.float32),
+            "submitted_at": np.full(n * self.n_trials, int(submitted_at.timestamp()), dtype=np.int64),
+            "truth": {"k": k.ravel(), "beta": beta.ravel()},
+        }
+
+    def typed_table(self, cols):
+        """results_format.SCHEMA 형식 Table"""
+        n = len(cols["names"])
+        return pa.Table.from_arrays([
+            pa.DictionaryArray.from_arrays(cols["participant"], pa.array(cols["names"])),
+            pa.DictionaryArray.from_arrays(cols["task"], pa.array(self.task_ids)),
+            pa.array(cols["item"]),
+            pa.array(cols["choice"]),
+            pa.array(cols["ss_amount"]),
+            pa.array(cols["ll_amount"]),
+            pa.array(cols["rt_sec"]),
+            pa.array(cols["submitted_at"]).cast(pa.timestamp("s")),
+            pa.DictionaryArray.from_arrays(
+                np.tile(np.arange(self.n_trials, dtype=np.int16), n), pa.array(self.design_ids)
+            ),
+            pa.array(np.tile(self.ss_delay, n)),
+            pa.array(np.tile(self.ll_delay, n)),
+            pa.DictionaryArray.from_arrays(np.zeros(n * self.n_trials, dtype=np.int8), pa.array([self.experiment])),
+        ], schema=SCHEMA)
+
+    def string_table(self, cols, submitted_at):
+        """내보낸 CSV 와 같은 모양 (choice 'SS'/'LL', submitted_at 문자열)"""
+        table = self.typed_table(cols)
+        n = table.num_rows
+        return pa.table({
+            "participant": table.column("participant").cast(pa.string()),
+            "task": table.column("task").cast(pa.string()),
+            "item": table.column("item"),
+            "choice": pa.array(np.array(CHOICE_LABELS)[cols["choice"]]),
+            "ss_amount": table.column("ss_amount"),
+            "ll_amount": table.column("ll_amount"),
+            "rt_sec": pa.array(cols["rt_sec"].astype(np.float64).round(3)),
+            "submitted_at": pa.array([submitted_at.strftime(TIME_FORMAT)] * n),
+            "design": table.column("design").cast(pa.string()),
+            "ss_delay": table.column("ss_delay"),
+            "ll_delay": table.column("ll_delay"),
+            "experiment": table.column("experiment").cast(pa.string()),
+        })
+
+    def rows(self, cols, submitted_at):
+        """build_rows 와 같은 리스트 행 (Google Sheets 용)"""
+        stamp = submitted_at.strftime(TIME_FORMAT)
+        names = cols["names"]
+        trial = np.tile(np.arange(self.n_trials), len(names))
+        return [
+            [
+                names[p], self.task_ids[t], int(i), CHOICE_LABELS[c], int(ss), int(ll), float(round(rt, 3)), stamp,
+                self.design_ids[j], int(self.ss_delay[j]), int(self.ll_delay[j]), self.experiment,
+            ]
+            for p, t, i, c, ss, ll, rt, j in zip(
+                cols["participant"], cols["task"], cols["item"], cols["choice"],
+                cols["ss_amount"], cols["ll_amount"], cols["rt_sec"].astype(np.float64), trial,
+            )
+        ]
+
+
+# ==========================================
+# 저장 대상 (CSV / Parquet / Arrow / Google Sheets)
+# ==========================================
+
+class FileSink:
+    def __init__(self, path, sim):
+        self.path = path
+        self.sim = sim
+        self.writer = None
+        self.tables = []
+
+    def write(self, cols, submitted_at):
+        if self.path.endswith(".parquet"):
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, SCHEMA, compression="zstd")
+            self.writer.write_table(self.sim.typed_table(cols))
+        elif self.path.endswith((".arrow", ".feather")):
+            # Arrow 파일 형식은 묶음마다 다른 사전을 허용하지 않으므로 모아서 한 번에 기록
+            self.tables.append(self.sim.typed_table(cols))
+        else:
+            table = self.sim.string_table(cols, submitted_at)
+            if self.writer is None:
+                self.writer = pacsv.CSVWriter(self.path, table.schema)
+            self.writer.write_table(table)
+
+    def close(self):
+        if self.tables:
+            feather.write_feather(pa.concat_tables(self.tables).unify_dictionaries(), self.path, compression="zstd")
+        if self.writer is not None:
+            self.writer.close()
+
+
+class SheetsSink:
+    """gspread (동기) 또는 AsyncSheetsWriter 로 워크시트에 추가. 행 수가 많으면 batch_rows 씩 나눠 보냄"""
+
+    def __init__(self, sim, secrets, sheet_id, worksheet, use_async=False, batch_rows=10000):
+        self.sim = sim
+        self.batch_rows = batch_rows
+        self.header_done = False
+        self.futures = []
+        info = dict(secrets["gcp_service_account"])
+        if use_async:
+            from sheets_async import AsyncSheetsWriter, service_account_token_provider
+            self.writer = AsyncSheetsWriter(sheet_id, service_account_token_provider(info), worksheet=worksheet)
+            self.sheet = None
+        else:
+            import gspread
+            from google.oauth2.service_account import Credentials
+            creds = Credentials.from_service_account_info(info, scopes=["https://www.googleapis.com/auth/spreadsheets"])
+            spreadsheet = gspread.authorize(creds).open_by_key(sheet_id)
+            try:
+                self.sheet = spreadsheet.worksheet(worksheet)
+            except gspread.WorksheetNotFound:
+                self.sheet = spreadsheet.add_worksheet(title=worksheet, rows=1, cols=len(HEADERS))
+            self.writer = None
+
+    def write(self, cols, submitted_at):
+        rows = self.sim.rows(cols, submitted_at)
+        for start in range(0, len(rows), self.batch_rows):
+            batch = rows[start:start + self.batch_rows]
+            if self.writer is not None:
+                self.futures.append(self.writer.append_rows(batch, header=HEADERS))
+                continue
+            if not self.header_done and not self.sheet.row_values(1):
+                self.sheet.append_row(HEADERS)
+            self.header_done = True
+            self.sheet.append_rows(batch)
+
+    def close(self):
+        if self.writer is not None:
+            wait(self.futures)
+            failed = [f for f in self.futures if f.exception() is not None]
+            if failed:
+                print(f"전송 실패 {len(failed)}묶음: {failed[0].exception()}")
+            self.writer.close()
+
+
+def load_secrets(path):
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="save_to_sheets 형식의 합성 응답 생성")
+    parser.add_argument("participants", type=int, help="참여자 수 (행 수 = 참여자 수 × 문항 수)")
+    parser.add_argument("--out", default="synthetic.csv", help=".csv / .parquet / .arrow (--sheets 를 주면 무시)")
+    parser.add_argument("--sheets", choices=["sync", "async"], help="Google Sheets 에 기록 (gspread 또는 비동기 저장기)")
+    parser.add_argument("--secrets", default=os.path.join(".streamlit", "secrets.toml"))
+    parser.add_argument("--sheet-id", default=None, help="기본: secrets 의 sheet_id")
+    parser.add_argument("--worksheet", default="synthetic", help="실제 응답과 섞이지 않도록 별도 워크시트 (없으면 생성)")
+    parser.add_argument("--tasks", default=None, help="과제 정의 파일 (기본: tasks.json)")
+    parser.add_argument("--experiment", default="main", help="행의 experiment 열에 넣을 실험 id")
+    parser.add_argument("--chunk", type=int, default=10000, help="한 번에 생성하는 참여자 수")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--k-median", type=float, default=0.5, help="연 단위 k 의 중앙값")
+    parser.add_argument("--k-sd", type=float, default=1.0, help="log k 의 표준편차")
+    parser.add_argument("--beta-median", type=float, default=8.0)
+    parser.add_argument("--beta-sd", type=float, default=0.5)
+    parser.add_argument("--lapse", type=float, default=0.02, help="무작위 응답 비율")
+    parser.add_argument("--truth", default=None, help="참여자별 실제 파라미터 CSV (추정 검증용)")
+    args = parser.parse_args()
+
+    spec = load_task_spec(args.tasks) if args.tasks else load_task_spec()
+    sim = Simulator(
+        spec, k_median=args.k_median, k_sd=args.k_sd, beta_median=args.beta_median,
+        beta_sd=args.beta_sd, lapse=args.lapse, seed=args.seed, experiment=args.experiment,
+    )
+    if args.sheets:
+        secrets = load_secrets(args.secrets)
+        sink = SheetsSink(sim, secrets, args.sheet_id or secrets["sheet_id"], args.worksheet, use_async=args.sheets == "async")
+        target = f"{args.sheet_id or secrets['sheet_id']} / {args.worksheet}"
+    else:
+        sink = FileSink(args.out, sim)
+        target = args.out
+
+    truth = open(args.truth, "w", encoding="utf-8") if args.truth else None
+    if truth:
+        truth.write(",".join(TRUTH_FIELDS) + "\n")
+    started = time.perf_counter()
+    done = 0
+    try:
+        while done < args.participants:
+            n = min(args.chunk, args.participants - done)
+            submitted_at = datetime.now()
+            cols = sim.chunk(n, submitted_at)
+            sink.write(cols, submitted_at)
+            if truth:
+                truth.writelines(
+                    f"{name},{k:.6g},{beta:.6g},{args.lapse}\n"
+                    for name, k, beta in zip(cols["names"], cols["truth"]["k"], cols["truth"]["beta"])
+                )
+            done += n
+    finally:
+        sink.close()
+        if truth:
+            truth.close()
+    elapsed = time.perf_counter() - started
+    rows = done * spec.total_questions
+    print(f"{done}명 · {rows}행 → {target} ({elapsed:.1f}초, {rows / max(elapsed, 1e-9):,.0f}행/초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import json
+import os
+import string
+from functools import lru_cache
+
+from i18n import DEFAULT_LOCALE, LocaleError, load_locale
+
+# ==========================================
+# 과제 정의 파일 (tasks.json) 로드 및 검증
+# ==========================================
+
+DEFAULT_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tasks.json")
+
+TYPE_KEYS = ("ss_delay", "ll_delay", "question", "ss", "ll")
+TYPE_OPTIONAL_KEYS = ("sign",)
+TASK_KEYS = ("id", "base", "values", "type")
+SPEC_KEYS = ("values", "types", "tasks")
+TEMPLATE_FIELDS = {"base", "target"}
+
+
+class TaskSpecError(ValueError):
+    """과제 정의 파일 형식 오류"""
+
+
+class TaskSpec:
+    """검증이 끝난 과제 정의와 미리 만들어 둔 문항 텍스트"""
+
+    def __init__(self, tasks, types, trials, locale):
+        self.tasks = tasks
+        self.types = types
+        self.trials = trials
+        self.locale = locale
+        # 과제 id → (SS 지연, LL 지연) 개월. 저장 행에 실제 제시한 지연을 함께 기록할 때 사용
+        self.delays = {task["id"]: (types[task["type"]]["ss_delay"], types[task["type"]]["ll_delay"]) for task in tasks}
+        self.offsets = []
+        total = 0
+        for task in tasks:
+            self.offsets.append(total)
+            total += len(task["vals"])
+        self.total_questions = total
+
+    def question(self, task, item_idx):
+        """(question, ss_txt, ll_txt, base, target) 반환"""
+        return self.trials[task["id"]][item_idx]
+
+    def render(self, type_name, base, target):
+        """과제 정의에 없는 금액 조합 (ADO 후보 설계) 의 (question, ss_txt, ll_txt)"""
+        return _render(self.types[type_name], type_name, base, target, self.locale)
+
+
+def _render(tpl, type_name, base, target, locale):
+    amounts = {"base": locale.amount(base), "target": locale.amount(target)}
+    return tuple(locale.template(type_name, key, tpl[key]).format(**amounts) for key in ("question", "ss", "ll"))
+
+
+def _check_template(type_name, key, template):
+    if not isinstance(template, str):
+        raise TaskSpecError(f"types.{type_name}.{key}: 문자열이어야 합니다")
+    for _, field, _, _ in string.Formatter().parse(template):
+        if field is not None and field not in TEMPLATE_FIELDS:
+            raise TaskSpecError(f"types.{type_name}.{key}: 알 수 없는 필드 {{{field}}}")
+
+
+def _check_unknown(where, config, known):
+    """오타 난 키가 조용히 무시되지 않도록 알 수 없는 키는 거부"""
+    unknown = sorted(set(config) - set(known))
+    if unknown:
+        raise TaskSpecError(f"{where}알 수 없는 항목 {', '.join(unknown)}")
+
+
+def _validate(raw):
+    for key in SPEC_KEYS:
+        if key not in raw:
+            raise TaskSpecError(f"'{key}' 항목이 없습니다")
+    _check_unknown("", raw, SPEC_KEYS)
+
+    for name, vals in raw["values"].items():
+        if not vals or not all(isinstance(v, int) and v > 0 for v in vals):
+            raise TaskSpecError(f"values.{name}: 양의 정수 목록이어야 합니다")
+
+    for name, spec in raw["types"].items():
+        missing = [k for k in TYPE_KEYS if k not in spec]
+        if missing:
+            raise TaskSpecError(f"types.{name}: {', '.join(missing)} 항목이 없습니다")
+        _check_unknown(f"types.{name}: ", spec, TYPE_KEYS + TYPE_OPTIONAL_KEYS)
+        if not 0 <= spec["ss_delay"] < spec["ll_delay"]:
+            raise TaskSpecError(f"types.{name}: ss_delay < ll_delay 이어야 합니다")
+        if spec.get("sign", 1) not in (1, -1):
+            raise TaskSpecError(f"types.{name}: sign 은 1(이득) 또는 -1(손실)이어야 합니다")
+        for key in ("question", "ss", "ll"):
+            _check_template(name, key, spec[key])
+
+    if not raw["tasks"]:
+        raise TaskSpecError("tasks 가 비어 있습니다")
+    seen = set()
+    for i, task in enumerate(raw["tasks"]):
+        missing = [k for k in TASK_KEYS if k not in task]
+        if missing:
+            raise TaskSpecError(f"tasks[{i}]: {', '.join(missing)} 항목이 없습니다")
+        _check_unknown(f"tasks[{i}]: ", task, TASK_KEYS)
+        if task["id"] in seen:
+            raise TaskSpecError(f"tasks[{i}]: 중복된 id '{task['id']}'")
+        seen.add(task["id"])
+        if task["type"] not in raw["types"]:
+            raise TaskSpecError(f"tasks[{i}]: 알 수 없는 type '{task['type']}'")
+        if task["values"] not in raw["values"]:
+            raise TaskSpecError(f"tasks[{i}]: 알 수 없는 values '{task['values']}'")
+
+
+def compile_spec(raw, locale=None):
+    """원본 dict 검증 후 모든 문항 텍스트를 로케일 (기본 ko) 표기로 미리 생성"""
+    _validate(raw)
+    locale = locale or load_locale(DEFAULT_LOCALE)
+    tasks = []
+    trials = {}
+    for task in raw["tasks"]:
+        compiled = {
+            "id": task["id"],
+            "base": task["base"],
+            "vals": list(raw["values"][task["values"]]),
+            "type": task["type"],
+        }
+        tpl = raw["types"][task["type"]]
+        base = compiled["base"]
+        trials[compiled["id"]] = [
+            _render(tpl, task["type"], base, target, locale) + (base, target)
+            for target in compiled["vals"]
+        ]
+        tasks.append(compiled)
+    return TaskSpec(tasks, raw["types"], trials, locale)
+
+
+@lru_cache(maxsize=None)
+def load_task_spec(path=DEFAULT_SPEC_PATH, locale=DEFAULT_LOCALE):
+    """과제 정의 파일을 (경로, 로케일) 별로 한 번만 읽고 검증해서 캐시"""
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    return compile_spec(raw, load_locale(locale))
+
+
+# ==========================================
+# 실험 목록 (experiments.json) 로드
+# ==========================================
+
+DEFAULT_EXPERIMENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "experiments.json")
+
+EXPERIMENT_KEYS = ("tasks", "break_duration", "next_url")
+EXPERIMENT_OPTIONAL_KEYS = (
+    "locale", "mode", "ado_trials", "preload", "break_pause", "trace", "next", "done_title", "done_text",
+)
+
+
+@lru_cache(maxsize=None)
+def load_experiments(path=DEFAULT_EXPERIMENTS_PATH):
+    """실험 id → 설정 dict. 각 실험의 과제 정의 파일도 함께 검증"""
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    experiments = raw.get("experiments") or {}
+    if raw.get("default") not in experiments:
+        raise TaskSpecError(f"default 실험 '{raw.get('default')}' 이(가) experiments 에 없습니다")
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for exp_id, config in experiments.items():
+        missing = [k for k in EXPERIMENT_KEYS if k not in config]
+        if missing:
+            raise TaskSpecError(f"experiments.{exp_id}: {', '.join(missing)} 항목이 없습니다")
+        _check_unknown(f"experiments.{exp_id}: ", config, EXPERIMENT_KEYS + EXPERIMENT_OPTIONAL_KEYS)
+        duration = config["break_duration"]
+        if isinstance(duration, bool) or not isinstance(duration, (int, float)) or duration < 0:
+            raise TaskSpecError(f"experiments.{exp_id}: break_duration 은 0 이상의 초 (숫자) 이어야 합니다")
+        config["id"] = exp_id
+        config["tasks"] = os.path.join(base_dir, config["tasks"])
+        config["locale"] = config.get("locale", DEFAULT_LOCALE)
+        try:
+            spec = load_task_spec(config["tasks"], config["locale"])
+        except LocaleError as e:
+            raise TaskSpecError(f"experiments.{exp_id}: {e}") from e
+        # 완료 화면 문구는 로케일 기본값 (휴식이 있는 실험은 휴식 완료 문구), 실험별로 덮어쓸 수 있음
+        done = "break_done" if config["break_duration"] > 0 else "done"
+        config.setdefault("done_title", spec.locale.text(f"{done}_title"))
+        config.setdefault("done_text", spec.locale.text(f"{done}_text"))
+    for exp_id, config in experiments.items():
+        if config.get("mode", "fixed") not in ("fixed", "ado"):
+            raise TaskSpecError(f"experiments.{exp_id}: mode 는 fixed 또는 ado 이어야 합니다")
+        if config.get("mode") == "ado" and not (isinstance(config.get("ado_trials"), int) and config["ado_trials"] > 0):
+            raise TaskSpecError(f"experiments.{exp_id}: ado 모드에는 양의 정수 ado_trials 가 필요합니다")
+        preload_k = config.get("preload")
+        if preload_k is not None and not (isinstance(preload_k, int) and preload_k > 0 and config.get("mode") != "ado"):
+            raise TaskSpecError(f"experiments.{exp_id}: preload 는 양의 정수이며 ado 모드와 함께 쓸 수 없습니다")
+        if config.get("break_pause", "none") not in ("none", "disconnect"):
+            raise TaskSpecError(f"experiments.{exp_id}: break_pause 는 none 또는 disconnect 이어야 합니다")
+        if not isinstance(config.get("trace", False), bool):
+            raise TaskSpecError(f"experiments.{exp_id}: trace 는 true 또는 false 이어야 합니다")
+        if config.get("next") is not None and config["next"] not in experiments:
+            raise TaskSpecError(f"experiments.{exp_id}: next 실험 '{config['next']}' 이(가) 없습니다")
+    return raw["default"], experiments
@@ -0,0 +1,80 @@
+import streamlit as st
+
+# ==========================================
+# 문항별 시각 기록 (클릭 → 서버 수신 → 응답 기록 → 재실행 끝 → 브라우저 화면 표시)
+# ==========================================
+# 서버 시각은 time.time() (초), 브라우저 시각은 performance.timeOrigin + now() (ms).
+# 두 시계는 맞추지 않고 같은 시계끼리의 차이만 계산함.
+
+TRACE_HEADERS = [
+    "participant", "task", "item", "rt_sec", "client_rt_sec",
+    "server_receipt", "recorded", "rerun_end", "onset_ms", "click_ms", "next_render_ms",
+    "server_ms", "client_ms", "lag_ms",
+]
+
+# 버튼 클릭 시각을 기억했다가, 다음 화면이 실제로 그려진 뒤 (requestAnimationFrame 두 번)
+# {trial, click_ms, render_ms} 를 보냄. 같은 화면의 재실행에서는 다시 보내지 않음.
+_PROBE_JS = """
+export default function(component) {
+    const { data, setStateValue } = component;
+    const t = window.__trialTrace || (window.__trialTrace = { click: null, shown: null });
+    if (!t.listening) {
+        t.listening = true;
+        document.addEventListener("click", (e) => {
+            if (e.target.closest(".stButton")) t.click = performance.timeOrigin + performance.now();
+        }, true);
+    }
+    if (data.trial === t.shown) return;
+    t.shown = data.trial;
+    requestAnimationFrame(() => requestAnimationFrame(() => {
+        setStateValue("render", { trial: data.trial, click_ms: t.click, render_ms: performance.timeOrigin + performance.now() });
+        t.click = null;
+    }));
+}
+"""
+
+_probe = st.components.v2.component("trial_trace_probe", js=_PROBE_JS)
+
+
+def probe(trial):
+    """trial 번째 화면 (응답 수 기준) 의 브라우저 보고값. 아직 없으면 None"""
+    # 상태 값은 on_<이름>_change 가 등록된 이름만 유지됨 (처리는 fragment 본문에서)
+    return _probe(data={"trial": trial}, key="trial_trace_probe", on_render_change=lambda: None).get("render")
+
+
+def begin(traces, task_id, item, rt, server_receipt, recorded):
+    """클릭 처리 중: 서버 쪽 시각 기록 (trial = 응답 순서)"""
+    traces.append({
+        "trial": len(traces), "task": task_id, "item": item, "rt_sec": rt,
+        "server_receipt": server_receipt, "recorded": recorded, "rerun_end": None,
+    })
+
+
+def mark_rerun_end(traces, now):
+    """다음 화면을 만든 재실행이 끝난 시각 (아직 없는 마지막 문항에만)"""
+    if traces and traces[-1]["rerun_end"] is None:
+        traces[-1]["rerun_end"] = now
+
+
+def _diff(a, b, scale=1.0, ndigits=1):
+    return "" if a is None or b is None else round((b - a) * scale, ndigits)
+
+
+def trace_rows(traces, client, participant):
+    """시트 저장용 행. client: trial → {click_ms, render_ms} (trial 번째 화면이 그려질 때 보고된 값)"""
+    rows = []
+    for t in traces:
+        shown = client.get(t["trial"], {})
+        after = client.get(t["trial"] + 1, {})
+        onset, click, next_render = shown.get("render_ms"), after.get("click_ms"), after.get("render_ms")
+        server_ms = _diff(t["server_receipt"], t["rerun_end"], 1000)
+        client_ms = _diff(click, next_render)
+        rows.append([
+            participant, t["task"], t["item"], t["rt_sec"], _diff(onset, click, 0.001, 3),
+            t["server_receipt"], t["recorded"], t["rerun_end"] or "",
+            onset or "", click or "", next_render or "",
+            server_ms, client_ms,
+            # 클릭→화면 표시 중 서버 재실행 밖의 시간 (네트워크 왕복 + 브라우저 렌더링)
+            "" if "" in (server_ms, client_ms) else round(client_ms - server_ms, 1),
+        ])
+    return rows